@@ -1,14 +1,30 @@
 import streamlit as st
+from src.instrumentation import profile_report, profile_stats, profiled
+from src.stores import DEFAULT_STORE, list_stores
 
 st.set_page_config(layout="wide")
 
+# every page shows the data and models of the selected store (see `src.app_cache.selected_store`)
+with st.sidebar:
+    st.selectbox("Store", list_stores('sales') or [DEFAULT_STORE], key='store_id')
+    st.toggle("Profile reruns", key='profile_reruns', help="Profile every rerun of the page with cProfile (slower), see the report below the page")
+
 sales_monitor_page = st.Page("streamlit_pages/sales_monitor.py", title="Sales monitor", icon=":material/finance_mode:")
 analytics_page = st.Page("streamlit_pages/analytics.py", title="Sales analytics", icon=":material/finance_mode:")
 diagnostics_total_page = st.Page("streamlit_pages/diagnostics_total_sales.py", title="Model diagnostics - Total Sales", icon=":material/monitor_heart:")
 diagnostics_item_A_page = st.Page("streamlit_pages/diagnostics_item_A.py", title="Model diagnostics - Item A Sales", icon=":material/monitor_heart:")
 diagnostics_item_B_page = st.Page("streamlit_pages/diagnostics_item_B.py", title="Model diagnostics - Item B Sales", icon=":material/monitor_heart:")
 diagnostics_orders_page = st.Page("streamlit_pages/diagnostics_orders.py", title="Model diagnostics - In Store Orders", icon=":material/monitor_heart:")
+performance_page = st.Page("streamlit_pages/performance.py", title="Performance", icon=":material/speed:")
 
 pg = st.navigation({"Welcome to SweetPulse!":[sales_monitor_page, analytics_page, diagnostics_total_page, diagnostics_item_A_page, diagnostics_item_B_page,
-                                      diagnostics_orders_page]})
-pg.run()
\ No newline at end of file
+                                      diagnostics_orders_page, performance_page]})
+
+with profiled(enabled=st.session_state.get('profile_reruns', False)) as profiler:
+    pg.run()
+
+if profiler is not None:
+    with st.expander("Profile of this rerun"):
+        st.code(profile_report(profiler))
+        st.download_button("Download profile", profile_stats(profiler), file_name="rerun.prof",
+                           help="Open with `python -m pstats rerun.prof` or snakeviz")
@@ -0,0 +1,85 @@
+"""
+This script benchmarks the aggregate cube of the analytics page (`src.aggregate_cube`) on a
+synthetic history: the previous per-rerun `groupby('type_of_day')` over every day against
+cube lookups, for all days and for the last 90 days, and the incremental update of the cube
+with one new day against rebuilding it. It checks that both give the same averages.
+
+Outputs:
+    - Timings of both approaches, printed to stdout.
+
+Usage:
+    python benchmarks/bench_aggregate_cube.py --rows 1000000
+"""
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+import click
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.aggregate_cube import CUBE_MEASURES, build_cube, query_cube, update_cube
+from bench_data_validation import make_combined
+
+
+def _legacy_averages(df, day_range=None):
+    # previous page: derived column and group-by over the selected days on every rerun
+    df = df.copy()
+    df['sales_per_order'] = df['total_sales_normalized'] / df['in_store_orders']
+    input_df = df if day_range is None else df.iloc[-day_range:]
+    return input_df.groupby('type_of_day')[CUBE_MEASURES].mean()
+
+
+def _timed(func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def _check(legacy, cube_result):
+    means = cube_result[[f'{measure}_mean' for measure in CUBE_MEASURES]]
+    means.columns = CUBE_MEASURES
+    means.index = means.index.astype(str)
+    np.testing.assert_allclose(means.loc[legacy.index].to_numpy(), legacy.to_numpy(), rtol=1e-9)
+
+
+@click.command()
+@click.option('--rows', type=int, default=1_000_000, show_default=True, help='Number of synthetic days')
+def main(rows):
+
+    # unusual days are dropped from the combined dataset
+    df = make_combined(rows).set_index('date').sort_index(kind='stable')
+    df = df[df['type_of_day'] != 'Unusual']
+    cube, build_time = _timed(lambda: build_cube(df), repeat=1)
+
+    legacy_all, legacy_all_time = _timed(lambda: _legacy_averages(df))
+    cube_all, cube_all_time = _timed(lambda: query_cube(cube, ['type_of_day']))
+    _check(legacy_all, cube_all)
+
+    since = df.index[-90]
+    legacy_range, legacy_range_time = _timed(lambda: _legacy_averages(df, 90))
+    # the legacy range is the last 90 rows, the cube range every row from their first date
+    legacy_range = _legacy_averages(df[df.index >= since])
+    cube_range, cube_range_time = _timed(lambda: query_cube(cube, ['type_of_day'], since=since, df=df))
+    _check(legacy_range, cube_range)
+
+    history, last_day = df[df.index < df.index.max()], df.index.max()
+    previous = build_cube(history)
+    updated, update_time = _timed(lambda: update_cube(previous, df), repeat=1)
+    pd.testing.assert_frame_equal(updated, cube, check_exact=False)
+
+    print(f"rows, cube cells:             {rows:,}, {len(cube):,}")
+    print(f"build cube:                   {build_time:.3f} s")
+    print(f"group-by, all days:           {legacy_all_time * 1000:.1f} ms")
+    print(f"cube lookup, all days:        {cube_all_time * 1000:.1f} ms ({legacy_all_time / cube_all_time:.0f}x)")
+    print(f"group-by, last 90 days:       {legacy_range_time * 1000:.1f} ms")
+    print(f"cube lookup, last 90 days:    {cube_range_time * 1000:.1f} ms ({legacy_range_time / cube_range_time:.0f}x)")
+    print(f"update with day {last_day.date()}:   {update_time:.3f} s ({build_time / update_time:.0f}x faster than a rebuild)")
+
+if __name__ == "__main__":
+    main()
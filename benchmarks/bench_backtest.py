@@ -0,0 +1,74 @@
+"""
+This script benchmarks the rolling-origin backtest of the linear regression targets
+(`src.backtest.backtest`), which updates X'X and X'y from one origin to the next, against
+refitting the sklearn pipeline at every origin, on a synthetic combined dataset, and checks
+that both give the same forecasts.
+
+Outputs:
+    - Timings of both backtests and the largest forecast difference, printed to stdout.
+
+Usage:
+    python benchmarks/bench_backtest.py --rows 800 --horizon 7
+"""
+
+import os
+import sys
+import time
+import numpy as np
+import click
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.backtest import _linear_forecasts, backtest
+from src.training import design_matrix
+from src.model_config import TARGETS
+from src.training import fit_pipelines
+from bench_data_validation import make_combined
+
+
+def _refit_forecasts(df, targets, origins, horizon):
+    # previous approach: refit every pipeline on the rows before each origin
+    forecasts = np.empty((len(origins), horizon, len(targets)))
+    for i, origin in enumerate(origins):
+        pipelines = fit_pipelines(df.iloc[:origin], targets, n_jobs=1)
+        for k, pipeline in enumerate(pipelines.values()):
+            forecasts[i, :, k] = pipeline.predict(df.iloc[origin:origin + horizon])
+    return forecasts
+
+
+@click.command()
+@click.option('--rows', type=int, default=800, show_default=True, help='Number of synthetic days')
+@click.option('--min-train', type=int, default=120, show_default=True, help='Number of days before the first origin')
+@click.option('--horizon', type=int, default=7, show_default=True, help='Number of days forecast from each origin')
+def main(rows, min_train, horizon):
+
+    # the pipelines need complete weather, as after the gap filling of `join_weather`
+    df = make_combined(rows).set_index('date').fillna({'rain': 0.0})
+    linear = {name: config for name, config in TARGETS.items() if name != 'orders'}
+    origins = np.arange(min_train, len(df) - horizon + 1)
+
+    start = time.perf_counter()
+    refit = _refit_forecasts(df, linear, origins, horizon)
+    refit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    Y = df[[config['target'] for config in linear.values()]].to_numpy(dtype='float64')
+    updated = _linear_forecasts(design_matrix(df), Y, origins, horizon)
+    update_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    backtest(df, linear, min_train=min_train, horizon=horizon, n_jobs=1)
+    table_time = time.perf_counter() - start
+
+    difference = np.abs(refit - updated).max()
+    scale = np.abs(refit).max()
+    assert difference <= 1e-8 * scale, f"Forecasts differ by {difference}"
+
+    print(f"rows, origins:                {rows:,}, {len(origins):,} ({len(linear)} targets)")
+    print(f"refit at every origin:        {refit_time:.3f} s")
+    print(f"X'X / X'y updates:            {update_time:.3f} s ({refit_time / update_time:.0f}x)")
+    print(f"with error tables:            {table_time:.3f} s")
+    print(f"largest forecast difference:  {difference:.2e}")
+
+if __name__ == "__main__":
+    main()
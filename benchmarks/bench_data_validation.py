@@ -0,0 +1,98 @@
+"""
+This script benchmarks data validation on a synthetic history: the previous pandera-only
+validation of the combined dataset (schema rebuilt on every call) against the NumPy fast
+path, and the validation of a month-partitioned sales store with and without the partition
+cache. It also checks that a corrupted frame is still rejected with pandera's detailed report.
+
+Outputs:
+    - Timings of the validation modes, printed to stdout.
+
+Usage:
+    python benchmarks/bench_data_validation.py --rows 1000000
+"""
+
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import pandera as pa
+import click
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.data_validation import _schema, validate_frame, validate_partitions
+from src.schemas import SALES_SPEC
+from src.feature_functions import build_features
+from src.storage import append_partitions
+from bench_feature_functions import make_history
+
+
+def make_combined(n_rows, seed=0):
+    """Synthetic combined dataset (sales, weather and features) with the columns of `COMBINED_SPEC`."""
+    rng = np.random.default_rng(seed)
+    df = make_history(n_rows, seed)
+    df.insert(0, 'store_id', 'main')
+    df['hours_opened'] = rng.integers(6, 13, n_rows)
+    for column in ['tips_normalized', 'total_sales_normalized', 'in_store_orders', 'item_A_sales', 'item_B_sales', 'item_C_sales']:
+        df[column] = rng.gamma(2, 500, n_rows).round(2)
+    df['avg_temperature'] = rng.normal(10, 6, n_rows)
+    df['rain'] = np.where(rng.random(n_rows) < 0.01, np.nan, rng.exponential(3, n_rows))
+    df['snow'] = np.where(rng.random(n_rows) < 0.9, 0.0, rng.exponential(2, n_rows))
+
+    return build_features(df)
+
+
+def _legacy_validate(df):
+    # the schema used to be rebuilt from scratch on every call
+    _schema.cache_clear()
+    _schema('combined').validate(df)
+
+
+def _timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+@click.command()
+@click.option('--rows', type=int, default=1_000_000, show_default=True, help='Number of synthetic days')
+def main(rows):
+
+    df = make_combined(rows)
+
+    legacy_time = _timed(lambda: _legacy_validate(df))
+    fast_time = _timed(lambda: validate_frame(df, 'combined'))
+
+    with tempfile.TemporaryDirectory() as directory:
+        root = os.path.join(directory, 'sales')
+        cache_path = os.path.join(directory, 'validation_cache.json')
+        sales_df = df[list(SALES_SPEC)]
+        history, new_month = sales_df[sales_df['date'] < '2024-12-01'], sales_df[sales_df['date'] >= '2024-12-01']
+        append_partitions(history, root)
+
+        cold_time = _timed(lambda: validate_partitions(root, 'sales', cache_path))
+        warm_time = _timed(lambda: validate_partitions(root, 'sales', cache_path))
+        append_partitions(new_month, root)
+        validated = []
+        append_time = _timed(lambda: validated.append(validate_partitions(root, 'sales', cache_path)))
+
+    corrupted = df.copy()
+    corrupted.loc[corrupted.index[-1], 'item_A_sales'] = -1.0
+    try:
+        validate_frame(corrupted, 'combined')
+    except pa.errors.SchemaError as error:
+        report = str(error).splitlines()[0]
+    else:
+        raise AssertionError("The corrupted frame passed validation")
+
+    print(f"rows:                         {rows:,}")
+    print(f"pandera (schema per call):    {legacy_time:.3f} s")
+    print(f"fast path:                    {fast_time:.3f} s ({legacy_time / fast_time:.0f}x)")
+    print(f"sales store, cold cache:      {cold_time:.3f} s")
+    print(f"sales store, unchanged:       {warm_time:.3f} s")
+    print(f"sales store, 1 month added:   {append_time:.3f} s ({validated[0]} partition validated)")
+    print(f"corrupted frame report:       {report}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+This script benchmarks the vectorized feature engine (`build_features`) against the
+original per-element implementations of the feature functions on a synthetic sales
+history, and checks that both produce identical features.
+
+Outputs:
+    - Timings of both implementations and the resulting speedup, printed to stdout.
+
+Usage:
+    python benchmarks/bench_feature_functions.py --rows 1000000
+"""
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+import click
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.feature_functions import build_features
+
+
+def _legacy_get_season(dates):
+    def _season_of_date(date):
+        month = date.month
+        if month in [12, 1, 2]:
+            return 'Winter'
+        elif month in [3, 4, 5]:
+            return 'Spring'
+        elif month in [6, 7, 8]:
+            return 'Summer'
+        else:
+            return 'Fall'
+
+    return dates.apply(_season_of_date).rename("season")
+
+
+def _legacy_is_long_weekend(type_of_days):
+    is_long_weekend_list = [False] * len(type_of_days)
+
+    for i ,day in enumerate(type_of_days):
+
+        if day == 'Holiday':
+            prev_day = type_of_days[i-1] if i > 0 else None
+            next_day = type_of_days[i+1] if i < len(type_of_days) - 1 else None
+
+            if prev_day == 'Weekend':
+                is_long_weekend_list[i] = True
+                is_long_weekend_list[i-1] = True
+                is_long_weekend_list[i-2] = True
+
+            if next_day == 'Weekend':
+                is_long_weekend_list[i] = True
+                is_long_weekend_list[i+1] = True
+                is_long_weekend_list[i+2] = True
+
+    return pd.Series(is_long_weekend_list, name='is_long_weekend')
+
+
+def legacy_features(df):
+    """Feature construction as previously done in `scripts/prepare_combined.csv.py`."""
+    df = df.copy()
+    df['is_long_weekend'] = _legacy_is_long_weekend(df['type_of_day'])
+    df['is_HCF'] = df['HCF_sales'] > 0
+    df['is_holiday'] = df['type_of_day'].apply(lambda day: day == 'Holiday')
+    df['season'] = _legacy_get_season(df['date'])
+    df['day_of_week'] = df['date'].dt.day_name()
+    df['day_of_week'] = pd.Categorical(df['day_of_week'], categories=['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'])
+    df['season'] = pd.Categorical(df['season'], categories=['Winter', 'Spring', 'Summer', 'Fall'])
+    return df
+
+
+def make_history(n_rows, seed=0):
+    """Synthetic daily sales history with realistic day types, stacked 10-year histories of several locations."""
+    rng = np.random.default_rng(seed)
+    calendar = pd.date_range('2015-01-01', periods=3650, freq='D')
+    dates = np.tile(calendar.to_numpy(), -(-n_rows // len(calendar)))[:n_rows]
+    dates = pd.DatetimeIndex(dates)
+    type_of_day = np.where(dates.dayofweek >= 5, 'Weekend', np.where(dates.dayofweek == 4, 'Friday', 'Weekday')).astype(object)
+    type_of_day[rng.random(n_rows) < 0.03] = 'Holiday'
+    type_of_day[rng.random(n_rows) < 0.01] = 'Unusual'
+    # keep the first and last two days regular so the legacy loop never wraps or overruns
+    type_of_day[:2] = type_of_day[-2:] = 'Weekday'
+    hcf_sales = np.where(rng.random(n_rows) < 0.05, rng.gamma(2, 50, n_rows), 0.0)
+
+    return pd.DataFrame({'date': dates, 'type_of_day': type_of_day, 'HCF_sales': hcf_sales})
+
+
+def _best_of(func, df, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+@click.command()
+@click.option('--rows', type=int, default=1_000_000, show_default=True, help='Number of synthetic days')
+@click.option('--repeat', type=int, default=3, show_default=True, help='Timed repetitions (best is reported)')
+def main(rows, repeat):
+
+    df = make_history(rows)
+
+    legacy_time, expected = _best_of(legacy_features, df, 1)
+    vectorized_time, result = _best_of(build_features, df, repeat)
+
+    for column in ['is_long_weekend', 'is_HCF', 'is_holiday', 'season', 'day_of_week']:
+        if not result[column].equals(expected[column]):
+            raise AssertionError(f"build_features and the legacy functions disagree on '{column}'")
+
+    print(f"rows:           {rows:,}")
+    print(f"legacy loops:   {legacy_time:.3f} s")
+    print(f"build_features: {vectorized_time:.3f} s")
+    print(f"speedup:        {legacy_time / vectorized_time:.0f}x")
+
+if __name__ == "__main__":
+    main()
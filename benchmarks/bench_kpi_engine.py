@@ -0,0 +1,86 @@
+"""
+This script benchmarks the prefix-sum KPI engine (`src.kpi_engine.KPIEngine`) against the
+previous KPIs of the sales monitor (slicing the last rows and re-summing them on every rerun)
+on a synthetic daily history with closed days, for many random date windows, and checks the
+engine against pandas date slicing.
+
+Outputs:
+    - Timings of both approaches per rerun, printed to stdout.
+
+Usage:
+    python benchmarks/bench_kpi_engine.py --days 3650 --windows 1000
+"""
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+import click
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.kpi_engine import KPIEngine
+
+COLUMNS = ['total_sales_normalized', 'tips_normalized', 'in_store_orders']
+
+
+def make_sales(n_days, seed=0):
+    """Synthetic daily sales, with about 3% of the days missing (closed or unusual days)."""
+    rng = np.random.default_rng(seed)
+    calendar = pd.date_range('2015-01-01', periods=n_days, freq='D')
+    df = pd.DataFrame({column: rng.gamma(2, 500, n_days).round(2) for column in COLUMNS}, index=calendar)
+    return df[rng.random(n_days) > 0.03]
+
+
+def _legacy_kpis(sales_df, metric_range):
+    # previous page: mean of the last rows and of the rows before them, ratio of sums
+    current, previous = sales_df.iloc[-metric_range:], sales_df.iloc[-metric_range * 2:-metric_range]
+    values = [current[column].mean() - previous[column].mean() for column in COLUMNS]
+    values.append(current[COLUMNS[0]].sum() / current[COLUMNS[2]].sum() - previous[COLUMNS[0]].sum() / previous[COLUMNS[2]].sum())
+    return values
+
+
+def _engine_kpis(engine, start, end):
+    values = [np.subtract(*engine.compare('mean', column, start=start, end=end)) for column in COLUMNS]
+    values.append(np.subtract(*engine.compare('ratio', COLUMNS[0], COLUMNS[2], start=start, end=end)))
+    return values
+
+
+@click.command()
+@click.option('--days', type=int, default=3650, show_default=True, help='Number of synthetic calendar days')
+@click.option('--windows', type=int, default=1000, show_default=True, help='Number of random KPI windows')
+def main(days, windows):
+
+    sales_df = make_sales(days)
+    rng = np.random.default_rng(1)
+    lengths = rng.choice([7, 14, 30, 90, 180], windows)
+    ends = sales_df.index[0] + pd.to_timedelta(rng.integers(360, days, windows), unit='D')
+
+    start = time.perf_counter()
+    engine = KPIEngine(sales_df, COLUMNS)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for length in lengths:
+        _legacy_kpis(sales_df, int(length))
+    legacy_time = (time.perf_counter() - start) / windows
+
+    start = time.perf_counter()
+    for length, end in zip(lengths, ends):
+        _engine_kpis(engine, *engine.window(int(length), end))
+    engine_time = (time.perf_counter() - start) / windows
+
+    for length, end in zip(lengths[:50], ends[:50]):
+        window_start, window_end = engine.window(int(length), end)
+        expected = sales_df.loc[window_start:window_end]
+        assert np.isclose(engine.mean(COLUMNS[0], window_start, window_end), expected[COLUMNS[0]].mean(), rtol=1e-9)
+        assert engine.days(COLUMNS[0], window_start, window_end) == len(expected)
+
+    print(f"days, windows:                {days:,}, {windows:,}")
+    print(f"build prefix sums:            {build_time * 1000:.2f} ms (once per data version)")
+    print(f"row slicing, 4 KPIs + deltas: {legacy_time * 1e6:.0f} us per rerun")
+    print(f"prefix sums, 4 KPIs + deltas: {engine_time * 1e6:.0f} us per rerun ({legacy_time / engine_time:.0f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+This script benchmarks the model search (`src.model_search.search`) on a synthetic history:
+an exhaustive time-series cross-validation (every candidate refits the preprocessing on every
+fold and is evaluated on all folds) against the search with cached fold preprocessing and
+early stopping of clearly losing candidates. It checks that both choose the same winners.
+
+Outputs:
+    - Timings of both searches and the number of candidate folds evaluated, printed to stdout.
+
+Usage:
+    python benchmarks/bench_model_search.py --rows 800 --n-jobs 4
+"""
+
+import os
+import sys
+import time
+import numpy as np
+import click
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sklearn.metrics import mean_absolute_error
+from sklearn.model_selection import TimeSeriesSplit
+
+from src.model_config import FEATURES, TARGETS
+from src.model_search import candidates, make_candidate, search
+from bench_data_validation import make_combined
+
+
+def make_train(n_rows, seed=0):
+    """Synthetic training table whose targets depend on the features, as in the store data."""
+    rng = np.random.default_rng(seed)
+    # the pipelines need complete weather, as after the gap filling of `join_weather`
+    df = make_combined(n_rows, seed).set_index('date').fillna({'rain': 0.0})
+    weekend = df['day_of_week'].isin(['Friday', 'Saturday', 'Sunday']).to_numpy()
+    level = 400 * df['hours_opened'].to_numpy() + 1500 * weekend + 60 * df['avg_temperature'].to_numpy() - 40 * df['rain'].to_numpy()
+    df['total_sales_normalized'] = np.maximum(level + rng.normal(0, 400, n_rows), 0).round(2)
+    df['item_A_sales'] = (0.4 * df['total_sales_normalized'] + rng.normal(0, 100, n_rows)).clip(0).round(2)
+    df['item_B_sales'] = (0.3 * df['total_sales_normalized'] + rng.normal(0, 100, n_rows)).clip(0).round(2)
+    df['in_store_orders'] = rng.poisson(np.maximum(level, 0) / 15).astype(float)
+    return df
+
+
+def _exhaustive_search(df, targets, n_splits):
+    # every candidate on every fold, each fit with its own preprocessing
+    winners, fits = {}, 0
+    for name, config in targets.items():
+        scores = []
+        for candidate in candidates():
+            maes = []
+            for train, valid in TimeSeriesSplit(n_splits=n_splits).split(df):
+                pipeline = make_candidate(candidate).fit(df[FEATURES].iloc[train], df[config['target']].iloc[train])
+                maes.append(mean_absolute_error(df[config['target']].iloc[valid], pipeline.predict(df[FEATURES].iloc[valid])))
+                fits += 1
+            scores.append((np.mean(maes), candidate))
+        winners[name] = min(scores, key=lambda score: score[0])
+    return winners, fits
+
+
+@click.command()
+@click.option('--rows', type=int, default=800, show_default=True, help='Number of synthetic days')
+@click.option('--n-splits', type=int, default=5, show_default=True, help='Number of cross-validation folds')
+@click.option('--n-jobs', type=int, default=None, help='Number of worker processes of the search, by default the number of CPUs')
+def main(rows, n_splits, n_jobs):
+
+    df = make_train(rows)
+
+    start = time.perf_counter()
+    expected, exhaustive_fits = _exhaustive_search(df, TARGETS, n_splits)
+    exhaustive_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    records = search(df, TARGETS, n_splits=n_splits, budget=float('inf'), n_jobs=n_jobs)
+    search_time = time.perf_counter() - start
+
+    search_fits = 0
+    for name, record in records.items():
+        search_fits += sum(len(candidate['fold_mae']) for candidate in record['candidates'])
+        mae, candidate = expected[name]
+        winner = record['winner']
+        assert (winner['family'], winner['params']) == (candidate['family'], candidate['params']), f"Different winner for {name}"
+        assert np.isclose(winner['mean_mae'], mae, rtol=1e-9)
+
+    print(f"rows, candidates:             {rows:,}, {len(candidates())} per target ({len(TARGETS)} targets)")
+    print(f"exhaustive search:            {exhaustive_time:.1f} s ({exhaustive_fits} fits)")
+    print(f"cached folds + early stop:    {search_time:.1f} s ({search_fits} fits, {exhaustive_time / search_time:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+This script benchmarks the bootstrap of the prediction intervals (`src.prediction_intervals`) on
+a synthetic history: one sklearn pipeline fit per resample against the batched NumPy refits of
+all resamples, for a linear and a poisson regression, and times an interval at serving time.
+It checks the batched refits against sklearn fits with the resampling counts as sample weights.
+
+Outputs:
+    - Timings of both approaches, printed to stdout.
+
+Usage:
+    python benchmarks/bench_prediction_intervals.py --rows 800 --n-boot 500
+"""
+
+import os
+import sys
+import time
+import timeit
+import numpy as np
+import click
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sklearn.base import clone
+from sklearn.linear_model import LinearRegression, PoissonRegressor
+
+from src.model_config import FEATURES
+from src.prediction_intervals import bootstrap_intervals
+from src.training import design_matrix, fit_pipelines
+from bench_model_search import make_train
+
+TARGETS = {
+    'total_sales': {'target': 'total_sales_normalized', 'estimator': LinearRegression()},
+    'orders': {'target': 'in_store_orders', 'estimator': PoissonRegressor()},
+}
+
+
+def _sklearn_bootstrap(pipeline, df, target, n_boot, seed):
+    # previous approach: refit the pipeline on every resample of the rows
+    rng = np.random.default_rng(seed)
+    for _ in range(n_boot):
+        rows = rng.integers(0, len(df), len(df))
+        clone(pipeline).fit(df[FEATURES].iloc[rows], df[target].iloc[rows])
+
+
+def _check(pipeline, intervals, df, target, seed, n_checks=20):
+    # replicate b of the batched refits against sklearn with the counts of resample b as weights
+    weights = np.random.default_rng(seed).multinomial(len(df), np.full(len(df), 1 / len(df)), size=n_checks)
+    X = design_matrix(df)
+    y = df[target].to_numpy(dtype='float64')
+    batched = intervals.coef[:n_checks] @ np.hstack([np.ones((len(df), 1)), X]).T
+
+    estimator = pipeline[-1]
+    if isinstance(estimator, PoissonRegressor):
+        # the bootstrap keeps the trained scaler
+        Xs = pipeline[0].transform(df[FEATURES])
+        Xs = Xs.toarray() if hasattr(Xs, 'toarray') else Xs
+        estimator = PoissonRegressor(alpha=estimator.alpha, tol=1e-12, max_iter=10_000)
+        expected = [np.log(estimator.fit(Xs, y, sample_weight=w).predict(Xs)) for w in weights]
+    else:
+        expected = [LinearRegression().fit(X, y, sample_weight=w).predict(X) for w in weights]
+
+    difference = np.abs(batched - np.array(expected)).max()
+    assert difference <= 1e-6 * np.abs(batched).max(), f"Refits differ by {difference}"
+
+
+@click.command()
+@click.option('--rows', type=int, default=800, show_default=True, help='Number of synthetic days')
+@click.option('--n-boot', type=int, default=500, show_default=True, help='Number of bootstrap resamples')
+def main(rows, n_boot):
+
+    df = make_train(rows)
+    pipelines = fit_pipelines(df, TARGETS, n_jobs=1)
+    record = df[FEATURES].iloc[-1].to_dict()
+
+    print(f"rows, resamples:              {rows:,}, {n_boot:,}")
+    for name, pipeline in pipelines.items():
+        target = TARGETS[name]['target']
+
+        start = time.perf_counter()
+        _sklearn_bootstrap(pipeline, df, target, n_boot, seed=0)
+        sklearn_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        intervals = bootstrap_intervals(pipeline, df, target, n_boot=n_boot, seed=0)
+        batched_time = time.perf_counter() - start
+
+        _check(pipeline, intervals, df, target, seed=0)
+        interval_us = min(timeit.repeat(lambda: intervals.interval(record), number=2000, repeat=3)) / 2000 * 1e6
+
+        print(f"{name}: sklearn refits:   {sklearn_time:.2f} s")
+        print(f"{name}: batched refits:   {batched_time:.3f} s ({sklearn_time / batched_time:.0f}x)")
+        print(f"{name}: interval:         {interval_us:.1f} us per forecast")
+
+if __name__ == "__main__":
+    main()
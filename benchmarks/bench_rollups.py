@@ -0,0 +1,85 @@
+"""
+This script benchmarks the weekly and monthly rollups of the sales monitor's trend graphs
+(`src.rollups`) on a synthetic daily history with closed days: the previous per-rerun
+`resample(agg).mean()` of the daily sales against reading the rollups, and adding one new
+day to the rollups against rebuilding them. It checks that both give the same bucket means.
+
+Outputs:
+    - Timings of both approaches, printed to stdout.
+
+Usage:
+    python benchmarks/bench_rollups.py --days 36500
+"""
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+import click
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.rollups import ROLLUP_FREQUENCIES, build_rollups, rollup_means, update_rollups
+
+COLUMNS = ['total_sales_normalized', 'tips_normalized', 'in_store_orders', 'item_A_sales', 'item_B_sales', 'item_C_sales']
+
+
+def make_sales(n_days, seed=0):
+    """Synthetic daily sales, with about 3% of the days missing (closed or unusual days)."""
+    rng = np.random.default_rng(seed)
+    calendar = pd.date_range('1950-01-01', periods=n_days, freq='D', name='date')
+    df = pd.DataFrame({column: rng.gamma(2, 500, n_days).round(2) for column in COLUMNS}, index=calendar)
+    return df[rng.random(n_days) > 0.03]
+
+
+def _legacy_trends(sales_df, agg):
+    # previous page: derived column and resample of every day on every rerun, for both graphs
+    sales_df = sales_df.copy()
+    sales_df['sales_per_order'] = sales_df['total_sales_normalized'] / sales_df['in_store_orders']
+    trend = sales_df[['total_sales_normalized', 'item_A_sales', 'item_B_sales', 'item_C_sales']].resample(agg).mean()
+    return trend, sales_df.resample(agg).mean(numeric_only=True)
+
+
+def _rollup_trends(rollups, agg):
+    trend = rollup_means(rollups, agg, ['total_sales_normalized', 'item_A_sales', 'item_B_sales', 'item_C_sales'])
+    return trend, rollup_means(rollups, agg, ['in_store_orders', 'sales_per_order'])
+
+
+def _timed(func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+@click.command()
+@click.option('--days', type=int, default=36500, show_default=True, help='Number of synthetic calendar days')
+def main(days):
+
+    sales_df = make_sales(days)
+    rollups, build_time = _timed(lambda: build_rollups(sales_df), repeat=1)
+
+    print(f"days, buckets:                {len(sales_df):,}, {len(rollups):,}")
+    print(f"build rollups:                {build_time * 1000:.1f} ms")
+
+    for agg in ROLLUP_FREQUENCIES:
+        (legacy_trend, legacy_sop), legacy_time = _timed(lambda: _legacy_trends(sales_df, agg))
+        (trend, sop), rollup_time = _timed(lambda: _rollup_trends(rollups, agg))
+        pd.testing.assert_frame_equal(trend, legacy_trend, check_freq=False, rtol=1e-9)
+        pd.testing.assert_frame_equal(sop, legacy_sop[sop.columns], check_freq=False, rtol=1e-9)
+        print(f"resample, '{agg}' graphs:         {legacy_time * 1000:.1f} ms")
+        print(f"rollups, '{agg}' graphs:          {rollup_time * 1000:.1f} ms ({legacy_time / rollup_time:.0f}x)")
+
+    history, last_day = sales_df.iloc[:-1], sales_df.iloc[-1:]
+    previous = build_rollups(history)
+    updated, update_time = _timed(lambda: update_rollups(previous, last_day))
+    _, rebuild_time = _timed(lambda: build_rollups(sales_df), repeat=1)
+    pd.testing.assert_frame_equal(updated, rollups, check_exact=False)
+    print(f"rebuild with day {last_day.index[0].date()}:  {rebuild_time * 1000:.1f} ms")
+    print(f"update with day {last_day.index[0].date()}:   {update_time * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+This script benchmarks the cold start of the Streamlit app: the module-level imports of `app.py`
+and of every page in `streamlit_pages/` are run in a fresh interpreter with `python -X importtime`,
+and the import time is summed per top-level package. It checks that no page imports sklearn,
+which the dashboard only needs to train models (pages serve compiled kernels and saved intervals),
+or pandera, which only the pipeline scripts need to validate data.
+
+Outputs:
+    - Cold import time of every script and its heaviest packages, printed to stdout.
+    - Optional CSV with one row per script (date, script, import time, sklearn and pandera
+      imported), appended to so that cold starts can be tracked across changes.
+
+Usage:
+    python benchmarks/bench_startup.py --repeat 5 --output benchmarks/startup.csv
+"""
+
+import os
+import sys
+import ast
+import csv
+import glob
+import datetime
+import subprocess
+from collections import Counter
+import click
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# packages the dashboard must not import on start
+DEFERRED_PACKAGES = ['sklearn', 'pandera']
+
+
+def module_imports(path):
+    """Source of the module-level import statements of a script."""
+    with open(path) as f:
+        tree = ast.parse(f.read())
+    return '\n'.join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def import_times(code):
+    """Self import time in microseconds of every module imported by `code` in a fresh interpreter."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Imports failed:\n{result.stderr}")
+
+    times = {}
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, _, module = line[len('import time:'):].split('|')
+        times[module.strip()] = int(self_us)
+    return times
+
+
+@click.command()
+@click.option('--repeat', type=int, default=3, show_default=True, help='Cold starts per script, the fastest is reported')
+@click.option('--top', type=int, default=5, show_default=True, help='Number of heaviest packages shown per script')
+@click.option('--output', type=click.Path(dir_okay=False), default=None, help='CSV the results are appended to')
+def main(repeat, top, output):
+
+    scripts = [os.path.join(ROOT, 'app.py')] + sorted(glob.glob(os.path.join(ROOT, 'streamlit_pages', '*.py')))
+    rows = []
+    for path in scripts:
+        code = module_imports(path)
+        runs = [import_times(code) for _ in range(repeat)]
+        times = min(runs, key=lambda run: sum(run.values()))
+
+        packages = Counter()
+        for module, self_us in times.items():
+            packages[module.split('.')[0]] += self_us
+
+        script = os.path.relpath(path, ROOT)
+        total_ms = sum(times.values()) / 1000
+        rows.append({'date': datetime.date.today().isoformat(), 'script': script, 'import_ms': round(total_ms, 1),
+                     **{package: package in packages for package in DEFERRED_PACKAGES}})
+
+        heaviest = ', '.join(f"{package} {self_us / 1000:.0f}" for package, self_us in packages.most_common(top))
+        print(f"{script:45s} {total_ms:7.0f} ms  ({heaviest} ms)")
+
+    if output is not None:
+        new_file = not os.path.exists(output)
+        with open(output, 'a', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            if new_file:
+                writer.writeheader()
+            writer.writerows(rows)
+
+    for package in DEFERRED_PACKAGES:
+        importing = [row['script'] for row in rows if row[package]]
+        assert not importing, f"{package} is imported at the start of {importing}"
+
+if __name__ == "__main__":
+    main()
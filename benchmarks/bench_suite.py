@@ -0,0 +1,237 @@
+"""
+This script runs the benchmark suite on synthetic datasets at several scales (see
+`benchmarks/make_synthetic_data.py`): the sales and weather preparation, training and model
+results scripts of every store, run as the pipeline runs them (with the duration of the steps
+within the scripts from their timings log), the feature building and data validation functions,
+and the data preparation of the dashboard pages. Results can be saved as a JSON baseline and
+compared with a previous baseline, e.g. one recorded on an earlier version. Timings depend on
+the machine, so baselines are recorded and compared on the same machine and not committed
+(`benchmarks/baselines/` is ignored by git).
+
+Outputs:
+    - Duration of every benchmark at every scale, printed to stdout.
+    - Optional JSON baseline with the results and the commit, Python version and machine.
+
+Usage:
+    python benchmarks/bench_suite.py --scale 1 --scale 10 --output benchmarks/baselines/suite.json
+    python benchmarks/bench_suite.py --scale 1 --scale 10 --compare benchmarks/baselines/suite.json
+"""
+
+import os
+import sys
+import json
+import time
+import glob
+import platform
+import shutil
+import subprocess
+import tempfile
+import datetime
+from collections import defaultdict
+import pandas as pd
+import click
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+from src.aggregate_cube import query_cube
+from src.data_validation import _validate_combined_df, _validate_excel_df, validate_partitions
+from src.diagnostics_plots import prediction_figure, resid_dist_figure, resid_fit_figure
+from src.feature_functions import build_features
+from src.instrumentation import TIMINGS_LOG, read_timings
+from src.kpi_engine import KPIEngine
+from src.rollups import rollup_means
+from src.storage import read_table
+from src.stores import list_stores, store_path
+from src.weather_join import join_weather
+from make_synthetic_data import DATA_DIR, dataset_dir, write_dataset
+
+# script, whether it runs once per store, extra arguments (every run starts from the inputs)
+SCRIPTS = [
+    ('prepare_weather.csv.py', False, ()),
+    ('prepare_sales.csv.py', True, ('--full-refresh',)),
+    ('prepare_combined.csv.py', True, ('--rebuild-cube',)),
+    ('train_models.py', True, ()),
+    ('get_model_results_total.py', True, ()),
+    ('get_model_results_A.py', True, ()),
+    ('get_model_results_B.py', True, ()),
+    ('get_model_results_orders.py', True, ()),
+]
+
+KPI_COLUMNS = ['total_sales_normalized', 'tips_normalized', 'in_store_orders']
+ANALYTICS_COLUMNS = ['total_sales_normalized', 'tips_normalized', 'in_store_orders', 'item_A_sales', 'item_B_sales',
+                     'item_C_sales', 'type_of_day', 'day_of_week', 'season', 'is_holiday', 'is_HCF']
+
+
+def _best_of(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run_scripts(root, stores):
+    """Duration of every script (summed over the stores) and of the steps logged by the scripts."""
+    # sales partitions validated by earlier runs would be skipped
+    shutil.rmtree(os.path.join(root, '.validation_cache'), ignore_errors=True)
+    log_path = os.path.join(root, TIMINGS_LOG)
+    logged = len(read_timings(log_path)) if os.path.exists(log_path) else 0
+
+    results = {}
+    for script, per_store, args in SCRIPTS:
+        seconds = 0.0
+        for store_args in ([('--store', store) for store in stores] if per_store else [()]):
+            start = time.perf_counter()
+            completed = subprocess.run([sys.executable, os.path.join(ROOT, 'scripts', script), *store_args, *args],
+                                       cwd=root, capture_output=True, text=True)
+            seconds += time.perf_counter() - start
+            if completed.returncode != 0:
+                raise RuntimeError(f"{script} {' '.join(store_args)} failed:\n{completed.stderr}")
+        results[f'script/{script}'] = seconds
+
+    steps = defaultdict(float)
+    for record in read_timings(log_path)[logged:]:
+        steps[f"step/{record['source']}/{record['stage']}"] += record['seconds']
+    results.update(steps)
+
+    return results
+
+
+def run_functions(stores, repeat):
+    """Duration of the feature, validation and page data functions, run from the dataset directory."""
+    weather_df = read_table('data/processed/weather.parquet')
+    sales_df = pd.concat([read_table(store_path('sales', store)) for store in stores], ignore_index=True)
+    joined_df = pd.concat([join_weather(read_table(store_path('sales', store)), weather_df)[0] for store in stores],
+                          ignore_index=True)
+    combined_df = pd.concat([read_table(store_path('combined', store)) for store in stores], ignore_index=True)
+
+    results = {
+        'feature_functions/build_features': _best_of(lambda: build_features(joined_df), repeat),
+        'data_validation/excel': _best_of(lambda: _validate_excel_df(sales_df), repeat),
+        'data_validation/combined': _best_of(lambda: _validate_combined_df(combined_df), repeat),
+    }
+
+    # the pages show one store at a time
+    store = stores[0]
+    with tempfile.TemporaryDirectory() as tmp:
+        def validate_store():
+            cache_path = os.path.join(tmp, 'cache.json')
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+            validate_partitions(store_path('sales', store), 'sales', cache_path)
+        results['data_validation/partitions'] = _best_of(validate_store, repeat)
+
+    def sales_monitor_kpis():
+        kpis = KPIEngine(read_table(store_path('sales', store), columns=KPI_COLUMNS, index_col='date'), KPI_COLUMNS)
+        start, end = kpis.window(30)
+        for column in KPI_COLUMNS:
+            kpis.compare('mean', column, start=start, end=end)
+        kpis.compare('ratio', 'total_sales_normalized', 'in_store_orders', start=start, end=end)
+
+    def sales_monitor_trends():
+        rollups = read_table(store_path('rollups', store))
+        for frequency in ('W', 'M'):
+            rollup_means(rollups, frequency, ['total_sales_normalized', 'item_A_sales', 'item_B_sales', 'item_C_sales'])
+            rollup_means(rollups, frequency, ['in_store_orders', 'sales_per_order'])
+
+    def analytics():
+        store_df = read_table(store_path('combined', store), columns=ANALYTICS_COLUMNS, index_col='date')
+        cube = read_table(store_path('cube', store))
+        query_cube(cube, ['type_of_day'], since=store_df.index[-min(30, len(store_df))], df=store_df)
+        store_df[store_df.select_dtypes(include='number').columns] = store_df.select_dtypes(include='number').round(1)
+
+    def diagnostics():
+        series = read_table(store_path('results', store, 'fit_series_total_sales.parquet'), index_col='date')
+        prediction_figure(series, 'total_sales_normalized')
+        resid_fit_figure(series)
+        resid_dist_figure(series)
+
+    results['page/sales_monitor/kpis'] = _best_of(sales_monitor_kpis, repeat)
+    results['page/sales_monitor/trends'] = _best_of(sales_monitor_trends, repeat)
+    results['page/analytics'] = _best_of(analytics, repeat)
+    results['page/diagnostics'] = _best_of(diagnostics, repeat)
+
+    return results
+
+
+def _commit():
+    completed = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True)
+    return completed.stdout.strip() if completed.returncode == 0 else None
+
+
+def compare(results, baseline, threshold, min_seconds=0.05):
+    """Print the ratio of every result to the baseline and return the regressions."""
+    previous = {(record['scale'], record['benchmark']): record['seconds'] for record in baseline['results']}
+    regressions = []
+    print(f"\nCompared with {baseline.get('commit')} ({baseline.get('created')}):")
+    for record in results:
+        key = (record['scale'], record['benchmark'])
+        if key not in previous:
+            continue
+        ratio = record['seconds'] / previous[key] if previous[key] > 0 else float('inf')
+        # changes of a few tens of milliseconds are noise
+        regressed = ratio > threshold and record['seconds'] - previous[key] > min_seconds
+        if regressed:
+            regressions.append(record)
+        print(f"{record['scale']:>5}x {record['benchmark']:60s} {previous[key]:9.3f} s -> {record['seconds']:9.3f} s "
+              f"({ratio:.2f}x){'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+@click.command()
+@click.option('--scale', 'scales', type=int, multiple=True, default=(1, 10), show_default=True, help='Scale of a dataset (repeatable)')
+@click.option('--data-dir', type=str, default=DATA_DIR, show_default=True, help='Directory of the datasets')
+@click.option('--regenerate', is_flag=True, help='Regenerate the datasets even if they exist')
+@click.option('--repeat', type=int, default=3, show_default=True, help='Runs of every function benchmark, the fastest is reported')
+@click.option('--script-repeat', type=int, default=2, show_default=True, help='Runs of the scripts, the fastest is reported for every script and step')
+@click.option('--output', type=click.Path(dir_okay=False), default=None, help='JSON file the results are saved to as a baseline')
+@click.option('--compare', 'baseline_path', type=click.Path(exists=True, dir_okay=False), default=None, help='Baseline the results are compared with')
+@click.option('--threshold', type=float, default=1.25, show_default=True, help='Slowdown over the baseline reported as a regression')
+@click.option('--min-seconds', type=float, default=0.05, show_default=True, help='Slowdown in seconds below which a benchmark is not reported as a regression')
+def main(scales, data_dir, regenerate, repeat, script_repeat, output, baseline_path, threshold, min_seconds):
+
+    results = []
+    for scale in scales:
+        root = dataset_dir(scale, data_dir)
+        if regenerate or not os.path.exists(root):
+            write_dataset(scale, data_dir=data_dir)
+
+        previous_dir = os.getcwd()
+        os.chdir(root)
+        try:
+            stores = list_stores('sales_inputs')
+            rows = sum(len(pd.read_excel(path, sheet_name='inputs', usecols=['date']))
+                       for path in glob.glob('data/inputs/sales/*/*.xlsx'))
+            # single runs of the scripts vary by tens of milliseconds
+            runs = [run_scripts(root, stores) for _ in range(script_repeat)]
+            timings = {benchmark: min(run[benchmark] for run in runs) for benchmark in runs[0]}
+            timings.update(run_functions(stores, repeat))
+        finally:
+            os.chdir(previous_dir)
+
+        print(f"\n{scale}x: {len(stores)} store(s), {rows:,} days of sales")
+        for benchmark, seconds in timings.items():
+            print(f"{benchmark:66s} {seconds:9.3f} s")
+            results.append({'scale': scale, 'stores': len(stores), 'rows': rows, 'benchmark': benchmark,
+                            'seconds': round(seconds, 6)})
+
+    if output is not None:
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump({'created': datetime.datetime.now().isoformat(timespec='seconds'), 'commit': _commit(),
+                       'python': platform.python_version(), 'machine': platform.platform(),
+                       'cpus': os.cpu_count(), 'results': results}, f, indent=2)
+        print(f"\nSaved baseline to {output}")
+
+    if baseline_path is not None:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, threshold, min_seconds)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) more than {threshold:.2f}x slower than the baseline")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
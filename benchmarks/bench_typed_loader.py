@@ -0,0 +1,98 @@
+"""
+This script benchmarks the typed loader (`src.typed_loader.read_typed`) against plain reads
+(`src.storage.read_table`) on the tables of a synthetic dataset (see
+`benchmarks/make_synthetic_data.py`) after a pipeline run: the memory of every table in both
+forms, which every dashboard session holds a copy of, and the read time. Both reads are
+checked to hold the same values (floats within `FLOAT32_TOLERANCE`).
+
+Outputs:
+    - Memory and read time of every table of the first store, printed to stdout.
+    - Memory of every column of the combined table with `--columns`.
+
+Usage:
+    python benchmarks/bench_suite.py --scale 100
+    python benchmarks/bench_typed_loader.py --scale 100 --columns
+"""
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+import click
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.storage import read_table
+from src.stores import list_stores, store_path
+from src.typed_loader import FLOAT32_TOLERANCE, memory_report, read_typed
+from make_synthetic_data import DATA_DIR, dataset_dir
+
+# table, path relative to the dataset directory, spec, index column
+TABLES = [
+    ('sales', lambda store: store_path('sales', store), 'sales', 'date'),
+    ('combined', lambda store: store_path('combined', store), 'combined', 'date'),
+    ('weather', lambda store: 'data/processed/weather.parquet', 'weather', 'date'),
+    ('rollups', lambda store: store_path('rollups', store), None, None),
+    ('fit series', lambda store: store_path('results', store, 'fit_series_total_sales.parquet'), None, 'date'),
+]
+
+
+def _best_of(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def check_parity(plain, typed):
+    """Check that the typed table holds the values of the plain table."""
+    assert list(plain.columns) == list(typed.columns)
+    assert (plain.index == typed.index).all()
+    for column in plain.columns:
+        if plain[column].dtype.kind == 'f':
+            assert np.allclose(typed[column].to_numpy(dtype='float64'), plain[column].to_numpy(),
+                               rtol=0, atol=FLOAT32_TOLERANCE, equal_nan=True), column
+        else:
+            assert plain[column].astype(object).equals(typed[column].astype(object)), column
+
+
+@click.command()
+@click.option('--scale', type=int, default=10, show_default=True, help='Scale of the synthetic dataset, run through the pipeline by bench_suite.py')
+@click.option('--data-dir', type=str, default=DATA_DIR, show_default=True, help='Directory of the datasets')
+@click.option('--repeat', type=int, default=5, show_default=True, help='Reads of every table, the fastest is reported')
+@click.option('--columns', is_flag=True, help='Show the memory of every column of the combined table')
+def main(scale, data_dir, repeat, columns):
+
+    root = dataset_dir(scale, data_dir)
+    previous_dir = os.getcwd()
+    os.chdir(root)
+    try:
+        stores = list_stores('combined')
+        if not stores:
+            raise FileNotFoundError(f"{root} has no processed store, run benchmarks/bench_suite.py --scale {scale} first")
+
+        print(f"{scale}x, store {stores[0]}:")
+        for table, path, schema, index_col in TABLES:
+            path = path(stores[0])
+            plain = read_table(path, index_col=index_col)
+            typed = read_typed(path, schema, index_col=index_col)
+            check_parity(plain, typed)
+
+            report = memory_report(plain, typed)
+            plain_s = _best_of(lambda: read_table(path, index_col=index_col), repeat)
+            typed_s = _best_of(lambda: read_typed(path, schema, index_col=index_col), repeat)
+            print(f"{table:12s} {len(plain):>9,} rows  {report.loc['total', 'bytes_before'] / 1e6:8.2f} MB -> "
+                  f"{report.loc['total', 'bytes_after'] / 1e6:8.2f} MB ({report.loc['total', 'saved']:.0%} saved)  "
+                  f"read {plain_s * 1000:7.1f} ms -> {typed_s * 1000:7.1f} ms")
+
+            if columns and table == 'combined':
+                with pd.option_context('display.width', 200):
+                    print(report.to_string())
+    finally:
+        os.chdir(previous_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+This script benchmarks the streaming weather ingester (`src.weather_ingest.stream_weather`)
+against the previous full read of the archive on synthetic multi-decade weatherstats
+archives (all 72 columns, newest rows first, with re-exported overlapping years). Each mode
+runs in a fresh process so that its peak resident memory can be reported, and both modes
+are checked to produce the same table.
+
+Outputs:
+    - Peak memory and time of both modes for each archive size, printed to stdout.
+
+Usage:
+    python benchmarks/bench_weather_ingest.py --years 50 --years 300
+"""
+
+import os
+import sys
+import json
+import subprocess
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+import click
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.weather_ingest import WEATHER_COLUMNS, stream_weather
+
+WEATHER_HEADER = os.path.join(os.path.dirname(__file__), '..', 'data', 'inputs', 'weather', 'weatherstats_vancouver_daily.csv')
+
+
+def make_archive(path, n_years, seed=0):
+    """Write a synthetic archive with the weatherstats columns, the last 10% of its days exported twice."""
+    rng = np.random.default_rng(seed)
+    columns = pd.read_csv(WEATHER_HEADER, nrows=0).columns
+    dates = pd.date_range(end='2025-05-10', periods=365 * n_years, freq='D')
+
+    df = pd.DataFrame(rng.normal(10, 5, (len(dates), len(columns) - 1)).round(2), columns=columns[1:])
+    df.insert(0, 'date', dates.strftime('%Y-%m-%d'))
+    df = pd.concat([df, df.iloc[-len(df) // 10:]]).iloc[::-1]
+    df.to_csv(path, index=False)
+
+
+def _legacy_read(path):
+    weather_df = pd.read_csv(path)
+    weather_df = weather_df[WEATHER_COLUMNS]
+    weather_df['date'] = pd.to_datetime(weather_df['date'])
+    return weather_df.drop_duplicates('date').sort_values('date').reset_index(drop=True)
+
+
+def _peak_memory_mb():
+    # high-water mark of this process; unlike ru_maxrss it is not inherited across exec
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith('VmHWM')) / 1024
+
+
+def _measure(mode, path, start):
+    # runs in a child process: peak RSS of this process only
+    begin = time.perf_counter()
+    if mode == 'legacy':
+        weather_df = _legacy_read(path)
+        weather_df = weather_df[weather_df['date'] >= start].reset_index(drop=True)
+    else:
+        weather_df = stream_weather([path], start=start)
+    seconds = time.perf_counter() - begin
+    peak_mb = _peak_memory_mb()
+    return {'seconds': seconds, 'peak_mb': peak_mb, 'rows': len(weather_df),
+            'checksum': float(weather_df[['avg_temperature', 'rain', 'snow']].to_numpy().sum())}
+
+
+@click.command()
+@click.option('--years', type=int, multiple=True, default=(50, 200), show_default=True, help='Years of daily history in the archive (at most 340, the range of pandas timestamps)')
+@click.option('--start', type=str, default='1990-01-01', show_default=True, help='First date kept')
+@click.option('--child', type=(str, str), default=None, hidden=True)
+def main(years, start, child):
+
+    if child is not None:
+        print(json.dumps(_measure(child[0], child[1], start)))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        for n_years in years:
+            path = os.path.join(directory, f'weather_{n_years}.csv')
+            make_archive(path, n_years)
+            size_mb = os.path.getsize(path) / 1e6
+
+            results = {}
+            for mode in ('legacy', 'stream'):
+                completed = subprocess.run([sys.executable, __file__, '--start', start, '--child', mode, path],
+                                           capture_output=True, text=True, check=True)
+                results[mode] = json.loads(completed.stdout)
+
+            assert results['legacy']['rows'] == results['stream']['rows']
+            assert np.isclose(results['legacy']['checksum'], results['stream']['checksum'])
+
+            print(f"{n_years} years ({size_mb:.0f} MB csv, {results['stream']['rows']:,} days kept)")
+            for mode, result in results.items():
+                print(f"  {mode:<8} {result['seconds']:6.2f} s   peak {result['peak_mb']:7.0f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+This script benchmarks the sorted-array weather join (`src.weather_join.join_weather`)
+against the previous join of `scripts/prepare_combined.csv.py` (coverage checks with `in`
+on the date values, `between` filter and `pd.merge`) on a synthetic daily history, checks
+that both give the same table when the weather has no gaps, and times the join with gaps
+that are interpolated or filled from a fallback station.
+
+Outputs:
+    - Timings of both joins and the gap report summary, printed to stdout.
+
+Usage:
+    python benchmarks/bench_weather_join.py --days 100000
+"""
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+import click
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.weather_join import WEATHER_VALUE_COLUMNS, covers, join_weather
+
+
+def make_weather(calendar, seed=0):
+    """Synthetic daily weather on `calendar`, sorted by date."""
+    rng = np.random.default_rng(seed)
+    n_days = len(calendar)
+    return pd.DataFrame({
+        'date': calendar,
+        'avg_temperature': rng.normal(10, 6, n_days),
+        'rain': rng.exponential(3, n_days),
+        'snow': np.where(rng.random(n_days) < 0.9, 0.0, rng.exponential(2, n_days)),
+    })
+
+
+def _legacy_join(sales_df, weather_df):
+    start_date, end_date = sales_df['date'].min(), sales_df['date'].max()
+    assert start_date in weather_df['date'].values and end_date in weather_df['date'].values
+    weather_df = weather_df[weather_df['date'].between(start_date, end_date)]
+    return pd.merge(sales_df, weather_df, on='date', how='left')
+
+
+def _new_join(sales_df, weather_df, fallback_stations=None):
+    start_date, end_date = sales_df['date'].min(), sales_df['date'].max()
+    assert covers(weather_df, start_date, start_date) and covers(weather_df, end_date, end_date)
+    return join_weather(sales_df, weather_df, fallback_stations)
+
+
+def _best_of(func, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+@click.command()
+@click.option('--days', type=int, default=100_000, show_default=True, help='Days of history (at most about 150,000)')
+def main(days):
+
+    rng = np.random.default_rng(1)
+    weather_calendar = pd.date_range('1750-01-01', periods=days + 400, freq='D')
+    sales_calendar = weather_calendar[200:-200]
+    sales_df = pd.DataFrame({'date': sales_calendar, 'total_sales_normalized': rng.gamma(2, 500, days)})
+    weather_df = make_weather(weather_calendar)
+
+    legacy_time, legacy_df = _best_of(lambda: _legacy_join(sales_df, weather_df))
+    new_time, (new_df, _) = _best_of(lambda: _new_join(sales_df, weather_df))
+    pd.testing.assert_frame_equal(new_df, legacy_df)
+
+    # 1% of the days missing (short gaps) and 2% of the rain missing in week-long gaps
+    gappy_df = weather_df.drop(index=rng.choice(np.arange(200, days + 200), days // 100, replace=False))
+    rain_gaps = rng.choice(np.arange(200, days + 200, 7), days // 350, replace=False)
+    gappy_df.loc[gappy_df.index.isin((rain_gaps[:, None] + np.arange(7)).ravel()), 'rain'] = np.nan
+    gappy_df = gappy_df.reset_index(drop=True)
+    fallback_stations = {'nearby': make_weather(weather_calendar, seed=2)}
+
+    gap_time, (filled_df, gap_report) = _best_of(lambda: _new_join(sales_df, gappy_df, fallback_stations))
+
+    print(f"days:                         {days:,}")
+    print(f"legacy merge:                 {legacy_time * 1000:.1f} ms")
+    print(f"sorted-array join:            {new_time * 1000:.1f} ms ({legacy_time / new_time:.1f}x)")
+    print(f"join with gaps and fallback:  {gap_time * 1000:.1f} ms")
+    print(f"gaps:                         {len(gap_report):,} "
+          f"({gap_report['filled_by'].value_counts().to_dict()})")
+    print(f"missing values after join:    {int(filled_df[WEATHER_VALUE_COLUMNS].isna().sum().sum())}")
+
+if __name__ == "__main__":
+    main()
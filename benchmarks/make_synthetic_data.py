@@ -0,0 +1,197 @@
+"""
+This script expands the sample sales workbook (`data/inputs/sales/main/sample_data.xlsx`) and the
+weather archive (`data/inputs/weather/*.csv`) into synthetic datasets for the benchmark suite
+(`benchmarks/bench_suite.py`). A dataset at scale k has k times the days of the sample, spread over
+several stores. Every synthetic day copies the sample day on the same weekday closest in the year,
+with its sales scaled by a store factor and noise, and every synthetic weather day copies an archive
+day of the same day of the year, with noise on the temperature. Each dataset is laid out like the
+repository (one workbook per store and year, one weather archive), so the pipeline scripts run on it
+unchanged from its directory.
+
+Outputs:
+    - '<data-dir>/scale_<k>/data/inputs/sales/store_<i>/sales_<year>.xlsx': Sales workbooks of every store
+    - '<data-dir>/scale_<k>/data/inputs/weather/weatherstats_synthetic_daily.csv': Weather archive
+      covering the sales of every store
+
+Usage:
+    python benchmarks/make_synthetic_data.py --scale 1 --scale 10 --scale 100 --scale 1000
+    python benchmarks/make_synthetic_data.py --scale 100 --stores 8 --data-dir /tmp/sweetpulse
+"""
+
+import os
+import sys
+import glob
+import shutil
+import numpy as np
+import pandas as pd
+import click
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+SAMPLE_WORKBOOK = os.path.join(ROOT, 'data', 'inputs', 'sales', 'main', 'sample_data.xlsx')
+WEATHER_ARCHIVES = os.path.join(ROOT, 'data', 'inputs', 'weather', '*.csv')
+DATA_DIR = os.path.join(ROOT, 'benchmarks', 'data')
+
+# scale -> number of stores the days are spread over (a single store would reach back centuries)
+DEFAULT_STORES = {1: 1, 10: 2, 100: 5, 1000: 10}
+
+# sales columns scaled per store and day
+_SALES_MEASURES = ['tips_normalized', 'total_sales_normalized', 'in_store_orders', 'item_A_sales',
+                   'item_B_sales', 'item_C_sales', 'HCF_sales']
+
+
+def dataset_dir(scale, data_dir=DATA_DIR):
+    """Directory of the synthetic dataset at a scale."""
+    return os.path.join(data_dir, f'scale_{scale}')
+
+
+def store_names(n_stores):
+    """Store ids of a synthetic dataset."""
+    return [f'store_{i:02d}' for i in range(1, n_stores + 1)]
+
+
+def _closest_rows(source_dates, dates, same_weekday):
+    # row of `source_dates` closest in the year to every date (on the same weekday if asked)
+    source_doy = source_dates.dt.dayofyear.to_numpy()
+    source_weekday = source_dates.dt.weekday.to_numpy()
+    rows = np.empty(len(dates), dtype=np.int64)
+    doy, weekday = dates.dayofyear.to_numpy(), dates.weekday.to_numpy()
+    for day in range(7 if same_weekday else 1):
+        targets = np.flatnonzero(weekday == day) if same_weekday else np.arange(len(dates))
+        candidates = np.flatnonzero(source_weekday == day) if same_weekday else np.arange(len(source_dates))
+        distance = np.abs(doy[targets, None] - source_doy[None, candidates])
+        distance = np.minimum(distance, 366 - distance)
+        rows[targets] = candidates[distance.argmin(axis=1)]
+    return rows
+
+
+def make_store_sales(sample_df, n_days, store_index, seed=0):
+    """
+    Synthetic sales of one store: `n_days` days ending on the last day of the sample.
+
+    Parameters
+    ----------
+    sample_df : pd.DataFrame
+        The 'inputs' sheet of the sample workbook.
+    n_days : int
+        Number of days.
+    store_index : int
+        Index of the store, which seeds its noise and sets its size.
+    seed : int, optional
+        Seed of the dataset, by default 0.
+
+    Returns
+    -------
+    pd.DataFrame
+        Rows in the layout of the sample workbook.
+    """
+
+    rng = np.random.default_rng([seed, store_index])
+    dates = pd.date_range(end=sample_df['date'].max(), periods=n_days, freq='D')
+    df = sample_df.iloc[_closest_rows(sample_df['date'], dates, same_weekday=True)].reset_index(drop=True)
+    df['date'] = dates
+
+    # stores differ in size, days in noise; orders stay whole
+    factor = 0.6 + 0.8 * rng.random() if store_index > 0 else 1.0
+    noise = rng.lognormal(0.0, 0.08, size=(n_days, 1))
+    df[_SALES_MEASURES] = (df[_SALES_MEASURES].to_numpy() * factor * noise).round(2)
+    df['in_store_orders'] = df['in_store_orders'].round()
+    return df
+
+
+def make_weather(archive_df, start, end, seed=0):
+    """
+    Synthetic weather archive covering `start` to `end`, newest day first like the archive.
+
+    Parameters
+    ----------
+    archive_df : pd.DataFrame
+        Rows of the weather archives, with every column.
+    start, end : pd.Timestamp
+        First and last day.
+    seed : int, optional
+        Seed of the dataset, by default 0.
+
+    Returns
+    -------
+    pd.DataFrame
+        Rows in the layout of the archive.
+    """
+
+    rng = np.random.default_rng([seed, 10_000])
+    archive_df = archive_df.dropna(subset=['avg_temperature']).reset_index(drop=True)
+    dates = pd.date_range(start, end, freq='D')[::-1]
+    df = archive_df.iloc[_closest_rows(archive_df['date'], dates, same_weekday=False)].reset_index(drop=True)
+    df['date'] = dates.strftime('%Y-%m-%d')
+    df['avg_temperature'] = (df['avg_temperature'] + rng.normal(0.0, 1.5, len(df))).round(2)
+    return df
+
+
+def write_dataset(scale, n_stores=None, data_dir=DATA_DIR, seed=0):
+    """
+    Write the synthetic dataset at a scale, replacing a previous one.
+
+    Parameters
+    ----------
+    scale : int
+        Number of days relative to the sample.
+    n_stores : int, optional
+        Number of stores, by default DEFAULT_STORES (or one store per 100x).
+    data_dir : str, optional
+        Directory of the datasets, by default 'benchmarks/data'.
+    seed : int, optional
+        Seed of the dataset, by default 0.
+
+    Returns
+    -------
+    dict
+        Description of the dataset: scale, stores, days per store, sales rows and weather rows.
+    """
+
+    if not os.path.exists(SAMPLE_WORKBOOK):
+        raise FileNotFoundError(f"{SAMPLE_WORKBOOK} does not exist")
+
+    n_stores = n_stores or DEFAULT_STORES.get(scale, max(1, scale // 100))
+    sample_df = pd.read_excel(SAMPLE_WORKBOOK, sheet_name='inputs')
+    n_days = max(1, round(scale * len(sample_df) / n_stores))
+
+    root = dataset_dir(scale, data_dir)
+    if os.path.exists(root):
+        shutil.rmtree(root)
+
+    start = sample_df['date'].max()
+    for store_index, store in enumerate(store_names(n_stores)):
+        sales_df = make_store_sales(sample_df, n_days, store_index, seed)
+        store_dir = os.path.join(root, 'data', 'inputs', 'sales', store)
+        os.makedirs(store_dir)
+        # one workbook per year, as the cafe exports them
+        for year, year_df in sales_df.groupby(sales_df['date'].dt.year):
+            year_df.to_excel(os.path.join(store_dir, f'sales_{year}.xlsx'), sheet_name='inputs', index=False)
+        start = min(start, sales_df['date'].min())
+
+    archive_df = pd.concat([pd.read_csv(path, parse_dates=['date']) for path in sorted(glob.glob(WEATHER_ARCHIVES))],
+                           ignore_index=True)
+    weather_df = make_weather(archive_df, start - pd.Timedelta(days=7), archive_df['date'].max(), seed)
+    weather_dir = os.path.join(root, 'data', 'inputs', 'weather')
+    os.makedirs(weather_dir)
+    weather_df.to_csv(os.path.join(weather_dir, 'weatherstats_synthetic_daily.csv'), index=False)
+
+    return {'scale': scale, 'stores': n_stores, 'days_per_store': n_days,
+            'sales_rows': n_days * n_stores, 'weather_rows': len(weather_df)}
+
+
+@click.command()
+@click.option('--scale', 'scales', type=int, multiple=True, default=(1, 10), show_default=True, help='Scale of a dataset (repeatable)')
+@click.option('--stores', type=int, default=None, help='Number of stores of every dataset, by default 1, 2, 5 and 10 stores at 1x, 10x, 100x and 1000x')
+@click.option('--data-dir', type=str, default=DATA_DIR, show_default=True, help='Directory of the datasets')
+@click.option('--seed', type=int, default=0, show_default=True, help='Seed of the datasets')
+def main(scales, stores, data_dir, seed):
+
+    for scale in scales:
+        info = write_dataset(scale, stores, data_dir, seed)
+        print(f"Successfully generated the {scale}x dataset in {dataset_dir(scale, data_dir)}: "
+              f"{info['stores']} store(s) x {info['days_per_store']:,} days, {info['weather_rows']:,} weather days")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+This script runs a rolling-origin backtest of every forecast target in `src/model_config.TARGETS`
+on the combined dataset of one store: at every origin, the pipelines are trained on all days
+before it and forecast the following days. The linear regressions update their sums of
+squares and cross-products from one origin to the next instead of being refitted; the
+origins are spread over worker processes.
+
+Outputs:
+    - `results/<store>/backtest.parquet`: MAE and mean error of every target per forecast origin
+      and day of the week, read by the diagnostics pages.
+
+Usage:
+    To be called with 'make all' command.
+    python scripts/backtest.py --store downtown --horizon 14 --n-jobs 4
+"""
+
+import os
+import sys
+import click
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.backtest import backtest
+from src.instrumentation import set_timing_context, timed
+from src.storage import read_table, write_table
+from src.stores import DEFAULT_STORE, store_path
+
+@click.command()
+@click.option('--store', type=str, default=DEFAULT_STORE, show_default=True, help='Store whose forecasts are backtested')
+@click.option('--min-train', type=int, default=120, show_default=True, help='Number of days before the first origin')
+@click.option('--horizon', type=int, default=7, show_default=True, help='Number of days forecast from each origin')
+@click.option('--step', type=int, default=1, show_default=True, help='Number of days between consecutive origins')
+@click.option('--n-jobs', type=int, default=None, help='Number of worker processes, by default the number of CPUs')
+def main(store, min_train, horizon, step, n_jobs):
+
+    set_timing_context('backtest', store=store)
+
+    combined_path = store_path('combined', store)
+    backtest_path = store_path('results', store, 'backtest.parquet')
+
+    if not os.path.exists(combined_path):
+        raise FileNotFoundError(f"{combined_path} does not exist")
+
+    os.makedirs(store_path('results', store), exist_ok=True)
+
+    with timed('read'):
+        combined_df = read_table(combined_path, index_col='date').sort_index()
+    # refits and forecasts of every origin
+    with timed('fit'):
+        backtest_df = backtest(combined_df, min_train=min_train, horizon=horizon, step=step, n_jobs=n_jobs)
+    with timed('write'):
+        write_table(backtest_df, backtest_path)
+
+    print(f"Successfully backtested {backtest_df['origin'].nunique()} forecast origins for store {store}!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+This script bootstraps the trained pipeline of every forecast target of one store in `model/<store>/`
+over the store's train dataset (see `src/prediction_intervals.py`) and saves the bootstrap
+coefficients, from which the dashboard computes prediction intervals next to the forecasts.
+
+The coverage of the intervals on the test dataset is printed as a check.
+
+Outputs:
+    - 'model/<store>/lr_pipe_total_sales_intervals.npz': Bootstrap intervals for total sales
+    - 'model/<store>/lr_pipe_item_A_sales_intervals.npz': Bootstrap intervals for item A sales
+    - 'model/<store>/lr_pipe_item_B_sales_intervals.npz': Bootstrap intervals for item B sales
+    - 'model/<store>/pr_pipe_orders_intervals.npz': Bootstrap intervals for daily order volumes
+
+Usage:
+    To be called with 'make all' command.
+    python scripts/export_intervals.py --store downtown --n-boot 2000
+"""
+
+import os
+import sys
+import numpy as np
+import click
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.forecast_batch import load_pipelines
+from src.instrumentation import set_timing_context, timed
+from src.model_config import FEATURES, TARGETS, model_path
+from src.prediction_intervals import bootstrap_intervals, intervals_path
+from src.storage import read_table
+from src.stores import DEFAULT_STORE, store_path
+
+@click.command()
+@click.option('--store', type=str, default=DEFAULT_STORE, show_default=True, help='Store whose pipelines are bootstrapped')
+@click.option('--n-boot', type=int, default=1000, show_default=True, help='Number of bootstrap resamples')
+@click.option('--seed', type=int, default=0, show_default=True, help='Seed of the resampling')
+@click.option('--level', type=float, default=0.8, show_default=True, help='Coverage of the intervals checked on the test dataset')
+def main(store, n_boot, seed, level):
+
+    set_timing_context('export_intervals', store=store)
+
+    target_columns = list(dict.fromkeys(config['target'] for config in TARGETS.values()))
+    with timed('read'):
+        train_df = read_table(store_path('train', store), columns=FEATURES + target_columns, index_col='date')
+        test_df = read_table(store_path('test', store), columns=FEATURES + target_columns)
+        records = test_df[FEATURES].to_dict(orient='records')
+        pipelines = load_pipelines(store=store)
+
+    for name, pipeline in pipelines.items():
+        target = TARGETS[name]['target']
+        path = intervals_path(model_path(name, store))
+        with timed('fit', target=name):
+            intervals = bootstrap_intervals(pipeline, train_df, target, n_boot=n_boot, seed=seed)
+        with timed('write', target=name):
+            intervals.save(path)
+
+        with timed('predict', target=name):
+            bounds = np.array([intervals.interval(record, level) for record in records])
+        actual = test_df[target].to_numpy()
+        coverage = np.mean((actual >= bounds[:, 0]) & (actual <= bounds[:, 1]))
+        print(f"Successfully exported prediction intervals for {name} to {path}! "
+              f"({level:.0%} intervals cover {coverage:.0%} of the test days)")
+
+if __name__ == "__main__":
+    main()
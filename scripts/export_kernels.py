@@ -0,0 +1,72 @@
+"""
+This script compiles every trained pipeline of one store in `model/<store>/` into a compact NumPy scoring
+kernel (see `src/scoring_kernel.py`) for microsecond single-row inference.
+
+Before a kernel is written, its predictions on the test dataset are checked against the
+sklearn pipeline, both row by row and vectorized; a kernel that fails the check is not
+written, so the dashboard keeps serving the previous one.
+
+Outputs:
+    - 'model/<store>/lr_pipe_total_sales.npz': Scoring kernel for total sales
+    - 'model/<store>/lr_pipe_item_A_sales.npz': Scoring kernel for item A sales
+    - 'model/<store>/lr_pipe_item_B_sales.npz': Scoring kernel for item B sales
+    - 'model/<store>/pr_pipe_orders.npz': Scoring kernel for daily order volumes
+
+Usage:
+    To be called with 'make all' command.
+    python scripts/export_kernels.py --benchmark --store downtown
+"""
+
+import os
+import sys
+import timeit
+import numpy as np
+import click
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.forecast_batch import load_pipelines
+from src.instrumentation import set_timing_context, timed
+from src.model_config import FEATURES, model_path
+from src.scoring_kernel import compile_pipeline, kernel_path
+from src.storage import read_table
+from src.stores import DEFAULT_STORE, store_path
+
+@click.command()
+@click.option('--store', type=str, default=DEFAULT_STORE, show_default=True, help='Store whose pipelines are compiled')
+@click.option('--test-path', type=str, default=None, help='Rows used for the parity check, by default the test dataset of the store')
+@click.option('--rtol', type=float, default=1e-9, show_default=True, help='Relative tolerance of the parity check')
+@click.option('--benchmark', is_flag=True, help='Also time single-row predictions of the pipeline and the kernel')
+def main(store, test_path, rtol, benchmark):
+
+    set_timing_context('export_kernels', store=store)
+
+    test_path = store_path('test', store) if test_path is None else test_path
+    with timed('read'):
+        test_df = read_table(test_path, columns=FEATURES)
+        records = test_df.to_dict(orient='records')
+        pipelines = load_pipelines(store=store)
+
+    for name, pipeline in pipelines.items():
+        path = kernel_path(model_path(name, store))
+        with timed('compile', target=name):
+            kernel = compile_pipeline(pipeline)
+
+        with timed('predict', target=name):
+            expected = pipeline.predict(test_df)
+            np.testing.assert_allclose(kernel.predict(test_df), expected, rtol=rtol, atol=1e-9, err_msg=f"{name}: vectorized kernel differs from pipeline")
+            np.testing.assert_allclose([kernel.predict_one(record) for record in records], expected, rtol=rtol, atol=1e-9, err_msg=f"{name}: single-row kernel differs from pipeline")
+
+        with timed('write', target=name):
+            kernel.save(path)
+
+        print(f"Successfully exported scoring kernel for predicting {name} to {path}!")
+
+        if benchmark:
+            row, record = test_df.iloc[[0]], records[0]
+            pipeline_us = min(timeit.repeat(lambda: pipeline.predict(row), number=200, repeat=3)) / 200 * 1e6
+            kernel_us = min(timeit.repeat(lambda: kernel.predict_one(record), number=20_000, repeat=3)) / 20_000 * 1e6
+            print(f"    single row: pipeline {pipeline_us:,.1f} us, kernel {kernel_us:,.2f} us ({pipeline_us / kernel_us:,.0f}x)")
+
+if __name__ == "__main__":
+    main()
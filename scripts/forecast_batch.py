@@ -0,0 +1,58 @@
+"""
+This script forecasts total sales, item A sales, item B sales and order volumes for many
+days or scenarios at once with the trained pipelines of one store in `model/<store>/`, and
+streams the results to a Parquet file.
+
+Scenarios are either read from a CSV/Parquet file with the columns `date`, `hours_opened`,
+`avg_temperature`, `rain`, `snow` (and optionally `is_long_weekend`, `is_HCF`, `is_holiday`),
+or generated for every combination of the dates in a horizon and the given input values.
+
+Outputs:
+    - `results/<store>/forecast_batch.parquet` (default): One row per scenario with a
+      `forecast_<name>` column per model.
+
+Usage:
+    python scripts/forecast_batch.py --start-date 2025-06-01 --days 14 --temperature 18
+    python scripts/forecast_batch.py --start-date 2025-06-01 --days 30 --hours 8 --hours 10 --hours 12 --store main
+    python scripts/forecast_batch.py --scenarios planned_days.csv --output results/planned_days.parquet
+"""
+
+import os
+import sys
+import pandas as pd
+import click
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.forecast_batch import load_pipelines, make_horizon, write_forecasts
+from src.stores import DEFAULT_STORE, store_path
+
+@click.command()
+@click.option('--scenarios', type=click.Path(exists=True, dir_okay=False), help='CSV or Parquet file of scenarios')
+@click.option('--start-date', type=str, help='First day of the forecast horizon')
+@click.option('--days', type=int, default=14, show_default=True, help='Number of days in the horizon')
+@click.option('--hours', type=int, multiple=True, default=[11], show_default=True, help='Store opening hours (repeatable)')
+@click.option('--temperature', type=float, multiple=True, default=[5], show_default=True, help='Forecasted temperature (repeatable)')
+@click.option('--rain', type=float, multiple=True, default=[5], show_default=True, help='Forecasted rain level (repeatable)')
+@click.option('--snow', type=float, multiple=True, default=[0], show_default=True, help='Forecasted snow level (repeatable)')
+@click.option('--store', type=str, default=DEFAULT_STORE, show_default=True, help='Store whose pipelines are used')
+@click.option('--output', type=str, default=None, help='Output Parquet file, by default results/<store>/forecast_batch.parquet')
+@click.option('--chunk-size', type=int, default=100_000, show_default=True, help='Scenarios scored per batch')
+def main(scenarios, start_date, days, hours, temperature, rain, snow, store, output, chunk_size):
+
+    if scenarios is not None:
+        if scenarios.endswith('.parquet'):
+            scenario_df = pd.read_parquet(scenarios)
+        else:
+            scenario_df = pd.read_csv(scenarios, parse_dates=['date'])
+    elif start_date is not None:
+        scenario_df = make_horizon(start_date, days, hours_opened=hours, avg_temperature=temperature, rain=rain, snow=snow)
+    else:
+        raise click.UsageError("Provide either --scenarios or --start-date.")
+
+    output = store_path('results', store, 'forecast_batch.parquet') if output is None else output
+    n_forecasts = write_forecasts(scenario_df, output, pipelines=load_pipelines(store=store), chunk_size=chunk_size)
+    print(f"Successfully forecasted {n_forecasts:,} scenarios to {output}!")
+
+if __name__ == "__main__":
+    main()
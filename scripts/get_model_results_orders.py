@@ -1,17 +1,17 @@
 """
 This script loads the preprocessed training and test datasets, and the trained
 Poisson Regression model pipeline for order volumes. It evaluates model performance, extracts feature
-coefficients, computes prediction errors, and generates graph to assess model fit.
+coefficients, computes prediction errors, and saves the fitted series used to assess model fit.
 
 Outputs:
-    - `results/trained_coef_orders.csv`: Sorted list of model coefficients.
-    - `results/mae_grouped_orders.csv`: MAE and error percentage by day of week.
-    - `results/pr_plot_orders.pkl`: Plotly figure showing model predictions vs. actuals.
-    - `results/resid_fit_plot_orders.pkl`: Residuals vs. fitted values plot.
-    - `results/resid_dist_plot_orders.pkl`: Distribution of residuals.
+    - `results/<store>/trained_coef_orders.csv`: Sorted list of model coefficients.
+    - `results/<store>/mae_grouped_orders.csv`: MAE and error percentage by day of week.
+    - `results/<store>/fit_series_orders.parquet`: Actuals, predictions and residuals of the train and test
+      periods, plotted by the diagnostics page.
 
 Usage:
     To be called with 'make all' command. 
+    python scripts/get_model_results_orders.py --store downtown
 
 """
 
@@ -21,19 +21,27 @@ import numpy as np
 import pandas as pd
 import pickle
 import click
-import plotly.express as px
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
 from sklearn.metrics import mean_squared_error, mean_absolute_error
+from src.diagnostics_plots import write_fit_series
+from src.instrumentation import set_timing_context, timed
+from src.storage import read_table
+from src.stores import DEFAULT_STORE, store_path
+
+@click.command()
+@click.option('--store', type=str, default=DEFAULT_STORE, show_default=True, help='Store whose model is evaluated')
+def main(store):
 
-def main():
+    set_timing_context('get_model_results_orders', store=store)
 
-    train_df_path = 'data/modelling/train.csv'
-    test_df_path = 'data/modelling/test.csv'
-    model_path = 'model/pr_pipe_orders.pkl'
-    coef_df_path = 'results/trained_coef_orders.csv'
-    mae_grouped_df_path = 'results/mae_grouped_orders.csv'
-    pr_plot_path = 'results/pr_plot_orders.pkl'
-    resid_fit_plot_path = 'results/resid_fit_plot_orders.pkl'
-    resid_dist_plot_path = 'results/resid_dist_plot_orders.pkl'
+    train_df_path = store_path('train', store)
+    test_df_path = store_path('test', store)
+    model_path = store_path('models', store, 'pr_pipe_orders.pkl')
+    coef_df_path = store_path('results', store, 'trained_coef_orders.csv')
+    mae_grouped_df_path = store_path('results', store, 'mae_grouped_orders.csv')
+    fit_series_path = store_path('results', store, 'fit_series_orders.parquet')
 
     if not os.path.exists(train_df_path):
         raise FileNotFoundError(f"{train_df_path} does not exist")
@@ -41,9 +49,13 @@ def main():
     if not os.path.exists(test_df_path):
         raise FileNotFoundError(f"{test_df_path} does not exist")
 
+    os.makedirs(store_path('results', store), exist_ok=True)
+
     # reading in data 
-    train_df = pd.read_csv(train_df_path, index_col=0, parse_dates=True)
-    test_df = pd.read_csv(test_df_path, index_col=0, parse_dates=True)
+    columns = ['hours_opened', 'avg_temperature', 'rain', 'snow', 'is_long_weekend', 'is_HCF', 'season', 'day_of_week', 'is_holiday', 'in_store_orders']
+    with timed('read'):
+        train_df = read_table(train_df_path, columns=columns, index_col='date')
+        test_df = read_table(test_df_path, columns=columns, index_col='date')
 
     X_train = train_df.drop(columns=['in_store_orders'])
     y_train = train_df['in_store_orders']
@@ -52,7 +64,7 @@ def main():
     y_test = test_df['in_store_orders']
 
     # load trained model
-    with open(model_path, 'rb') as f:
+    with timed('load model'), open(model_path, 'rb') as f:
         pr_pipe = pickle.load(f)
 
     # prepare coefficient df
@@ -70,7 +82,8 @@ def main():
     coef_df.to_csv(coef_df_path, index=False)
 
     # prepare MAE by day of the week df 
-    y_pred = pr_pipe.predict(X_test)
+    with timed('predict', split='test'):
+        y_pred = pr_pipe.predict(X_test)
 
     pred_results = test_df.copy()
     pred_results['y_pred'] = y_pred
@@ -84,46 +97,12 @@ def main():
 
     mae_grouped_df.to_csv(mae_grouped_df_path)
 
-    # prepare prediction vs actual graph 
-    y_train_pred = pr_pipe.predict(X_train)
-    y_train_for_plot = pd.DataFrame(y_train).assign(label='train')
-    y_test_for_plot = pd.DataFrame(y_test).assign(label='test')
-    pr_pred_for_plot = pd.DataFrame(y_pred, columns=['in_store_orders'], index=y_test.index).assign(label='test_prediction')
-    y_train_pred_for_plot = pd.DataFrame(y_train_pred, columns=['in_store_orders'], index=y_train.index).assign(label='train_prediction')
-
-    custom_colors = {
-    'train': '#1f77b4',
-    'test': '#d62728',
-    'test_prediction': '#8bc34a',
-    'train_prediction': '#4caf50'
-    }
-
-    pr_plot_fig = px.line(pd.concat((y_train_for_plot, y_test_for_plot, y_train_pred_for_plot, pr_pred_for_plot)), 
-        y="in_store_orders",
-        color='label', 
-        color_discrete_map=custom_colors
-        )
-
-    with open(pr_plot_path, 'wb') as f: 
-        pickle.dump(pr_plot_fig, f)
-
-    # prepare residual vs. fitted plot 
-    train_results_df = train_df[['in_store_orders']].copy()
-    train_results_df['predicted'] = y_train_pred
-    train_results_df['resid'] = train_results_df['in_store_orders'] - train_results_df['predicted']
-
-    resid_fig = px.scatter(x=train_results_df['predicted'], y=train_results_df['resid'], width=650)
-    resid_fig.add_hline(y=0, line_dash='dash', line_color='red')
-
-    with open(resid_fit_plot_path, 'wb') as f:
-        pickle.dump(resid_fig, f)
-
-    # prepare residual distribution plot 
-    resid_dist_fig = px.histogram(train_results_df, x='resid', marginal='violin', nbins=35, width=650)
-
-    with open(resid_dist_plot_path, 'wb') as f:
-        pickle.dump(resid_dist_fig, f)
-    
+    # save actuals, predictions and residuals for the diagnostics plots
+    with timed('predict', split='train'):
+        y_train_pred = pr_pipe.predict(X_train)
+    with timed('write'):
+        write_fit_series(fit_series_path, y_train, y_train_pred, y_test, y_pred)
+
     print("Successfully generated results for orders prediction!")
 
 if __name__ == "__main__":
@@ -0,0 +1,49 @@
+"""
+This script starts a local HTTP prediction server around the trained pipelines of one store
+in `model/<store>/`.
+The pipelines are loaded once and kept warm; concurrent requests are grouped into
+micro-batches and scored with one vectorized `predict` call per pipeline.
+
+Endpoints:
+    - `POST /predict`: forecasts total sales, item A sales, item B sales and order volumes.
+    - `GET /metrics`: request count, p50/p99 latency and micro-batch sizes.
+    - `GET /health`: liveness check.
+
+Usage:
+    python scripts/prediction_server.py --port 8502 --store main
+    curl -X POST localhost:8502/predict -d '{"date": "2025-06-01", "hours_opened": 11, "avg_temperature": 18, "rain": 0, "snow": 0}'
+"""
+
+import os
+import sys
+import click
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.forecast_batch import load_pipelines
+from src.prediction_service import LatencyStats, MicroBatcher, make_server
+from src.stores import DEFAULT_STORE
+
+@click.command()
+@click.option('--host', type=str, default='127.0.0.1', show_default=True, help='Interface to bind')
+@click.option('--port', type=int, default=8502, show_default=True, help='Port to listen on')
+@click.option('--max-batch-rows', type=int, default=512, show_default=True, help='Maximum scenarios per micro-batch')
+@click.option('--max-wait-ms', type=float, default=5.0, show_default=True, help='Longest wait for a micro-batch to fill')
+@click.option('--store', type=str, default=DEFAULT_STORE, show_default=True, help='Store whose pipelines are served')
+def main(host, port, max_batch_rows, max_wait_ms, store):
+
+    stats = LatencyStats()
+    batcher = MicroBatcher(load_pipelines(store=store), max_batch_rows=max_batch_rows, max_wait_ms=max_wait_ms, stats=stats)
+    server = make_server(host, port, batcher, stats)
+
+    print(f"Serving forecasts on http://{host}:{port} (POST /predict, GET /metrics)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        batcher.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,25 @@
 """
-This script loads the preprocessed sales and weather data, merge them by date, engineer
+This script loads the preprocessed sales of one store and the weather data, merge them by date, engineer
 features for model-training, validate data types and strcuture, drop unusual days, and peform 
 train/test split. 
 
+Weather days missing from the primary station are interpolated when the gap is short and
+otherwise taken from the fallback stations (see `src/weather_join.join_weather`).
+
 Outputs:
-    - `data/processed/combined.csv`: Cleaned and feature-enhanced dataset.
-    - `data/modelling/train.csv`: Training dataset (all but last 30 days).
-    - `data/modelling/test.csv`: Test dataset (last 30 days).
+    - `data/processed/<store>/weather_gaps.csv`: Gaps of the primary station's weather and how they were filled.
+    - `data/processed/<store>/combined.parquet`: Cleaned and feature-enhanced dataset.
+    - `data/processed/<store>/aggregate_cube.parquet`: Daily sales aggregated by type of day, day of week,
+      month, HCF and holiday for the analytics page, updated from its last month on (see `src/aggregate_cube.py`).
+      Rebuilt from all days when the days of earlier months changed (e.g. sales restated with
+      `prepare_sales.csv.py --full-refresh` or other weather fills).
+    - `data/processed/<store>/aggregate_cube_history.json`: Hash of the days the kept cube cells are built from.
+    - `data/modelling/<store>/train.parquet`: Training dataset (all but last 30 days).
+    - `data/modelling/<store>/test.parquet`: Test dataset (last 30 days).
 
 Usage:
     To be called with 'make all' command. 
+    python scripts/prepare_combined.csv.py --store downtown
 
 """
 
@@ -17,59 +27,108 @@ import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-import numpy as np
-import pandas as pd
-from src.data_validation import _validate_combined_df
-from src.feature_functions import *
-
-def main():
-
-    sales_df=pd.read_csv('data/processed/sales.csv', parse_dates=['date'])
-    weather_df=pd.read_csv('data/processed/weather.csv', parse_dates=['date'])
+import glob
+import json
+import click
+from src.data_validation import _validate_combined_df, validate_partitions
+from src.feature_functions import build_features
+from src.aggregate_cube import history_fingerprint, update_cube
+from src.instrumentation import set_timing_context, timed
+from src.storage import atomic_open, read_table, write_table
+from src.stores import DEFAULT_STORE, store_path
+from src.weather_join import INTERPOLATION_METHODS, covers, join_weather
+
+# sales partitions that passed validation in earlier runs are not validated again; one cache
+# per store, as stores are prepared in parallel
+VALIDATION_CACHE = '.validation_cache/{store}.json'
+
+@click.command()
+@click.option('--store', type=str, default=DEFAULT_STORE, show_default=True, help='Store whose sales are combined')
+@click.option('--max-gap', type=int, default=3, show_default=True, help='Longest run of missing weather days that is interpolated')
+@click.option('--interpolation', type=click.Choice(INTERPOLATION_METHODS), default='linear', show_default=True, help='Interpolation of short weather gaps')
+@click.option('--rebuild-cube', is_flag=True, help='Rebuild the aggregate cube from all days, even if the days of past months did not change')
+def main(store, max_gap, interpolation, rebuild_cube):
+
+    set_timing_context('prepare_combined', store=store)
+
+    sales_path = store_path('sales', store)
+    gap_report_path = store_path('weather_gaps', store)
+
+    with timed('validate', table='sales'):
+        validate_partitions(sales_path, 'sales', VALIDATION_CACHE.format(store=store))
+
+    with timed('read'):
+        sales_df=read_table(sales_path)
+        weather_df=read_table('data/processed/weather.parquet')
+        fallback_stations={os.path.splitext(os.path.basename(path))[0]: read_table(path)
+                           for path in sorted(glob.glob('data/processed/weather_fallback/*.parquet'))}
 
     start_date=sales_df['date'].min()
     end_date=sales_df['date'].max()
 
-    if not start_date in weather_df['date'].values:
-        return (f'Sales start date {start_date.date()} not in weather data. Please double weather data range.')
-    
-    if not end_date in weather_df['date'].values:
-        return (f'Sales end date {end_date.date()} not in weather data. Please double check weather data range.')
+    if not covers(weather_df, start_date, start_date):
+        raise ValueError(f'Sales start date {start_date.date()} not in weather data. Please double check weather data range.')
 
-    condition = weather_df['date'].between(start_date, end_date)
-    weather_df = weather_df[condition]
+    if not covers(weather_df, end_date, end_date):
+        raise ValueError(f'Sales end date {end_date.date()} not in weather data. Please double check weather data range.')
 
-    combined_df = pd.merge(sales_df, weather_df, on='date', how='left')
+    with timed('weather join'):
+        combined_df, gap_report = join_weather(sales_df, weather_df, fallback_stations, max_gap=max_gap, method=interpolation)
 
-    # create features 
-    combined_df['is_long_weekend']=is_long_weekend(combined_df['type_of_day'])
-    combined_df['is_HCF']=is_HCF(combined_df['HCF_sales'])
-    combined_df['is_holiday']=is_holiday(combined_df['type_of_day'])
-    combined_df['season']=get_season(combined_df['date'])
-    combined_df['day_of_week']=combined_df['date'].dt.day_name()
+    os.makedirs(os.path.dirname(gap_report_path), exist_ok=True)
+    gap_report.to_csv(gap_report_path, index=False)
+    unresolved = gap_report[gap_report['filled_by'] == '']
+    if len(gap_report):
+        print(f"{len(gap_report)} weather gap(s) in the sales period, {len(unresolved)} left unfilled (see {gap_report_path})")
+    if len(unresolved):
+        print(unresolved.to_string(index=False))
 
-    # set categories
-    combined_df['day_of_week'] = pd.Categorical(combined_df['day_of_week'], categories=['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'])
-    combined_df['season'] = pd.Categorical(combined_df['season'], categories=['Winter', 'Spring', 'Summer', 'Fall'])
+    # create features 
+    with timed('features'):
+        combined_df = build_features(combined_df)
 
     # data validation
-    _validate_combined_df(combined_df)
+    with timed('validate', table='combined'):
+        _validate_combined_df(combined_df)
 
     # drop unusual days
     unusual_days=combined_df[combined_df['type_of_day']=='Unusual'].index.to_list()
     combined_df=combined_df.drop(index=unusual_days)
 
-    combined_df.to_csv('data/processed/combined.csv', index=False)
-    print("Successfully generated combined.csv!")
+    with timed('write', table='combined'):
+        write_table(combined_df, store_path('combined', store))
+    print("Successfully generated combined.parquet!")
+
+    # aggregate cube of the analytics page: only the months with new days are re-aggregated,
+    # unless the days of earlier months changed since the cube was written (e.g. restated sales)
+    cube_path, history_path = store_path('cube', store), store_path('cube_history', store)
+    with timed('cube'):
+        daily_df = combined_df.set_index('date')
+        cube = read_table(cube_path) if os.path.exists(cube_path) and not rebuild_cube else None
+        if cube is not None and not cube.empty:
+            history = {}
+            if os.path.exists(history_path):
+                with open(history_path) as f:
+                    history = json.load(f)
+            last_month = cube['month'].max()
+            if history != {'before': f'{last_month:%Y-%m-%d}', 'sha256': history_fingerprint(daily_df, last_month)}:
+                print(f"Days before {last_month:%Y-%m} changed since the aggregate cube was built, rebuilding it.")
+                cube = None
+        cube = update_cube(cube, daily_df)
+        write_table(cube, cube_path)
+        last_month = cube['month'].max()
+        with atomic_open(history_path, 'w') as f:
+            json.dump({'before': f'{last_month:%Y-%m-%d}', 'sha256': history_fingerprint(daily_df, last_month)}, f, indent=2)
 
     # train, test split
     train_df=combined_df.iloc[:-30]
     test_df=combined_df.iloc[-30:]
     
-    train_df.to_csv('data/modelling/train.csv', index=False)
-    test_df.to_csv('data/modelling/test.csv', index=False)
+    with timed('write', table='train and test'):
+        write_table(train_df, store_path('train', store))
+        write_table(test_df, store_path('test', store))
 
-    print("Successfully generated train and test csv!")
+    print("Successfully generated train and test parquet!")
 
 if __name__ == "__main__":
     main()
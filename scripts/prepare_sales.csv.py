@@ -1,44 +1,133 @@
 """
-This script reads the first available Excel file from the `data/inputs/sales/` directory, 
-validates its structure and data types, rounds numeric columns to two decimal places, 
-and exports the result as a CSV file for downstream processing.
+This script incrementally ingests every Excel file of one store in the `data/inputs/sales/<store>/`
+directory. Only rows dated after the last ingested date (the watermark) are tagged with the
+store id, validated, rounded to two decimal places and appended to the store's month-partitioned
+Parquet store for downstream processing. Workbooks whose content has not changed since the last
+run (same SHA-256 hash, whatever their modification time, e.g. in a fresh checkout) are not read
+at all.
+
+Rows of a new or re-exported workbook dated on or before the watermark are ignored (with a
+message giving their number), even if their values changed: run with `--full-refresh` to ingest
+back-dated or corrected past days.
 
 Outputs:
-    - `data/processed/sales.csv`: Cleaned sales dataset for downstream use.
+    - `data/processed/sales/<store>/`: Cleaned sales dataset for downstream use, partitioned by month.
+    - `data/processed/sales/<store>/_watermark.json`: Last ingested date and the ingested workbooks.
+    - `data/processed/<store>/rollups.parquet`: Weekly and monthly sales rollups for the trend charts of the
+      sales monitor, updated in the buckets of the new days only (see `src/rollups.py`).
 
 Usage:
-    To be called with 'make all' command. 
+    To be called with 'make all' command.
+    python scripts/prepare_sales.csv.py --store downtown
+    Run with `--full-refresh` to discard the store and re-ingest all workbooks.
 """
 
 import os
 import sys
+import shutil
 import numpy as np
 import pandas as pd
 import glob
-#import click
+import click
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.data_validation import _validate_excel_df
+from src.instrumentation import set_timing_context, timed
+from src.rollups import build_rollups, update_rollups
+from src.storage import append_partitions, content_hash, read_table, read_watermark, write_table, write_watermark
+from src.stores import DEFAULT_STORE, store_path
+
+def _fingerprint(path):
+    # content hash rather than mtime, which differs between checkouts of the same workbook
+    return {'sha256': content_hash(path)}
+
+def _write_rollups(store, new_df=None):
+    # rollups of the trend charts: the new days are added to their buckets, the first run rolls up every day
+    rollups_path = store_path('rollups', store)
+    if new_df is not None and os.path.exists(rollups_path):
+        rollups = update_rollups(read_table(rollups_path), new_df.set_index('date'))
+    else:
+        rollups = build_rollups(read_table(store_path('sales', store), index_col='date'))
+    write_table(rollups, rollups_path)
+
+@click.command()
+@click.option('--store', type=str, default=DEFAULT_STORE, show_default=True, help='Store whose workbooks are ingested')
+@click.option('--full-refresh', is_flag=True, help='Rebuild the sales store from all workbooks, re-ingesting days on or before the watermark')
+def main(store, full_refresh):
 
-# @click.command()
-# @click.option('--excel_file', type=str, required=True, help='Excel file name')
-# @click.option('--sheet', type=str, required=True, help='Excel sheet name')
-def main():
+    set_timing_context('prepare_sales', store=store)
 
-    excel_file_list = glob.glob("data/inputs/sales/*.xlsx")
-    destination_path = "data/processed/sales.csv"
+    excel_file_list = sorted(glob.glob(os.path.join(store_path('sales_inputs', store), "*.xlsx")))
+    destination_path = store_path('sales', store)
 
     if len(excel_file_list) == 0:
-        raise FileNotFoundError("No sales data found in inputs/sales.")
+        raise FileNotFoundError(f"No sales data found in inputs/sales/{store}.")
+
+    if full_refresh and os.path.exists(destination_path):
+        shutil.rmtree(destination_path)
+        if os.path.exists(store_path('rollups', store)):
+            os.remove(store_path('rollups', store))
+
+    watermark = read_watermark(destination_path)
+    last_date = pd.Timestamp(watermark['last_date']) if 'last_date' in watermark else None
+    workbooks = watermark.get('workbooks', {})
+
+    new_rows = []
+    for excel_file in excel_file_list:
+        fingerprint = _fingerprint(excel_file)
+
+        # workbook unchanged since the last run, nothing new to ingest
+        if workbooks.get(excel_file) == fingerprint:
+            continue
 
-    excel_df = pd.read_excel(excel_file_list[0], sheet_name='inputs')
-    
-    _validate_excel_df(excel_df)
+        with timed('read', workbook=os.path.basename(excel_file)):
+            excel_df = pd.read_excel(excel_file, sheet_name='inputs')
+        if last_date is not None:
+            ignored = int((excel_df['date'] <= last_date).sum())
+            # a watermark written before content hashes re-reads its workbooks once, their days are already ingested
+            if ignored and 'mtime_ns' not in workbooks.get(excel_file, {}):
+                status = 'changed' if excel_file in workbooks else 'is new'
+                print(f"{excel_file} {status}: ignored {ignored} days on or before the watermark ({last_date:%Y-%m-%d}), "
+                      "run with --full-refresh to ingest them.")
+            excel_df = excel_df[excel_df['date'] > last_date]
+
+        new_rows.append(excel_df)
+        workbooks[excel_file] = fingerprint
+
+    new_rows = [excel_df for excel_df in new_rows if len(excel_df) > 0]
+
+    if len(new_rows) == 0:
+        write_watermark(destination_path, {**watermark, 'workbooks': workbooks})
+        if 'last_date' in watermark and not os.path.exists(store_path('rollups', store)):
+            _write_rollups(store)
+        print("No new sales data to ingest.")
+        return
+
+    # later workbooks take precedence for days present in several workbooks
+    excel_df = pd.concat(new_rows, ignore_index=True)
+    excel_df = excel_df.drop_duplicates(subset='date', keep='last').sort_values('date', ignore_index=True)
+
+    # small workbooks store whole-number columns as integers, keep partitions on one schema
+    float_columns = ['tips_normalized', 'total_sales_normalized', 'in_store_orders', 'item_A_sales', 'item_B_sales', 'item_C_sales', 'HCF_sales']
+    excel_df[float_columns] = excel_df[float_columns].astype(float)
+
+    excel_df.insert(0, 'store_id', store)
+
+    with timed('validate'):
+        _validate_excel_df(excel_df)
 
     excel_df[excel_df.select_dtypes(include='number').columns] = excel_df.select_dtypes(include='number').round(2)
-    excel_df.to_csv(destination_path, index=False)
-    print("Successfully generated sales.csv!")
+    with timed('write'):
+        append_partitions(excel_df, destination_path)
+    with timed('rollups'):
+        _write_rollups(store, excel_df)
+
+    write_watermark(destination_path, {
+        'last_date': excel_df['date'].max().strftime('%Y-%m-%d'),
+        'workbooks': workbooks
+    })
+    print(f"Successfully ingested {len(excel_df)} new days of sales data for store {store}!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
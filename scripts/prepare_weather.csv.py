@@ -1,46 +1,65 @@
 """
-This script reads the first available csv file from the `data/inputs/weather/` directory, 
-extract columns required for downstream modelling, convert dates to pd.datetime, 
-validates its structure and data types, and exports the result as a CSV file for downstream 
-processing.
+This script streams every csv archive in the `data/inputs/weather/` directory in chunks,
+parses only the columns required for downstream modelling, keeps the requested date range,
+validates each chunk, removes duplicated dates and exports the result, sorted by date, as a
+Parquet file for downstream processing.
+
+Archives of other stations in `data/inputs/weather/fallback/` (one csv file per station,
+file names sorting nearest station first, e.g. `1_vancouver_harbour.csv`) are processed the
+same way; they fill the holes of the primary station in `scripts/prepare_combined.csv.py`.
 
 Outputs:
-    - `data/processed/weather.csv`: Cleaned weather dataset for downstream use.
+    - `data/processed/weather.parquet`: Cleaned weather dataset for downstream use.
+    - `data/processed/weather_fallback/<station>.parquet`: Cleaned weather of each fallback station.
 
 Usage:
-    To be called with 'make all' command. 
+    To be called with 'make all' command.
+    python scripts/prepare_weather.csv.py --start 2022-01-01 --chunksize 100000
 """
 
 import os
 import sys
-import numpy as np
-import pandas as pd
 import glob
 import click
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.data_validation import _validate_weather_df
+from src.instrumentation import set_timing_context, timed
+from src.weather_ingest import ingest_weather
+
+@click.command()
+@click.option('--start', type=str, default=None, help='First date to keep (YYYY-MM-DD), by default the whole archive')
+@click.option('--end', type=str, default=None, help='Last date to keep (YYYY-MM-DD), by default the whole archive')
+@click.option('--chunksize', type=int, default=50_000, show_default=True, help='Number of csv rows parsed at once')
+def main(start, end, chunksize):
 
-# @click.command()
-# @click.option('--weather_file', type=str, required=True, help='Excel file name')
-def main():
+    set_timing_context('prepare_weather')
 
-    weather_file_list = glob.glob("data/inputs/weather/*.csv")
-    destination_path = "data/processed/weather.csv"
-    weather_columns = ['date','avg_temperature', 'rain', 'snow']
+    weather_file_list = sorted(glob.glob("data/inputs/weather/*.csv"))
+    fallback_file_list = sorted(glob.glob("data/inputs/weather/fallback/*.csv"))
+    destination_path = "data/processed/weather.parquet"
+    fallback_directory = "data/processed/weather_fallback"
 
     if len(weather_file_list) == 0:
         raise FileNotFoundError("No weather data found in inputs/weather.")
 
-    weather_df = pd.read_csv(weather_file_list[0])
-    weather_df = weather_df[weather_columns]
-    weather_df['date'] = pd.to_datetime(weather_df['date'])
-    
-    _validate_weather_df(weather_df)
+    # parsing, validation and writing are streamed chunk by chunk
+    with timed('ingest'):
+        ingest_weather(weather_file_list, destination_path, start=start, end=end, chunksize=chunksize)
+    print("Successfully generated weather.parquet!")
+
+    # stations removed from the inputs must not be used as fallback anymore
+    os.makedirs(fallback_directory, exist_ok=True)
+    for stale_path in glob.glob(os.path.join(fallback_directory, "*.parquet")):
+        os.remove(stale_path)
 
-    weather_df.to_csv(destination_path, index=False)
-    print("Successfully generated weather.csv!")
+    for fallback_file in fallback_file_list:
+        station = os.path.splitext(os.path.basename(fallback_file))[0]
+        with timed('ingest', station=station):
+            ingest_weather([fallback_file], os.path.join(fallback_directory, f"{station}.parquet"),
+                           start=start, end=end, chunksize=chunksize)
+    if fallback_file_list:
+        print(f"Successfully generated weather of {len(fallback_file_list)} fallback station(s)!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,52 @@
+"""
+This script runs the whole data and modelling pipeline (see `src/pipeline_runner.build_pipeline`):
+weather preparation, then for every store (a directory in `data/inputs/sales/`) sales
+preparation, the combined dataset, model training, scoring kernel export and the four model
+results scripts.
+
+Stages whose script and inputs are unchanged since their last successful run (by content
+hash) are skipped, and independent stages, such as the stages of different stores, run in
+parallel processes.
+
+Outputs:
+    - Every artifact of the pipeline for every store (see the Makefile).
+    - `.pipeline_state.json`: Input and output hashes of the last successful run of every stage.
+    - `logs/timings.jsonl`: Duration of every stage, and of the steps within the scripts (see
+      `src/instrumentation.py` and the Performance page of the dashboard).
+    - `<profile-dir>/<stage>.prof`: cProfile stats of every stage that ran, with `--profile-dir`.
+
+Usage:
+    python scripts/run_pipeline.py
+    python scripts/run_pipeline.py --dry-run
+    python scripts/run_pipeline.py --force --jobs 4
+    python scripts/run_pipeline.py --store main --store downtown
+    python scripts/run_pipeline.py --force --profile-dir logs/profiles
+"""
+
+import os
+import sys
+import click
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.pipeline_runner import build_pipeline, run_pipeline
+
+@click.command()
+@click.option('--store', 'stores', type=str, multiple=True, help='Only process these stores (repeatable), by default every store')
+@click.option('--jobs', type=int, default=None, help='Maximum number of stages running at once, by default the number of CPUs')
+@click.option('--force', is_flag=True, help='Rerun every stage, even if its inputs are unchanged')
+@click.option('--dry-run', is_flag=True, help='Only list the stages that would run')
+@click.option('--profile-dir', type=str, default=None, help='Profile the stages that run with cProfile, one .prof file per stage in this directory')
+def main(stores, jobs, force, dry_run, profile_dir):
+
+    status = run_pipeline(build_pipeline(list(stores) or None), jobs=jobs, force=force, dry_run=dry_run,
+                          profile_dir=profile_dir)
+
+    counts = {outcome: sum(value == outcome for value in status.values()) for outcome in sorted(set(status.values()))}
+    print("Pipeline finished: " + ", ".join(f"{count} {outcome}" for outcome, count in counts.items()))
+
+    if {'failed', 'blocked'} & set(status.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
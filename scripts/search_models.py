@@ -0,0 +1,46 @@
+"""
+This script searches the best model of every forecast target in `src/model_config.TARGETS` for one
+store: linear and poisson regressions, random forests and histogram gradient boosting (the model
+families of the notebook prototypes) are compared by time-series cross-validation on the train
+dataset. Candidates are evaluated on worker processes within a time budget, and candidates
+clearly worse than the best one are stopped early.
+
+Outputs:
+    - 'model/<store>/best_pipe_<target>.pkl': Winning pipeline of each target, refitted on the train dataset
+    - 'model/<store>/model_search.json': Winner, folds, settings and cross-validation MAE of every
+      candidate per target
+
+Usage:
+    python scripts/search_models.py --store downtown --target orders --budget 300 --n-jobs 4
+"""
+
+import os
+import sys
+import click
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.model_config import TARGETS
+from src.model_search import MODEL_FAMILIES, search_all
+from src.stores import DEFAULT_STORE
+
+@click.command()
+@click.option('--store', type=str, default=DEFAULT_STORE, show_default=True, help='Store whose models are searched')
+@click.option('--target', 'target_names', type=click.Choice(list(TARGETS)), multiple=True, help='Search only these targets (repeatable), by default all')
+@click.option('--family', 'families', type=click.Choice(list(MODEL_FAMILIES)), multiple=True, help='Search only these model families (repeatable), by default all')
+@click.option('--n-splits', type=int, default=5, show_default=True, help='Number of time-series cross-validation folds')
+@click.option('--budget', type=float, default=600, show_default=True, help='Time budget in seconds, no new fold is started after it')
+@click.option('--tolerance', type=float, default=0.2, show_default=True, help='Relative MAE margin over the best candidate above which a candidate is stopped')
+@click.option('--n-jobs', type=int, default=None, help='Number of worker processes, by default the number of CPUs')
+def main(store, target_names, families, n_splits, budget, tolerance, n_jobs):
+
+    targets = {name: TARGETS[name] for name in target_names} if target_names else TARGETS
+
+    pipelines = search_all(store, targets=targets, families=list(families) or None, n_splits=n_splits,
+                           budget=budget, tolerance=tolerance, n_jobs=n_jobs)
+
+    for name, pipeline in pipelines.items():
+        print(f"Best model for predicting {name} for store {store}: {type(pipeline[-1]).__name__}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+This script loads the train dataset of one store once and trains the prediction pipelines of every
+forecast target in `src/model_config.TARGETS`: total sales, item A sales and item B sales
+(linear regression) and daily order volumes (poisson regression).
+
+The preprocessing is fitted once and shared by all pipelines; the regressors are fitted
+in parallel on the same design matrix.
+
+Outputs:
+    - 'model/<store>/lr_pipe_total_sales.pkl': Trained linear regression pipeline for total sales
+    - 'model/<store>/lr_pipe_item_A_sales.pkl': Trained linear regression pipeline for item A sales
+    - 'model/<store>/lr_pipe_item_B_sales.pkl': Trained linear regression pipeline for item B sales
+    - 'model/<store>/pr_pipe_orders.pkl': Trained poisson regression pipeline for daily order volumes
+
+Usage:
+    To be called with 'make all' command.
+    python scripts/train_models.py --target orders --store downtown
+"""
+
+import os
+import sys
+import click
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.instrumentation import set_timing_context
+from src.model_config import TARGETS
+from src.stores import DEFAULT_STORE
+from src.training import train_all
+
+@click.command()
+@click.option('--store', type=str, default=DEFAULT_STORE, show_default=True, help='Store whose pipelines are trained')
+@click.option('--target', 'target_names', type=click.Choice(list(TARGETS)), multiple=True, help='Train only these targets (repeatable), by default all')
+@click.option('--n-jobs', type=int, default=None, help='Number of regressors fitted concurrently, by default one per target')
+def main(store, target_names, n_jobs):
+
+    set_timing_context('train_models', store=store)
+
+    targets = {name: TARGETS[name] for name in target_names} if target_names else TARGETS
+
+    pipelines = train_all(store, targets=targets, n_jobs=n_jobs)
+
+    for name in pipelines:
+        print(f"Successfully trained pipeline for predicting {name} for store {store}!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+This script adds the days appended to the train dataset of one store since its last training or
+update to its prediction pipelines, without retraining them from scratch: the linear regressions
+apply rank-one updates to their normal equations and the poisson regression is refitted starting
+from its previous coefficients. The prediction intervals of the updated pipelines are
+bootstrapped again, so they stay consistent with the forecasts. The pipelines, scoring kernels
+and intervals are replaced atomically.
+
+Outputs:
+    - 'model/<store>/*.pkl' and 'model/<store>/*.npz': Updated pipelines, scoring kernels and
+      prediction intervals ('*_intervals.npz')
+    - 'model/<store>/normal_equations.npz': Updated sums of squares and cross-products of the
+      linear regressions
+
+Usage:
+    Run after new sales have been processed, e.g. daily, between full retrainings ('make all').
+    python scripts/update_models.py --store downtown
+"""
+
+import os
+import sys
+import time
+import click
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.online_update import update_pipelines
+from src.stores import DEFAULT_STORE
+
+@click.command()
+@click.option('--store', type=str, default=DEFAULT_STORE, show_default=True, help='Store whose pipelines are updated')
+@click.option('--linear-only', is_flag=True, help='Only update the linear regressions (skip the poisson warm start)')
+@click.option('--n-boot', type=int, default=1000, show_default=True, help='Number of bootstrap resamples of the prediction intervals')
+def main(store, linear_only, n_boot):
+
+    start = time.perf_counter()
+    pipelines = update_pipelines(store, refit=not linear_only, n_boot=n_boot)
+    seconds = time.perf_counter() - start
+
+    if not pipelines:
+        print(f"No new days in the train dataset of store {store}, pipelines unchanged.")
+        return
+
+    print(f"Successfully updated pipelines {', '.join(pipelines)} for store {store} in {seconds * 1000:.0f} ms!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import hashlib
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.feature_functions import DAYS_OF_WEEK
+
+CUBE_DIMENSIONS = ['type_of_day', 'day_of_week', 'month', 'is_HCF', 'is_holiday']
+CUBE_MEASURES = ['total_sales_normalized', 'tips_normalized', 'in_store_orders', 'item_A_sales', 'item_B_sales',
+                 'item_C_sales', 'sales_per_order']
+TYPES_OF_DAY = ['Weekday', 'Friday', 'Weekend', 'Holiday']
+
+
+def _sum_columns(measures):
+    return ['days'] + [f'{measure}_{stat}' for measure in measures for stat in ('sum', 'sumsq')]
+
+
+def build_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregate daily sales into the cells of the analytics cube.
+
+    Every cell is one combination of the CUBE_DIMENSIONS ('month' is the first day of the
+    calendar month) with the number of days and, for each of the CUBE_MEASURES, the sum
+    and the sum of squares of its daily values. These are additive, so cubes of disjoint
+    days are merged by adding cells, and means and standard deviations of any roll-up
+    are computed from the cells alone (see `query_cube`).
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Combined data indexed by date, with the dimension columns (except 'month'),
+        'total_sales_normalized', 'tips_normalized', 'in_store_orders' and the item sales.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per non-empty cell, sorted by the dimensions.
+    """
+
+    dates = df.index.to_numpy(dtype='datetime64[ns]')
+    cells = pd.DataFrame({
+        'type_of_day': pd.Categorical(df['type_of_day'], categories=TYPES_OF_DAY),
+        'day_of_week': pd.Categorical(df['day_of_week'], categories=DAYS_OF_WEEK),
+        'month': dates.astype('datetime64[M]').astype('datetime64[ns]'),
+        'is_HCF': df['is_HCF'].to_numpy(dtype=bool),
+        'is_holiday': df['is_holiday'].to_numpy(dtype=bool),
+        'days': 1,
+    })
+    for measure in CUBE_MEASURES:
+        if measure == 'sales_per_order':
+            values = df['total_sales_normalized'].to_numpy(dtype='float64') / df['in_store_orders'].to_numpy(dtype='float64')
+        else:
+            values = df[measure].to_numpy(dtype='float64')
+        cells[f'{measure}_sum'] = values
+        cells[f'{measure}_sumsq'] = values ** 2
+
+    cube = cells.groupby(CUBE_DIMENSIONS, observed=True)[_sum_columns(CUBE_MEASURES)].sum().reset_index()
+    return cube.sort_values(CUBE_DIMENSIONS, ignore_index=True)
+
+
+def update_cube(cube: Optional[pd.DataFrame], df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Bring a cube up to date with new days, re-aggregating only the latest months.
+
+    Days arrive in date order, so every month before the last month of `cube` is complete
+    and its cells are kept as they are. The cells of the last month (possibly partial)
+    and of every later month are rebuilt from `df`. Past days that changed since the cube
+    was built (restated sales, other weather fills) are not picked up: compare the
+    `history_fingerprint` of the months before the last month and rebuild when it differs.
+
+    Parameters
+    ----------
+    cube : pd.DataFrame or None
+        Cube built by `build_cube` or `update_cube`; None, empty or with other columns
+        (e.g. written by an older version) to build the cube from scratch.
+    df : pd.DataFrame
+        Combined data indexed and sorted by date; only its rows from the last month of
+        `cube` on are read.
+
+    Returns
+    -------
+    pd.DataFrame
+        The updated cube.
+    """
+
+    if cube is None or cube.empty or list(cube.columns) != CUBE_DIMENSIONS + _sum_columns(CUBE_MEASURES):
+        return build_cube(df)
+
+    last_month = cube['month'].max()
+    recent = build_cube(df.iloc[df.index.searchsorted(last_month):])
+    cube = pd.concat([cube[cube['month'] < last_month], recent], ignore_index=True)
+
+    return cube.sort_values(CUBE_DIMENSIONS, ignore_index=True)
+
+
+def history_fingerprint(df: pd.DataFrame, before) -> str:
+    """
+    Content hash of the days of the combined data that the cells before a month are built from.
+
+    `update_cube` keeps the cells of the months before the last month of the cube as they
+    are: the cube is stale if this hash, taken at its last month, differs from the hash
+    taken when it was written.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Combined data indexed and sorted by date (see `build_cube`).
+    before : datetime-like
+        First day of the month before which the days are hashed.
+
+    Returns
+    -------
+    str
+        Hexadecimal SHA-256 of the dates, dimensions and measures of the days before `before`.
+
+    Examples
+    --------
+    >>> history_fingerprint(combined_df, cube['month'].max())
+    '5f1c...'
+    """
+
+    history = df.iloc[:df.index.searchsorted(pd.Timestamp(before))]
+    # sales per order is derived from the total sales and orders
+    columns = ['type_of_day', 'day_of_week', 'is_HCF', 'is_holiday'] + [measure for measure in CUBE_MEASURES if measure != 'sales_per_order']
+    hashes = pd.util.hash_pandas_object(history[columns], index=True).to_numpy()
+
+    return hashlib.sha256(hashes.tobytes()).hexdigest()
+
+
+def query_cube(cube: pd.DataFrame, by: List[str], measures: Optional[List[str]] = None, since=None,
+               df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Number of days, mean and standard deviation of measures per group, from the cube cells.
+
+    Without `since`, the cost depends on the number of cells, not on the number of days.
+    With `since`, the months after the month of `since` come from the cube and only the
+    days of that first, partial month are aggregated from `df`.
+
+    Parameters
+    ----------
+    cube : pd.DataFrame
+        Cube built by `build_cube` or `update_cube`.
+    by : list of str
+        Dimensions to group by, e.g. ['type_of_day'].
+    measures : list of str, optional
+        Measures to summarise, by default CUBE_MEASURES.
+    since : datetime-like, optional
+        First day to include. All days if None.
+    df : pd.DataFrame, optional
+        Combined data indexed and sorted by date the cube was built from, required with
+        `since` (its first month is found by binary search).
+
+    Returns
+    -------
+    pd.DataFrame
+        Indexed by the `by` dimensions (groups without days are left out), with the column
+        'days' and the columns '<measure>_mean' and '<measure>_std' (sample standard
+        deviation, NaN for a single day).
+
+    Raises
+    ------
+    ValueError
+        If `since` is given without `df`.
+
+    Examples
+    --------
+    >>> query_cube(cube, ['type_of_day'], ['total_sales_normalized'], since='2025-03-15', df=combined_df)
+    """
+
+    measures = CUBE_MEASURES if measures is None else measures
+
+    if since is not None:
+        if df is None:
+            raise ValueError("Querying the days since a date needs the combined data of the first month")
+        since = pd.Timestamp(since)
+        month = since.to_period('M').to_timestamp()
+        start, stop = df.index.searchsorted([since, month + pd.offsets.MonthBegin(1)])
+        first_month = df.iloc[start:stop]
+        cube = pd.concat([cube[cube['month'] > month], build_cube(first_month)], ignore_index=True)
+
+    sums = cube.groupby(by, observed=True)[_sum_columns(measures)].sum().sort_index()
+    days = sums['days'].to_numpy(dtype='float64')
+
+    result = pd.DataFrame({'days': sums['days']}, index=sums.index)
+    for measure in measures:
+        total, squares = sums[f'{measure}_sum'].to_numpy(), sums[f'{measure}_sumsq'].to_numpy()
+        mean = total / days
+        with np.errstate(invalid='ignore', divide='ignore'):
+            var = np.maximum(squares - total * mean, 0.0) / (days - 1)
+        result[f'{measure}_mean'] = mean
+        result[f'{measure}_std'] = np.where(days > 1, np.sqrt(var), np.nan)
+
+    return result
@@ -0,0 +1,202 @@
+import pickle
+import pandas as pd
+import streamlit as st
+from typing import List, Optional
+
+from src.kpi_engine import KPIEngine
+from src.prediction_intervals import BootstrapIntervals
+from src.scoring_kernel import ScoringKernel
+from src.storage import content_hash, read_table
+from src.stores import DEFAULT_STORE
+from src.typed_loader import read_typed
+
+# path -> (mtime_ns, size, sha256) of the last hashed version of every artifact file
+_file_hashes = {}
+
+
+def artifact_version(path: str) -> str:
+    """
+    Return a content hash identifying the current version of an artifact.
+
+    Files are only re-hashed when their modification time or size changes, so calling
+    this on every Streamlit rerun costs one `os.stat` per file. A directory (e.g. a
+    partitioned Parquet store) is versioned by the hashes of all files below it.
+
+    Parameters
+    ----------
+    path : str
+        Path of an artifact file or directory.
+
+    Returns
+    -------
+    str
+        Hex digest that changes whenever the content of the artifact changes.
+
+    Raises
+    ------
+    FileNotFoundError
+        If `path` does not exist.
+    """
+
+    return content_hash(path, _file_hashes)
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _load_model(path, version):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _load_kernel(path, version):
+    return ScoringKernel.load(path)
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _load_intervals(path, version):
+    return BootstrapIntervals.load(path)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _load_table(path, columns, index_col, schema, version):
+    return read_typed(path, schema, columns=columns, index_col=index_col)
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _load_kpi_engine(path, columns, version):
+    return KPIEngine(read_table(path, columns=columns, index_col='date'), columns)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _load_csv(path, version):
+    return pd.read_csv(path)
+
+
+def load_model(path: str):
+    """
+    Load a pickled model pipeline, shared by all sessions until the file changes.
+
+    The returned object is shared between sessions and must not be modified.
+
+    Parameters
+    ----------
+    path : str
+        Path of the pickled pipeline (e.g. 'model/lr_pipe_total_sales.pkl').
+
+    Returns
+    -------
+    object
+        The unpickled pipeline.
+    """
+    return _load_model(path, artifact_version(path))
+
+
+def load_kernel(path: str) -> ScoringKernel:
+    """
+    Load a compiled scoring kernel, shared by all sessions until the file changes.
+
+    Parameters
+    ----------
+    path : str
+        Path of the kernel written by `scripts/export_kernels.py` (e.g. 'model/lr_pipe_total_sales.npz').
+
+    Returns
+    -------
+    ScoringKernel
+        The kernel, for fast single-row predictions.
+    """
+    return _load_kernel(path, artifact_version(path))
+
+
+def load_intervals(path: str) -> BootstrapIntervals:
+    """
+    Load the bootstrap coefficients of a pipeline, shared by all sessions until the file changes.
+
+    Parameters
+    ----------
+    path : str
+        Path of the intervals written by `scripts/export_intervals.py` (e.g. 'model/main/pr_pipe_orders_intervals.npz').
+
+    Returns
+    -------
+    BootstrapIntervals
+        The bootstrap refits, for prediction intervals of single scenarios.
+    """
+    return _load_intervals(path, artifact_version(path))
+
+
+def load_table(path: str, columns: Optional[List[str]] = None, index_col: Optional[str] = None,
+               schema: Optional[str] = None) -> pd.DataFrame:
+    """
+    Cached version of `src.typed_loader.read_typed`, shared across sessions until the data changes.
+
+    Every call returns a fresh copy, so the DataFrame can be modified by the caller. Copies
+    have compact dtypes (categoricals, float32 where precision allows, small integers), which
+    keeps the memory of every session down.
+
+    Parameters
+    ----------
+    path : str
+        Path of the Parquet file or partitioned store.
+    columns : list of str, optional
+        Columns to read. Reads all columns if None.
+    index_col : str, optional
+        Date column to use as the index of the returned DataFrame.
+    schema : str, optional
+        Spec of the table in `src.schemas.SPECS` ('sales', 'weather' or 'combined'),
+        whose text columns are read as categoricals.
+
+    Returns
+    -------
+    pd.DataFrame
+        The stored data, with compact dtypes.
+    """
+    return _load_table(path, columns, index_col, schema, artifact_version(path))
+
+
+def load_kpi_engine(path: str, columns: List[str]) -> KPIEngine:
+    """
+    Build the prefix sums of daily metrics once, shared by all sessions until the data changes.
+
+    Parameters
+    ----------
+    path : str
+        Path of a date-indexed table or partitioned store (e.g. the sales of a store).
+    columns : list of str
+        Metrics to index. Pass a tuple or the same list on every call.
+
+    Returns
+    -------
+    KPIEngine
+        The engine, answering window queries in constant time.
+    """
+    return _load_kpi_engine(path, tuple(columns), artifact_version(path))
+
+
+def load_csv(path: str) -> pd.DataFrame:
+    """
+    Cached `pd.read_csv` for small result tables, shared across sessions until the file changes.
+
+    Parameters
+    ----------
+    path : str
+        Path of the CSV file.
+
+    Returns
+    -------
+    pd.DataFrame
+        The table, as a fresh copy.
+    """
+    return _load_csv(path, artifact_version(path))
+
+
+def selected_store() -> str:
+    """
+    Store chosen with the store selector in the sidebar of `app.py`.
+
+    Returns
+    -------
+    str
+        The selected store id, or `src.stores.DEFAULT_STORE` when a page runs on its own.
+    """
+    return st.session_state.get('store_id', DEFAULT_STORE)
@@ -0,0 +1,173 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.linear_model import LinearRegression
+from sklearn.pipeline import make_pipeline
+
+from src.model_config import FEATURES, TARGETS
+from src.training import design_matrix, make_preprocessor
+
+BACKTEST_COLUMNS = ['target', 'origin', 'day_of_week', 'days', 'mae', 'bias']
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def _linear_forecasts(X, Y, origins, horizon):
+    # Expanding-window OLS over consecutive origins: the sums of X, Y, X'X and X'Y are
+    # updated with the rows added since the previous origin instead of refitting.
+    # Returns predictions of shape (len(origins), horizon, n_targets).
+    X = X - X.mean(axis=0)  # a fixed shift keeps the centered sums well conditioned
+    first = origins[0]
+    n = first
+    x_sum, y_sum = X[:first].sum(axis=0), Y[:first].sum(axis=0)
+    xtx, xty = X[:first].T @ X[:first], X[:first].T @ Y[:first]
+
+    forecasts = np.empty((len(origins), horizon, Y.shape[1]))
+    for i, origin in enumerate(origins):
+        if origin > n:
+            rows_x, rows_y = X[n:origin], Y[n:origin]
+            x_sum += rows_x.sum(axis=0)
+            y_sum += rows_y.sum(axis=0)
+            xtx += rows_x.T @ rows_x
+            xty += rows_x.T @ rows_y
+            n = origin
+
+        x_mean, y_mean = x_sum / n, y_sum / n
+        sxx = xtx - n * np.outer(x_mean, x_mean)
+        sxy = xty - n * np.outer(x_mean, y_mean)
+        # minimum-norm solution, like sklearn when a category has not been seen yet
+        coef = np.linalg.lstsq(sxx, sxy, rcond=None)[0]
+        forecasts[i] = (X[origin:origin + horizon] - x_mean) @ coef + y_mean
+
+    return forecasts
+
+
+def _refit_forecasts(df, estimator, target, origins, horizon):
+    # refits the whole pipeline at every origin
+    forecasts = np.empty((len(origins), horizon, 1))
+    for i, origin in enumerate(origins):
+        pipeline = make_pipeline(make_preprocessor(), clone(estimator))
+        pipeline.fit(df[FEATURES].iloc[:origin], df[target].iloc[:origin])
+        forecasts[i, :, 0] = pipeline.predict(df[FEATURES].iloc[origin:origin + horizon])
+
+    return forecasts
+
+
+def _error_table(name, actual, forecasts, origin_dates, days_of_week, origins, horizon):
+    # per-origin, per-day-of-week MAE and bias of one target
+    windows = origins[:, None] + np.arange(horizon)
+    errors = forecasts - actual[windows]
+    table = pd.DataFrame({
+        'origin': np.repeat(origin_dates[origins], horizon),
+        'day_of_week': pd.Categorical(days_of_week[windows.ravel()], categories=WEEKDAYS),
+        'error': errors.ravel(),
+    })
+    table['abs_error'] = table['error'].abs()
+
+    table = table.groupby(['origin', 'day_of_week'], observed=True, sort=True).agg(
+        days=('error', 'size'), mae=('abs_error', 'mean'), bias=('error', 'mean'))
+    table = table.sort_index().reset_index()
+    table.insert(0, 'target', name)
+
+    return table
+
+
+def _backtest_block(df, targets, origins, horizon):
+    # runs in a worker process: every target over one contiguous block of origins
+    linear = [name for name, config in targets.items() if type(config['estimator']) is LinearRegression]
+    others = [name for name in targets if name not in linear]
+
+    forecasts = {}
+    if linear:
+        Y = df[[targets[name]['target'] for name in linear]].to_numpy(dtype='float64')
+        stacked = _linear_forecasts(design_matrix(df), Y, origins, horizon)
+        forecasts.update({name: stacked[:, :, k] for k, name in enumerate(linear)})
+    for name in others:
+        forecasts[name] = _refit_forecasts(df, targets[name]['estimator'], targets[name]['target'], origins, horizon)[:, :, 0]
+
+    origin_dates = df.index.to_numpy()
+    days_of_week = df['day_of_week'].astype(str).to_numpy()
+
+    return pd.concat([
+        _error_table(name, df[targets[name]['target']].to_numpy(dtype='float64'), forecasts[name],
+                     origin_dates, days_of_week, origins, horizon)
+        for name in targets
+    ], ignore_index=True)
+
+
+def backtest(df: pd.DataFrame, targets: Optional[Dict[str, dict]] = None, min_train: int = 120, horizon: int = 7,
+             step: int = 1, n_jobs: Optional[int] = None) -> pd.DataFrame:
+    """
+    Rolling-origin backtest of every forecast target.
+
+    At each origin, the pipeline of a target is trained on all rows before the origin
+    (expanding window) and forecasts the next `horizon` rows. Linear regressions are not
+    refitted: the sums of squares and cross-products of the design matrix (X'X, X'y) are
+    updated with the rows added since the previous origin and the normal equations are
+    solved again, which predicts like a refit of the pipeline. Other regressors (e.g.
+    the Poisson regression) are refitted at every origin. The origins are split into
+    contiguous blocks evaluated in parallel processes.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Combined data of one store indexed by date and sorted by date, with all columns
+        in `src.model_config.FEATURES` and every target column.
+    targets : dict, optional
+        Forecast name -> target configuration with 'target' and 'estimator' entries, by
+        default `src.model_config.TARGETS`.
+    min_train : int, optional
+        Number of rows before the first origin, by default 120.
+    horizon : int, optional
+        Number of rows forecast from each origin, by default 7.
+    step : int, optional
+        Number of rows between consecutive origins, by default 1.
+    n_jobs : int, optional
+        Number of worker processes, by default the number of CPUs.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per target, origin and day of the week in the forecast window, with the
+        columns in BACKTEST_COLUMNS: 'origin' is the date of the first forecast day,
+        followed by the number of forecast days on that day of the week, their mean
+        absolute error and their mean error (prediction - actual).
+
+    Raises
+    ------
+    ValueError
+        If `df` has fewer than `min_train + horizon` rows or missing feature values.
+
+    Examples
+    --------
+    >>> backtest(read_table(store_path('combined', 'main'), index_col='date'), horizon=14)
+    """
+
+    targets = TARGETS if targets is None else targets
+    if len(df) < min_train + horizon:
+        raise ValueError(f"Backtesting needs at least {min_train + horizon} rows, got {len(df)}")
+
+    if df[FEATURES].isna().any().any():
+        raise ValueError("Backtesting needs complete features, see the weather gap report of the store")
+
+    # only the columns used, so that less data is sent to the workers
+    df = df[FEATURES + list(dict.fromkeys(config['target'] for config in targets.values()))]
+    origins = np.arange(min_train, len(df) - horizon + 1, step)
+    n_jobs = min(n_jobs or os.cpu_count() or 1, len(origins))
+    blocks = [block for block in np.array_split(origins, n_jobs) if len(block)]
+
+    if n_jobs == 1:
+        tables = [_backtest_block(df, targets, block, horizon) for block in blocks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            futures = [executor.submit(_backtest_block, df, targets, block, horizon) for block in blocks]
+            tables = [future.result() for future in futures]
+
+    result = pd.concat(tables, ignore_index=True)
+    result['target'] = pd.Categorical(result['target'], categories=list(targets))
+
+    # the same order whatever the number of blocks
+    return result[BACKTEST_COLUMNS].sort_values(['target', 'origin', 'day_of_week'], ignore_index=True)
@@ -1,6 +1,199 @@
+import functools
+import hashlib
+import json
+import os
+from typing import Dict
+
+import numpy as np
 import pandas as pd
 import pandera as pa
 
+from src.schemas import SPECS, ColumnSpec
+from src.storage import content_hash, read_table
+
+_PANDERA_DTYPES = {'datetime': pa.DateTime, 'int': int, 'float': float, 'str': str, 'bool': bool, 'category': pa.Category}
+_NUMPY_DTYPES = {'datetime': np.dtype('datetime64[ns]'), 'int': np.dtype('int64'), 'float': np.dtype('float64'),
+                 'str': np.dtype('O'), 'bool': np.dtype('bool')}
+
+
+@functools.lru_cache(maxsize=None)
+def _schema(name: str) -> pa.DataFrameSchema:
+    # built once per process, only when a detailed error report is needed
+    columns = {}
+    for column, spec in SPECS[name].items():
+        checks = []
+        if spec.ge is not None:
+            checks.append(pa.Check.greater_than_or_equal_to(spec.ge))
+        if spec.isin is not None:
+            checks.append(pa.Check.isin(list(spec.isin)))
+        columns[column] = pa.Column(_PANDERA_DTYPES[spec.dtype], checks, nullable=spec.nullable)
+
+    return pa.DataFrameSchema(columns)
+
+
+def _column_passes(series: pd.Series, spec: ColumnSpec) -> bool:
+    if spec.dtype == 'category':
+        if not isinstance(series.dtype, pd.CategoricalDtype):
+            return False
+        codes = series.cat.codes.to_numpy()
+        if not spec.nullable and (codes < 0).any():
+            return False
+        if spec.isin is not None:
+            return bool(pd.Index(series.cat.categories)[np.unique(codes[codes >= 0])].isin(spec.isin).all())
+        return True
+
+    if series.dtype != _NUMPY_DTYPES[spec.dtype]:
+        return False
+
+    values = series.to_numpy()
+    if spec.dtype in ('float', 'datetime'):
+        missing = np.isnan(values) if spec.dtype == 'float' else np.isnat(values)
+    elif spec.dtype == 'str':
+        missing = pd.isna(values)
+    else:
+        missing = None
+
+    if missing is not None and missing.any():
+        if not spec.nullable:
+            return False
+        values = values[~missing]
+
+    # an object column can hold any Python object, pandera's str dtype only accepts strings
+    if spec.dtype == 'str' and pd.api.types.infer_dtype(values, skipna=True) not in ('string', 'empty'):
+        return False
+    if spec.ge is not None and not (values >= spec.ge).all():
+        return False
+    if spec.isin is not None and not pd.Series(values).isin(spec.isin).all():
+        return False
+
+    return True
+
+
+def fast_validate(df: pd.DataFrame, name: str) -> bool:
+    """
+    Check a DataFrame against a spec with vectorized NumPy operations only.
+
+    The fast path never accepts a frame the pandera schema would reject, but it may
+    reject frames that pandera accepts (e.g. an equivalent but unexpected dtype), so a
+    False result only means the detailed pandera validation has to run.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The DataFrame to check.
+    name : str
+        Spec to check against, one of SPECS ('sales', 'weather' or 'combined').
+
+    Returns
+    -------
+    bool
+        True if every column of the spec is present and passes its dtype and value checks.
+    """
+
+    spec = SPECS[name]
+    if not set(spec) <= set(df.columns):
+        return False
+
+    return all(_column_passes(df[column], column_spec) for column, column_spec in spec.items())
+
+
+def validate_frame(df: pd.DataFrame, name: str) -> None:
+    """
+    Validate a DataFrame, using pandera only when the fast path fails.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The DataFrame to validate.
+    name : str
+        Spec to validate against, one of SPECS ('sales', 'weather' or 'combined').
+
+    Returns
+    -------
+    None
+
+    Raises
+    ------
+    pandera.errors.SchemaError
+        If the DataFrame does not match the spec, with pandera's detailed report.
+    """
+
+    if not fast_validate(df, name):
+        _schema(name).validate(df)
+
+
+def _spec_fingerprint(name):
+    return hashlib.sha256(repr(sorted(SPECS[name].items())).encode()).hexdigest()
+
+
+def validate_partitions(root: str, name: str, cache_path: str) -> int:
+    """
+    Validate only the Parquet partitions of a store that are new or changed since the last run.
+
+    Every partition file that passes is recorded in `cache_path` under its content hash
+    (see `src.storage.content_hash`, which only re-reads files whose modification time or
+    size changed). Recorded partitions are skipped; the others are read and validated
+    together with `validate_frame`. The cache is discarded when the spec changes.
+
+    The cache file is read and rewritten whole, without a lock: processes validating at the
+    same time (e.g. stores run in parallel by `src.pipeline_runner`) must use different
+    cache files, such as one per store, or they lose each other's entries.
+
+    Parameters
+    ----------
+    root : str
+        Directory of the partitioned store (e.g. 'data/processed/sales/main').
+    name : str
+        Spec to validate against, one of SPECS ('sales', 'weather' or 'combined').
+    cache_path : str
+        JSON file recording the hashes of validated partitions, not shared with concurrent callers.
+
+    Returns
+    -------
+    int
+        Number of partitions that had to be validated.
+
+    Raises
+    ------
+    FileNotFoundError
+        If `root` does not exist.
+    pandera.errors.SchemaError
+        If a new or changed partition does not match the spec.
+    """
+
+    if not os.path.exists(root):
+        raise FileNotFoundError(f"{root} does not exist")
+
+    cache = {}
+    if os.path.exists(cache_path):
+        with open(cache_path) as f:
+            cache = json.load(f)
+
+    fingerprint = _spec_fingerprint(name)
+    entry = cache.get(root, {})
+    passed: Dict[str, str] = entry.get('partitions', {}) if entry.get('spec') == fingerprint else {}
+    memo = {path: tuple(stat) for path, stat in entry.get('file_stats', {}).items()}
+
+    files = sorted(os.path.join(directory, file) for directory, _, files in os.walk(root)
+                   for file in files if file.endswith('.parquet') and not file.startswith('_'))
+    hashes = {file: content_hash(file, memo) for file in files}
+    changed = [file for file in files if passed.get(file) != hashes[file]]
+
+    if changed:
+        validate_frame(pd.concat([read_table(file) for file in changed], ignore_index=True), name)
+
+    cache[root] = {'spec': fingerprint, 'partitions': hashes, 'file_stats': {file: memo[file] for file in files}}
+    directory = os.path.dirname(cache_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # the previous cache stays readable until the new one replaces it
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, cache_path)
+
+    return len(changed)
+
 
 def _validate_excel_df(excel_df):
     """
@@ -24,20 +217,7 @@ def _validate_excel_df(excel_df):
         If the DataFrame does not match the expected schema definition.
     """
 
-    schema_features_df = pa.DataFrameSchema({
-    "date": pa.Column(pa.DateTime),
-    "hours_opened": pa.Column(int, pa.Check.greater_than_or_equal_to(0)),
-    "tips_normalized": pa.Column(float, pa.Check.greater_than_or_equal_to(0)),
-    "total_sales_normalized": pa.Column(float, pa.Check.greater_than_or_equal_to(0)),
-    "in_store_orders": pa.Column(float, pa.Check.greater_than_or_equal_to(0)),
-    "item_A_sales": pa.Column(float, pa.Check.greater_than_or_equal_to(0)),
-    "item_B_sales": pa.Column(float, pa.Check.greater_than_or_equal_to(0)),
-    "item_C_sales": pa.Column(float, pa.Check.greater_than_or_equal_to(0)),
-    "HCF_sales": pa.Column(float, pa.Check.greater_than_or_equal_to(0)), 
-    "type_of_day": pa.Column(str, pa.Check.isin(["Weekday", "Weekend", "Friday", "Unusual", "Holiday"]))
-    })
-
-    schema_features_df.validate(excel_df)
+    validate_frame(excel_df, 'sales')
 
 def _validate_weather_df(weather_df):
     """
@@ -61,14 +241,7 @@ def _validate_weather_df(weather_df):
         If the DataFrame does not match the expected schema definition.
     """
 
-    schema_features_df = pa.DataFrameSchema({
-    "date": pa.Column(pa.DateTime, nullable=True),
-    "avg_temperature": pa.Column(float, nullable=True),
-    "rain": pa.Column(float, nullable=True),
-    "snow": pa.Column(float, nullable=True)
-    })
-
-    schema_features_df.validate(weather_df)
+    validate_frame(weather_df, 'weather')
 
 def _validate_combined_df(combined_df):
     """
@@ -92,25 +265,4 @@ def _validate_combined_df(combined_df):
         If the DataFrame does not match the expected schema definition.
     """
 
-    schema_features_df = pa.DataFrameSchema({
-    "date": pa.Column(pa.DateTime),
-    "hours_opened": pa.Column(int, pa.Check.greater_than_or_equal_to(0)),
-    "tips_normalized": pa.Column(float, pa.Check.greater_than_or_equal_to(0)),
-    "total_sales_normalized": pa.Column(float, pa.Check.greater_than_or_equal_to(0)),
-    "in_store_orders": pa.Column(float, pa.Check.greater_than_or_equal_to(0)),
-    "item_A_sales": pa.Column(float, pa.Check.greater_than_or_equal_to(0)),
-    "item_B_sales": pa.Column(float, pa.Check.greater_than_or_equal_to(0)),
-    "item_C_sales": pa.Column(float, pa.Check.greater_than_or_equal_to(0)),
-    "HCF_sales": pa.Column(float, pa.Check.greater_than_or_equal_to(0)), 
-    "type_of_day": pa.Column(str, pa.Check.isin(["Weekday", "Weekend", "Friday", "Unusual", "Holiday"])),
-    "avg_temperature": pa.Column(float, nullable=True),
-    "rain": pa.Column(float, nullable=True),
-    "snow": pa.Column(float, nullable=True),
-    "is_long_weekend":pa.Column(bool),
-    "is_HCF": pa.Column(bool),
-    "is_holiday": pa.Column(bool),
-    "day_of_week": pa.Column(pa.Category, pa.Check.isin(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'])),
-    "season": pa.Column(pa.Category, pa.Check.isin(['Winter', 'Spring', 'Summer', 'Fall']))
-    })
-
-    schema_features_df.validate(combined_df)
+    validate_frame(combined_df, 'combined')
@@ -0,0 +1,202 @@
+import pandas as pd
+import plotly.graph_objects as go
+
+from src.storage import write_table
+
+FIT_SERIES_COLUMNS = ['date', 'split', 'actual', 'predicted', 'resid']
+
+PREDICTION_COLORS = {
+    'train': '#1f77b4',
+    'test': '#d62728',
+    'test_prediction': '#8bc34a',
+    'train_prediction': '#4caf50'
+}
+
+# first color of the default Plotly template
+DEFAULT_COLOR = '#636efa'
+
+
+def write_fit_series(path: str, y_train: pd.Series, y_train_pred, y_test: pd.Series, y_test_pred) -> pd.DataFrame:
+    """
+    Save actuals, predictions and residuals of a model as a compact Parquet table.
+
+    The diagnostics pages build their figures from this table instead of unpickling
+    whole Plotly figures.
+
+    Parameters
+    ----------
+    path : str
+        Destination Parquet file (e.g. 'results/fit_series_total_sales.parquet').
+    y_train, y_test : pd.Series
+        Actual target values indexed by date.
+    y_train_pred, y_test_pred : array-like
+        Model predictions aligned with `y_train` and `y_test`.
+
+    Returns
+    -------
+    pd.DataFrame
+        The saved table with the columns in FIT_SERIES_COLUMNS.
+    """
+
+    frames = []
+    for split, y, y_pred in (('train', y_train, y_train_pred), ('test', y_test, y_test_pred)):
+        frame = pd.DataFrame({'date': y.index, 'actual': y.to_numpy(dtype='float64'), 'predicted': y_pred})
+        frame.insert(1, 'split', split)
+        frames.append(frame)
+
+    series = pd.concat(frames, ignore_index=True)
+    series['split'] = pd.Categorical(series['split'], categories=['train', 'test'])
+    series['resid'] = series['actual'] - series['predicted']
+
+    write_table(series, path)
+    return series
+
+
+def prediction_figure(series: pd.DataFrame, target: str) -> go.Figure:
+    """
+    Line chart of actuals and predictions over time, for the train and test periods.
+
+    Figures are built with `plotly.graph_objects` rather than `plotly.express`, which
+    is several times slower for the same traces.
+
+    Parameters
+    ----------
+    series : pd.DataFrame
+        Fit series indexed by date, as written by `write_fit_series`.
+    target : str
+        Name of the plotted target, used as the y axis title.
+
+    Returns
+    -------
+    plotly.graph_objects.Figure
+    """
+
+    train = series[series['split'] == 'train']
+    test = series[series['split'] == 'test']
+    lines = (
+        ('train', train['actual']),
+        ('test', test['actual']),
+        ('train_prediction', train['predicted']),
+        ('test_prediction', test['predicted'])
+    )
+
+    fig = go.Figure(layout={'xaxis_title': 'date', 'yaxis_title': target, 'legend_title': 'label', 'margin_t': 60})
+    for label, values in lines:
+        fig.add_scatter(
+            x=values.index, y=values.to_numpy(), mode='lines', name=label, legendgroup=label,
+            line_color=PREDICTION_COLORS[label],
+            hovertemplate=f'label={label}<br>date=%{{x}}<br>{target}=%{{y}}<extra></extra>'
+        )
+
+    return fig
+
+
+def resid_fit_figure(series: pd.DataFrame) -> go.Figure:
+    """
+    Scatter plot of residuals against fitted values on the training data.
+
+    Parameters
+    ----------
+    series : pd.DataFrame
+        Fit series, as written by `write_fit_series`.
+
+    Returns
+    -------
+    plotly.graph_objects.Figure
+    """
+
+    train = series[series['split'] == 'train']
+
+    fig = go.Figure(layout={'xaxis_title': 'x', 'yaxis_title': 'y', 'width': 650, 'margin_t': 60})
+    fig.add_scatter(x=train['predicted'].to_numpy(), y=train['resid'].to_numpy(), mode='markers',
+                    marker_color=DEFAULT_COLOR, hovertemplate='x=%{x}<br>y=%{y}<extra></extra>')
+    fig.add_hline(y=0, line_dash='dash', line_color='red')
+
+    return fig
+
+
+def resid_dist_figure(series: pd.DataFrame) -> go.Figure:
+    """
+    Histogram of the residuals on the training data, with a violin plot above it.
+
+    Parameters
+    ----------
+    series : pd.DataFrame
+        Fit series, as written by `write_fit_series`.
+
+    Returns
+    -------
+    plotly.graph_objects.Figure
+    """
+
+    resid = series.loc[series['split'] == 'train', 'resid'].to_numpy()
+
+    fig = go.Figure(layout={
+        'xaxis': {'anchor': 'y', 'domain': [0.0, 1.0], 'title': 'resid'},
+        'yaxis': {'anchor': 'x', 'domain': [0.0, 0.8316], 'title': 'count'},
+        'xaxis2': {'anchor': 'y2', 'domain': [0.0, 1.0], 'matches': 'x', 'showticklabels': False, 'showgrid': True},
+        'yaxis2': {'anchor': 'x2', 'domain': [0.8416, 1.0], 'matches': 'y2', 'showticklabels': False, 'showline': False, 'ticks': '', 'showgrid': False},
+        'showlegend': False, 'width': 650, 'margin_t': 60
+    })
+    fig.add_histogram(x=resid, nbinsx=35, marker_color=DEFAULT_COLOR, hovertemplate='resid=%{x}<br>count=%{y}<extra></extra>')
+    fig.add_violin(x=resid, xaxis='x2', yaxis='y2', marker_color=DEFAULT_COLOR, hovertemplate='resid=%{x}<extra></extra>')
+
+    return fig
+
+
+def backtest_summary(backtest_df: pd.DataFrame, target: str) -> pd.DataFrame:
+    """
+    Spread of the backtest errors of one target by day of the week.
+
+    Parameters
+    ----------
+    backtest_df : pd.DataFrame
+        Per-origin, per-day-of-week errors, as returned by `src.backtest.backtest`.
+    target : str
+        Forecast name, one of `src.model_config.TARGETS`.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per day of the week with the number of forecast origins, the mean,
+        10th and 90th percentiles of the MAE over the origins and the mean error.
+    """
+
+    errors = backtest_df[backtest_df['target'] == target]
+    grouped = errors.groupby('day_of_week', observed=True)['mae']
+
+    return pd.DataFrame({
+        'origins': grouped.size(),
+        'mae': grouped.mean(),
+        'mae_p10': grouped.quantile(0.1),
+        'mae_p90': grouped.quantile(0.9),
+        'bias': errors.groupby('day_of_week', observed=True)['bias'].mean(),
+    }).sort_index().reset_index()
+
+
+def backtest_figure(backtest_df: pd.DataFrame, target: str) -> go.Figure:
+    """
+    Line chart of the MAE of every forecast window of one target against its origin.
+
+    Parameters
+    ----------
+    backtest_df : pd.DataFrame
+        Per-origin, per-day-of-week errors, as returned by `src.backtest.backtest`.
+    target : str
+        Forecast name, one of `src.model_config.TARGETS`.
+
+    Returns
+    -------
+    plotly.graph_objects.Figure
+    """
+
+    errors = backtest_df[backtest_df['target'] == target]
+    # MAE of the whole window: mean of the per-day-of-week MAE weighted by their days
+    total_error = (errors['mae'] * errors['days']).groupby(errors['origin']).sum()
+    mae = total_error / errors.groupby('origin')['days'].sum()
+
+    fig = go.Figure(layout={'xaxis_title': 'origin', 'yaxis_title': 'MAE', 'margin_t': 60})
+    fig.add_scatter(x=mae.index, y=mae.to_numpy(), mode='lines', line_color=DEFAULT_COLOR,
+                    hovertemplate='origin=%{x}<br>MAE=%{y}<extra></extra>')
+
+    return fig
@@ -6,6 +6,12 @@ from typing import Union
 import os
 import sys
 
+SEASONS = ['Winter', 'Spring', 'Summer', 'Fall']
+DAYS_OF_WEEK = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# season code (position in SEASONS) for each month, indexed by month - 1
+_MONTH_TO_SEASON = np.array([0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3, 0], dtype=np.int8)
+
 def get_season(dates: Union[datetime.date, pd.Series]) ->  Union[str, pd.Series]:
     """
     Assign season to a datetime value or a Series of datetime values.
@@ -42,21 +48,11 @@ def get_season(dates: Union[datetime.date, pd.Series]) ->  Union[str, pd.Series]
     'Fall'
     """
 
-    def _season_of_date(date):
-        month = date.month
-        if month in [12, 1, 2]:
-            return 'Winter'
-        elif month in [3, 4, 5]:
-            return 'Spring'
-        elif month in [6, 7, 8]:
-            return 'Summer'
-        else:
-            return 'Fall'
-
     if isinstance(dates, pd.Series):
-        return dates.apply(_season_of_date).rename("season")
+        codes = _season_codes(dates)
+        return pd.Series(np.array(SEASONS, dtype=object)[codes], index=dates.index, name="season")
     elif isinstance(dates, datetime.date):
-        return _season_of_date(dates)
+        return SEASONS[_MONTH_TO_SEASON[dates.month - 1]]
     else:
         raise TypeError(f"Input must be datetime.date or pd.Series but got {type(dates)}")
 
@@ -144,8 +140,7 @@ def is_holiday(date: Union[str, pd.Series]) -> Union[bool, pd.Series]:
     dtype: bool
     """
     if isinstance(date, pd.Series): 
-        holidays = date.apply(lambda day: day == 'Holiday') 
-        return holidays
+        return date == 'Holiday'
 
     elif isinstance(date, str):
         return date == 'Holiday'
@@ -184,22 +179,119 @@ def is_long_weekend(type_of_days: pd.Series) -> pd.Series:
     Name: is_long_weekend, dtype: bool
     """
 
-    is_long_weekend_list = [False] * len(type_of_days)
-
-    for i ,day in enumerate(type_of_days):
-
-        if day == 'Holiday':
-            prev_day = type_of_days[i-1] if i > 0 else None
-            next_day = type_of_days[i+1] if i < len(type_of_days) - 1 else None 
-            
-            if prev_day == 'Weekend':
-                is_long_weekend_list[i] = True
-                is_long_weekend_list[i-1] = True
-                is_long_weekend_list[i-2] = True
-            
-            if next_day == 'Weekend':
-                is_long_weekend_list[i] = True
-                is_long_weekend_list[i+1] = True
-                is_long_weekend_list[i+2] = True
-    
-    return pd.Series(is_long_weekend_list, name='is_long_weekend')
\ No newline at end of file
+    long_weekend = _long_weekend_mask(type_of_days.to_numpy())
+    return pd.Series(long_weekend, index=type_of_days.index, name='is_long_weekend')
+
+
+def build_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Build all model features for a chronologically ordered sales DataFrame in one vectorized pass.
+
+    Equivalent to calling `is_long_weekend`, `is_HCF`, `is_holiday` and `get_season` column by
+    column, but works directly on the underlying NumPy arrays: season and day of week come from
+    month/weekday lookup tables, holiday and HCF flags are boolean masks and long weekends are
+    found by shifting the holiday/weekend masks.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        A DataFrame sorted by date with at least the columns 'date' (datetime64), 
+        'type_of_day' (str) and 'HCF_sales' (float).
+
+    Returns
+    -------
+    pd.DataFrame
+        A copy of `df` with the added columns 'is_long_weekend', 'is_HCF', 'is_holiday' (bool),
+        'season' and 'day_of_week' (categorical, with categories ordered as in SEASONS and DAYS_OF_WEEK).
+
+    Raises
+    ------
+    KeyError
+        If any of the required columns is missing from `df`.
+
+    Examples
+    --------
+    >>> df = pd.DataFrame({
+    ...     'date': pd.to_datetime(['2024-12-24', '2024-12-25', '2024-12-26']),
+    ...     'type_of_day': ['Weekday', 'Holiday', 'Holiday'],
+    ...     'HCF_sales': [0.0, 0.0, 12.5]})
+    >>> build_features(df)[['is_HCF', 'is_holiday', 'season', 'day_of_week']]
+       is_HCF  is_holiday  season day_of_week
+    0   False       False  Winter     Tuesday
+    1   False        True  Winter   Wednesday
+    2    True        True  Winter    Thursday
+    """
+
+    missing = {'date', 'type_of_day', 'HCF_sales'} - set(df.columns)
+    if missing:
+        raise KeyError(f"Missing columns required to build features: {sorted(missing)}")
+
+    type_of_days = df['type_of_day'].to_numpy()
+
+    features = df.copy()
+    features['is_long_weekend'] = _long_weekend_mask(type_of_days)
+    features['is_HCF'] = df['HCF_sales'].to_numpy() > 0
+    features['is_holiday'] = type_of_days == 'Holiday'
+    features['season'], features['day_of_week'] = calendar_features(df['date'])
+
+    return features
+
+
+def calendar_features(dates: pd.Series) -> tuple:
+    """
+    Derive the season and day of week of a Series of dates with month/weekday lookup tables.
+
+    Parameters
+    ----------
+    dates : pd.Series
+        A pd.Series of datetime values.
+
+    Returns
+    -------
+    tuple of pd.Categorical
+        The season (categories ordered as SEASONS) and the day of week (categories ordered
+        as DAYS_OF_WEEK) of every date.
+
+    Examples
+    --------
+    >>> season, day_of_week = calendar_features(pd.Series(pd.to_datetime(['2024-07-01'])))
+    >>> list(season), list(day_of_week)
+    (['Summer'], ['Monday'])
+    """
+
+    dates = pd.DatetimeIndex(dates)
+    season = pd.Categorical.from_codes(_MONTH_TO_SEASON[dates.month - 1], categories=SEASONS)
+    day_of_week = pd.Categorical.from_codes(dates.dayofweek, categories=DAYS_OF_WEEK)
+
+    return season, day_of_week
+
+
+def _season_codes(dates: pd.Series) -> np.ndarray:
+    """Return the position in SEASONS of every date in `dates`."""
+    return _MONTH_TO_SEASON[pd.DatetimeIndex(dates).month - 1]
+
+
+def _long_weekend_mask(type_of_days: np.ndarray) -> np.ndarray:
+    """
+    Vectorized long weekend detection on an array of day types.
+
+    A holiday preceded by a weekend marks itself and the two days before it, a holiday
+    followed by a weekend marks itself and the two days after it. Days outside the
+    array bounds are ignored.
+    """
+
+    holiday = type_of_days == 'Holiday'
+    weekend = type_of_days == 'Weekend'
+
+    # holidays directly after / before a weekend day
+    after_weekend = np.zeros_like(holiday)
+    after_weekend[1:] = holiday[1:] & weekend[:-1]
+    before_weekend = np.zeros_like(holiday)
+    before_weekend[:-1] = holiday[:-1] & weekend[1:]
+
+    long_weekend = after_weekend | before_weekend
+    for shift in (1, 2):
+        long_weekend[:-shift] |= after_weekend[shift:]
+        long_weekend[shift:] |= before_weekend[:-shift]
+
+    return long_weekend
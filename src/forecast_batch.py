@@ -0,0 +1,202 @@
+import os
+import pickle
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from typing import Dict, Iterator, Optional, Sequence
+
+from src.feature_functions import calendar_features
+from src.model_config import FEATURES, TARGETS
+from src.stores import DEFAULT_STORE, store_path
+
+SCENARIO_COLUMNS = ['date', 'hours_opened', 'avg_temperature', 'rain', 'snow']
+FLAG_COLUMNS = ['is_long_weekend', 'is_HCF', 'is_holiday']
+
+
+def load_pipelines(targets: Optional[Dict[str, dict]] = None, store: str = DEFAULT_STORE) -> Dict[str, object]:
+    """
+    Load the trained pipeline of every forecast target of one store.
+
+    Parameters
+    ----------
+    targets : dict, optional
+        Forecast name -> target configuration with a 'model_file' entry, by default
+        `src.model_config.TARGETS`.
+    store : str, optional
+        Store id, by default `src.stores.DEFAULT_STORE`.
+
+    Returns
+    -------
+    dict
+        Forecast name -> fitted pipeline.
+
+    Raises
+    ------
+    FileNotFoundError
+        If a pipeline has not been trained yet.
+    """
+
+    targets = TARGETS if targets is None else targets
+    pipelines = {}
+
+    for name, config in targets.items():
+        model_path = store_path('models', store, config['model_file'])
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"{model_path} does not exist")
+
+        with open(model_path, 'rb') as f:
+            pipelines[name] = pickle.load(f)
+
+    return pipelines
+
+
+def make_horizon(start_date, days: int, hours_opened: Sequence[int] = (11,), avg_temperature: Sequence[float] = (5,),
+                 rain: Sequence[float] = (5,), snow: Sequence[float] = (0,)) -> pd.DataFrame:
+    """
+    Build forecasting scenarios for every combination of date and planned inputs.
+
+    Parameters
+    ----------
+    start_date : str or datetime-like
+        First day of the forecast horizon.
+    days : int
+        Number of consecutive days to forecast.
+    hours_opened, avg_temperature, rain, snow : sequence of numbers, optional
+        Values to consider for each input. One scenario is created per date and
+        combination of values.
+
+    Returns
+    -------
+    pd.DataFrame
+        Scenarios with the columns in SCENARIO_COLUMNS.
+
+    Examples
+    --------
+    >>> make_horizon('2025-06-01', days=14, hours_opened=[8, 11]).shape
+    (28, 5)
+    """
+
+    dates = pd.date_range(start_date, periods=days, freq='D')
+    grid = pd.MultiIndex.from_product([dates, hours_opened, avg_temperature, rain, snow], names=SCENARIO_COLUMNS)
+
+    return grid.to_frame(index=False)
+
+
+def build_scenario_features(scenarios: pd.DataFrame) -> pd.DataFrame:
+    """
+    Build the model features of many forecasting scenarios in one vectorized pass.
+
+    Parameters
+    ----------
+    scenarios : pd.DataFrame
+        One row per scenario with the columns in SCENARIO_COLUMNS. The flags 'is_long_weekend',
+        'is_HCF' and 'is_holiday' are optional and default to False, as do their missing values
+        (e.g. empty cells of a CSV file).
+
+    Returns
+    -------
+    pd.DataFrame
+        The scenarios with all columns in `src.model_config.FEATURES` added.
+
+    Raises
+    ------
+    KeyError
+        If a column of SCENARIO_COLUMNS is missing from `scenarios`.
+    """
+
+    missing = set(SCENARIO_COLUMNS) - set(scenarios.columns)
+    if missing:
+        raise KeyError(f"Missing scenario columns: {sorted(missing)}")
+
+    features = scenarios.reset_index(drop=True)
+    features['date'] = pd.to_datetime(features['date'])
+
+    for flag in FLAG_COLUMNS:
+        features[flag] = features[flag].fillna(False).astype(bool) if flag in features else np.zeros(len(features), dtype=bool)
+
+    features['season'], features['day_of_week'] = calendar_features(features['date'])
+
+    return features
+
+
+def forecast_batches(features: pd.DataFrame, pipelines: Dict[str, object], chunk_size: int = 100_000) -> Iterator[pd.DataFrame]:
+    """
+    Score all pipelines over scenario features, one chunk of rows at a time.
+
+    Every pipeline is called once per chunk on the whole chunk.
+
+    Parameters
+    ----------
+    features : pd.DataFrame
+        Output of `build_scenario_features`.
+    pipelines : dict
+        Forecast name -> fitted pipeline, as returned by `load_pipelines`.
+    chunk_size : int, optional
+        Number of scenarios scored per call, by default 100,000.
+
+    Yields
+    ------
+    pd.DataFrame
+        The scenario columns of the chunk plus one 'forecast_<name>' column per pipeline.
+    """
+
+    for start in range(0, len(features), chunk_size):
+        chunk = features.iloc[start:start + chunk_size]
+        forecasts = chunk[SCENARIO_COLUMNS + FLAG_COLUMNS].copy()
+
+        for name, pipeline in pipelines.items():
+            forecasts[f'forecast_{name}'] = pipeline.predict(chunk[FEATURES])
+
+        yield forecasts
+
+
+def write_forecasts(scenarios: pd.DataFrame, output_path: str, pipelines: Optional[Dict[str, object]] = None,
+                    chunk_size: int = 100_000) -> int:
+    """
+    Forecast every scenario with all pipelines and stream the results to a Parquet file.
+
+    Each scored chunk is written as its own row group, so memory use is bounded by
+    `chunk_size` rather than by the number of scenarios.
+
+    Parameters
+    ----------
+    scenarios : pd.DataFrame
+        Forecasting scenarios (see `build_scenario_features`).
+    output_path : str
+        Destination Parquet file.
+    pipelines : dict, optional
+        Forecast name -> fitted pipeline, loaded with `load_pipelines` if None.
+    chunk_size : int, optional
+        Number of scenarios scored and written at a time, by default 100,000.
+
+    Returns
+    -------
+    int
+        Number of scenarios forecasted.
+
+    Examples
+    --------
+    >>> write_forecasts(make_horizon('2025-06-01', days=14), 'results/forecast_batch.parquet')
+    14
+    """
+
+    pipelines = load_pipelines() if pipelines is None else pipelines
+    features = build_scenario_features(scenarios)
+
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    writer = None
+    try:
+        for forecasts in forecast_batches(features, pipelines, chunk_size):
+            table = pa.Table.from_pandas(forecasts, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, table.schema, compression='zstd')
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return len(features)
@@ -0,0 +1,226 @@
+import cProfile
+import datetime
+import io
+import json
+import marshal
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+# JSON lines log of the stage timings of the pipeline scripts and the dashboard pages
+TIMINGS_LOG = 'logs/timings.jsonl'
+# size above which the log is moved to `<log>.1` (replacing the previous one) and restarted
+MAX_LOG_BYTES = 5_000_000
+
+# fields added to every timing recorded in the current thread (see `set_timing_context`)
+_context = ContextVar('timing_context', default={})
+_write_lock = threading.Lock()
+
+
+def set_timing_context(source: str, **fields) -> None:
+    """
+    Label every timing recorded afterwards with its source and extra fields.
+
+    The labels replace the previous ones and are local to the current thread, so
+    concurrent Streamlit sessions label their timings independently. Scripts set them at
+    the start of `main`, pages at the top of the page.
+
+    Parameters
+    ----------
+    source : str
+        Script or page the timings belong to, e.g. 'train_models' or 'sales_monitor'.
+    **fields
+        JSON-serializable fields, e.g. the store.
+
+    Examples
+    --------
+    >>> set_timing_context('train_models', store='main')
+    >>> with timed('fit'):
+    ...     pipelines = fit_pipelines(train_df)
+    """
+
+    _context.set({'source': source, **fields})
+
+
+@contextmanager
+def timed(stage: str, path: str = TIMINGS_LOG, **fields) -> Iterator[None]:
+    """
+    Time a block (or, as a decorator, every call of a function) and log it.
+
+    One JSON record per block is appended to `path` (see `write_timing`): the fields set
+    with `set_timing_context`, `stage`, the elapsed wall-clock seconds, the status
+    ('ok' or 'error' if the block raised) and `fields`.
+
+    Parameters
+    ----------
+    stage : str
+        Name of the step, e.g. 'read', 'validate', 'features', 'fit', 'predict', 'write',
+        or for pages 'data load', 'aggregation', 'figures'.
+    path : str, optional
+        JSON lines log, by default TIMINGS_LOG.
+    **fields
+        JSON-serializable fields added to the record.
+
+    Examples
+    --------
+    >>> with timed('read'):
+    ...     train_df = read_table(store_path('train', 'main'))
+
+    >>> @timed('write')
+    ... def save(df): ...
+    """
+
+    status = 'error'
+    start = time.perf_counter()
+    try:
+        yield
+        status = 'ok'
+    finally:
+        seconds = time.perf_counter() - start
+        write_timing({
+            **_context.get(),
+            'stage': stage,
+            'seconds': round(seconds, 6),
+            'status': status,
+            **fields,
+        }, path)
+
+
+def write_timing(record: dict, path: str = TIMINGS_LOG) -> None:
+    """
+    Append a timing record to a JSON lines log.
+
+    Records are stamped with the current local time (unless they have a 'time') and written
+    with a single `write` in append mode, so the processes of a pipeline run can log to the
+    same file. A log over MAX_LOG_BYTES is rotated first.
+
+    Parameters
+    ----------
+    record : dict
+        JSON-serializable record, e.g. as written by `timed`.
+    path : str, optional
+        JSON lines log, by default TIMINGS_LOG.
+    """
+
+    record = {'time': datetime.datetime.now().isoformat(timespec='milliseconds'), **record}
+    line = json.dumps(record, default=str) + '\n'
+    directory = os.path.dirname(path)
+    with _write_lock:
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(path) and os.path.getsize(path) > MAX_LOG_BYTES:
+            os.replace(path, path + '.1')
+        with open(path, 'a') as f:
+            f.write(line)
+
+
+def read_timings(path: str = TIMINGS_LOG) -> List[dict]:
+    """
+    Read the records of a timings log, the rotated part first.
+
+    Lines that are not valid JSON (e.g. cut by a full disk) are skipped.
+
+    Parameters
+    ----------
+    path : str, optional
+        JSON lines log, by default TIMINGS_LOG.
+
+    Returns
+    -------
+    list of dict
+        The records, oldest first.
+
+    Raises
+    ------
+    FileNotFoundError
+        If `path` does not exist.
+    """
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} does not exist")
+
+    records = []
+    for part in (path + '.1', path):
+        if not os.path.exists(part):
+            continue
+        with open(part) as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+
+    return records
+
+
+@contextmanager
+def profiled(enabled: bool = True, path: Optional[str] = None) -> Iterator[Optional[cProfile.Profile]]:
+    """
+    Opt-in cProfile capture of a block.
+
+    Only the current thread is profiled (for the dashboard, the script thread of one
+    rerun). Use `profile_report` or `profile_stats` on the yielded profiler after the block.
+
+    Parameters
+    ----------
+    enabled : bool, optional
+        Whether to profile, by default True. If False, the block runs unprofiled and
+        None is yielded.
+    path : str, optional
+        File the stats are dumped to (readable with `pstats` or snakeviz), by default none.
+
+    Examples
+    --------
+    >>> with profiled() as profiler:
+    ...     pg.run()
+    >>> print(profile_report(profiler))
+    """
+
+    if not enabled:
+        yield None
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if path is not None:
+            profiler.dump_stats(path)
+
+
+def profile_report(profiler: cProfile.Profile, limit: int = 30, sort: str = 'cumulative') -> str:
+    """
+    Text table of the most expensive functions of a profile.
+
+    Parameters
+    ----------
+    profiler : cProfile.Profile
+        Profiler yielded by `profiled`.
+    limit : int, optional
+        Number of functions listed, by default 30.
+    sort : str, optional
+        `pstats` sort key, by default 'cumulative'.
+
+    Returns
+    -------
+    str
+    """
+
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).strip_dirs().sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+
+def profile_stats(profiler: cProfile.Profile) -> bytes:
+    """
+    Content of the `.prof` file `cProfile.Profile.dump_stats` would write, e.g. for a download.
+    """
+
+    profiler.create_stats()
+    return marshal.dumps(profiler.stats)
@@ -0,0 +1,211 @@
+import datetime
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+KPIS = ('sum', 'mean', 'ratio')
+
+
+def _ordinal(date) -> int:
+    # day number of a date; `toordinal` is much cheaper than NumPy or pandas conversions
+    if not isinstance(date, datetime.date):
+        date = pd.Timestamp(date)
+    return date.toordinal()
+
+
+class KPIEngine:
+    """
+    Sum, mean and ratio KPIs of daily metrics over any date window in constant time.
+
+    The metrics are laid out on a complete daily calendar from the first to the last date
+    of the data, and their cumulative sums (and the cumulative number of days with a value)
+    are stored with a leading zero. The total over a window is then the difference of two
+    prefix entries, whose positions follow from the dates by subtraction, so a query does
+    not depend on the length of the history or of the window. Days without data (closed
+    or unusual days) count as calendar days of a window but not in its means.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Daily metrics indexed by date. Several rows for the same date are added up.
+    columns : list of str, optional
+        Metrics to index, by default every numerical column of `df`.
+
+    Examples
+    --------
+    >>> engine = KPIEngine(sales_df)
+    >>> start, end = engine.window(30)
+    >>> engine.compare('ratio', 'total_sales_normalized', 'in_store_orders', start=start, end=end)
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: Optional[List[str]] = None):
+        columns = list(df.select_dtypes(include='number').columns) if columns is None else list(columns)
+        dates = df.index.to_numpy(dtype='datetime64[D]')
+        if len(dates) == 0:
+            raise ValueError("Cannot index an empty table")
+
+        self.columns = {column: k for k, column in enumerate(columns)}
+        first = dates.min()
+        self._first = _ordinal(pd.Timestamp(first))
+        self._n_days = int((dates.max() - first).astype(np.int64)) + 1
+
+        values = df[columns].to_numpy(dtype='float64')
+        present = ~np.isnan(values)
+        positions = (dates - first).astype(np.int64)
+
+        daily = np.zeros((self._n_days, len(columns)))
+        counts = np.zeros((self._n_days, len(columns)), dtype=np.int64)
+        np.add.at(daily, positions, np.where(present, values, 0.0))
+        np.add.at(counts, positions, present)
+
+        self._sums = np.vstack([np.zeros(len(columns)), daily.cumsum(axis=0)])
+        self._counts = np.vstack([np.zeros(len(columns), dtype=np.int64), counts.cumsum(axis=0)])
+
+    @property
+    def first_date(self) -> pd.Timestamp:
+        """First day of the calendar."""
+        return pd.Timestamp.fromordinal(self._first)
+
+    @property
+    def last_date(self) -> pd.Timestamp:
+        """Last day of the calendar."""
+        return pd.Timestamp.fromordinal(self._first + self._n_days - 1)
+
+    def window(self, days: int, end=None) -> Tuple[pd.Timestamp, pd.Timestamp]:
+        """
+        The `days` calendar days ending on `end`.
+
+        Parameters
+        ----------
+        days : int
+            Length of the window in calendar days.
+        end : datetime-like, optional
+            Last day of the window, by default `last_date`.
+
+        Returns
+        -------
+        start, end : pd.Timestamp
+        """
+
+        end = self.last_date if end is None else pd.Timestamp(end).normalize()
+        return end - pd.Timedelta(days=days - 1), end
+
+    @staticmethod
+    def previous(start, end) -> Tuple[pd.Timestamp, pd.Timestamp]:
+        """
+        The window of the same length just before [`start`, `end`].
+
+        Returns
+        -------
+        start, end : pd.Timestamp
+        """
+
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        return start - (end - start) - pd.Timedelta(days=1), start - pd.Timedelta(days=1)
+
+    def _bounds(self, start, end):
+        # prefix positions of the window [start, end] (dates or day numbers), clipped to the calendar
+        first = (start if isinstance(start, int) else _ordinal(start)) - self._first
+        last = (end if isinstance(end, int) else _ordinal(end)) - self._first + 1
+        return min(max(first, 0), self._n_days), min(max(last, 0), self._n_days)
+
+    def _sum(self, k, first, last):
+        return float(self._sums[last, k] - self._sums[first, k]) if last > first else 0.0
+
+    def _days(self, k, first, last):
+        return int(self._counts[last, k] - self._counts[first, k]) if last > first else 0
+
+    def _kpi(self, kpi, columns, first, last):
+        if kpi == 'sum':
+            return self._sum(self.columns[columns[0]], first, last)
+        if kpi == 'mean':
+            k = self.columns[columns[0]]
+            days = self._days(k, first, last)
+            return self._sum(k, first, last) / days if days else float('nan')
+        total = self._sum(self.columns[columns[1]], first, last)
+        return self._sum(self.columns[columns[0]], first, last) / total if total else float('nan')
+
+    def sum(self, column: str, start, end) -> float:
+        """
+        Total of a metric over the days from `start` to `end` (inclusive).
+
+        Parameters
+        ----------
+        column : str
+            Metric, one of `columns`.
+        start, end : datetime-like
+            First and last day of the window; days outside the data count as empty.
+
+        Returns
+        -------
+        float
+        """
+
+        return self._sum(self.columns[column], *self._bounds(start, end))
+
+    def days(self, column: str, start, end) -> int:
+        """
+        Number of days of the window with a value of the metric.
+
+        Returns
+        -------
+        int
+        """
+
+        return self._days(self.columns[column], *self._bounds(start, end))
+
+    def mean(self, column: str, start, end) -> float:
+        """
+        Average daily value of a metric over the days of the window with a value.
+
+        Returns
+        -------
+        float
+            NaN if the window has no data.
+        """
+
+        return self._kpi('mean', (column,), *self._bounds(start, end))
+
+    def ratio(self, numerator: str, denominator: str, start, end) -> float:
+        """
+        Ratio of the totals of two metrics over the window (e.g. sales per order).
+
+        Returns
+        -------
+        float
+            NaN if the total of `denominator` is 0.
+        """
+
+        return self._kpi('ratio', (numerator, denominator), *self._bounds(start, end))
+
+    def compare(self, kpi: str, *columns: str, start, end) -> Tuple[float, float]:
+        """
+        A KPI over a window and over the preceding window of the same length.
+
+        Parameters
+        ----------
+        kpi : str
+            One of KPIS: 'sum', 'mean' or 'ratio'.
+        *columns : str
+            Metric of the KPI (numerator and denominator for 'ratio').
+        start, end : datetime-like
+            First and last day of the window.
+
+        Returns
+        -------
+        value, previous_value : float
+
+        Raises
+        ------
+        ValueError
+            If `kpi` is unknown.
+        """
+
+        if kpi not in KPIS:
+            raise ValueError(f"Unknown KPI {kpi!r}, expected one of {KPIS}")
+
+        first, last = _ordinal(start), _ordinal(end)
+        length = last - first + 1
+        return (self._kpi(kpi, columns, *self._bounds(first, last)),
+                self._kpi(kpi, columns, *self._bounds(first - length, first - 1)))
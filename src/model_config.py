@@ -0,0 +1,70 @@
+from src.stores import DEFAULT_STORE, store_path
+
+# Features used by every forecasting pipeline
+NUMERICAL_FEATURES = ['hours_opened', 'avg_temperature', 'rain', 'snow']
+CATEGORICAL_FEATURES = ['is_long_weekend', 'is_HCF', 'season', 'day_of_week', 'is_holiday']
+FEATURES = NUMERICAL_FEATURES + CATEGORICAL_FEATURES
+
+CATEGORY_ORDERS = [
+    [False, True],  # is_long_weekend
+    [False, True],  # is_HCF
+    ['Winter', 'Spring', 'Summer', 'Fall'],  # season
+    ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'],  # day_of_week
+    [False, True]  # is_holiday
+]
+
+# Forecast name -> file name of the trained pipeline in the model directory of each store (see `model_path`)
+MODEL_FILES = {
+    'total_sales': 'lr_pipe_total_sales.pkl',
+    'item_A_sales': 'lr_pipe_item_A_sales.pkl',
+    'item_B_sales': 'lr_pipe_item_B_sales.pkl',
+    'orders': 'pr_pipe_orders.pkl',
+}
+
+
+def _targets():
+    from sklearn.linear_model import LinearRegression, PoissonRegressor
+
+    # Forecast name -> predicted column, (unfitted) regressor and file name of the trained
+    # pipeline in the model directory of each store (see `model_path`).
+    # Adding an entry (and its MODEL_FILES entry) is enough for `scripts/train_models.py`
+    # to train and save a new target.
+    return {
+        'total_sales': {'target': 'total_sales_normalized', 'estimator': LinearRegression(), 'model_file': MODEL_FILES['total_sales']},
+        'item_A_sales': {'target': 'item_A_sales', 'estimator': LinearRegression(), 'model_file': MODEL_FILES['item_A_sales']},
+        'item_B_sales': {'target': 'item_B_sales', 'estimator': LinearRegression(), 'model_file': MODEL_FILES['item_B_sales']},
+        'orders': {'target': 'in_store_orders', 'estimator': PoissonRegressor(), 'model_file': MODEL_FILES['orders']},
+    }
+
+
+def __getattr__(name):
+    # TARGETS is built on first use: the dashboard imports this module (e.g. `model_path`)
+    # without paying for the sklearn import
+    if name == 'TARGETS':
+        globals()['TARGETS'] = _targets()
+        return globals()['TARGETS']
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def model_path(name: str, store: str = DEFAULT_STORE) -> str:
+    """
+    Path of the trained pipeline of a forecast target for one store.
+
+    Parameters
+    ----------
+    name : str
+        Forecast name, one of MODEL_FILES.
+    store : str, optional
+        Store id, by default `src.stores.DEFAULT_STORE`.
+
+    Returns
+    -------
+    str
+
+    Examples
+    --------
+    >>> model_path('orders', 'main')
+    'model/main/pr_pipe_orders.pkl'
+    """
+
+    return store_path('models', store, MODEL_FILES[name])
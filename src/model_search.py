@@ -0,0 +1,337 @@
+import json
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression, PoissonRegressor
+from sklearn.metrics import mean_absolute_error
+from sklearn.model_selection import TimeSeriesSplit
+from sklearn.pipeline import Pipeline, make_pipeline
+
+from src.model_config import FEATURES, TARGETS
+from src.storage import atomic_open, read_table
+from src.stores import DEFAULT_STORE, store_path
+from src.training import make_preprocessor
+
+# record of the last search of every target, next to the winning pipelines
+SEARCH_RECORD_FILE = 'model_search.json'
+
+# Model family -> unfitted regressor and grid of hyperparameters searched.
+# The random forest and gradient boosting grids follow the notebook prototypes
+# (notebooks/random_forest_test.ipynb, notebooks/XGBoost_test.ipynb).
+MODEL_FAMILIES = {
+    'linear': {'estimator': LinearRegression(), 'grid': {}},
+    'poisson': {'estimator': PoissonRegressor(max_iter=1000), 'grid': {'alpha': [1e-3, 1e-2, 0.1, 1.0]}},
+    'random_forest': {
+        'estimator': RandomForestRegressor(n_estimators=100, random_state=123),
+        'grid': {'max_depth': [None, 5, 10], 'min_samples_leaf': [1, 4]},
+    },
+    'hist_gradient_boosting': {
+        'estimator': HistGradientBoostingRegressor(random_state=123),
+        'grid': {'learning_rate': [0.05, 0.1], 'max_leaf_nodes': [7, 31], 'max_iter': [100, 300]},
+    },
+}
+
+# transformed folds shared by the candidates evaluated in one process (see `_set_folds`)
+_folds = []
+
+
+def best_model_path(name: str, store: str = DEFAULT_STORE) -> str:
+    """
+    Path of the pipeline chosen by the model search for a forecast target.
+
+    Parameters
+    ----------
+    name : str
+        Forecast name, one of `src.model_config.TARGETS`.
+    store : str, optional
+        Store id, by default `src.stores.DEFAULT_STORE`.
+
+    Returns
+    -------
+    str
+
+    Examples
+    --------
+    >>> best_model_path('orders', 'main')
+    'model/main/best_pipe_orders.pkl'
+    """
+
+    return store_path('models', store, f'best_pipe_{name}.pkl')
+
+
+def candidates(families: Optional[List[str]] = None) -> List[dict]:
+    """
+    Every combination of hyperparameters of the model families searched.
+
+    Parameters
+    ----------
+    families : list of str, optional
+        Model families, by default every family of MODEL_FAMILIES.
+
+    Returns
+    -------
+    list of dict
+        One {'family': ..., 'params': ...} per candidate.
+    """
+
+    families = list(MODEL_FAMILIES) if families is None else families
+    result = []
+    for family in families:
+        grid = MODEL_FAMILIES[family]['grid']
+        for values in product(*grid.values()):
+            result.append({'family': family, 'params': dict(zip(grid, values))})
+
+    return result
+
+
+def _estimator(candidate):
+    return clone(MODEL_FAMILIES[candidate['family']]['estimator']).set_params(**candidate['params'])
+
+
+def make_candidate(candidate: dict) -> Pipeline:
+    """
+    Unfitted forecasting pipeline of a candidate: the shared preprocessor and its regressor.
+    """
+
+    return make_pipeline(make_preprocessor(), _estimator(candidate))
+
+
+def preprocess_folds(df: pd.DataFrame, n_splits: int = 5) -> List[dict]:
+    """
+    Time-series cross-validation folds of a training table, preprocessed once.
+
+    Each fold trains on the rows before a validation block and validates on the block
+    (expanding window). The preprocessor only depends on the features, so it is fitted
+    on the training rows of each fold once and its output is shared by every candidate
+    and target.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Training data indexed and sorted by date, with all columns in FEATURES.
+    n_splits : int, optional
+        Number of folds, by default 5.
+
+    Returns
+    -------
+    list of dict
+        Per fold, the transformed training and validation matrices ('X_train', 'X_valid'),
+        the row positions of the training and validation rows ('train', 'valid') and the
+        first and last validation dates.
+    """
+
+    folds = []
+    for train, valid in TimeSeriesSplit(n_splits=n_splits).split(df):
+        preprocessor = make_preprocessor()
+        folds.append({
+            'X_train': preprocessor.fit_transform(df[FEATURES].iloc[train]),
+            'X_valid': preprocessor.transform(df[FEATURES].iloc[valid]),
+            'train': train,
+            'valid': valid,
+            'valid_start': df.index[valid[0]].strftime('%Y-%m-%d'),
+            'valid_end': df.index[valid[-1]].strftime('%Y-%m-%d'),
+        })
+
+    return folds
+
+
+def _set_folds(folds):
+    # pool initializer: the folds are sent once per worker, not once per candidate
+    global _folds
+    _folds = folds
+
+
+def _score(candidate, y, fold):
+    # validation MAE of a candidate on one fold, from the cached transformed matrices
+    data = _folds[fold]
+    estimator = _estimator(candidate).fit(data['X_train'], y[data['train']])
+    return mean_absolute_error(y[data['valid']], estimator.predict(data['X_valid']))
+
+
+def search(df: pd.DataFrame, targets: Optional[Dict[str, dict]] = None, families: Optional[List[str]] = None,
+           n_splits: int = 5, budget: float = 600.0, tolerance: float = 0.2, min_folds: int = 2,
+           n_jobs: Optional[int] = None) -> Dict[str, dict]:
+    """
+    Time-series cross-validated search over model families for every forecast target.
+
+    Candidates (every family and hyperparameter combination, for every target) are
+    evaluated fold by fold, in chronological order, on a process pool. After `min_folds`
+    folds, a candidate whose mean validation MAE exceeds the best mean of its target by
+    more than `tolerance` is stopped. Every candidate is evaluated on the first fold; no
+    new fold is started once `budget` seconds have passed. The winner of a target is the
+    candidate with the lowest mean MAE among those evaluated on the most folds.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Training data indexed and sorted by date, with all columns in
+        `src.model_config.FEATURES` and every target column.
+    targets : dict, optional
+        Forecast name -> target configuration with a 'target' entry, by default
+        `src.model_config.TARGETS`.
+    families : list of str, optional
+        Model families searched, by default every family of MODEL_FAMILIES. The Poisson
+        family is skipped for targets with negative values.
+    n_splits : int, optional
+        Number of cross-validation folds, by default 5.
+    budget : float, optional
+        Time budget in seconds, by default 600.
+    tolerance : float, optional
+        Relative MAE margin over the best candidate above which a candidate is stopped
+        early, by default 0.2 (20% worse).
+    min_folds : int, optional
+        Number of folds every candidate is evaluated on before it can be stopped, by default 2.
+    n_jobs : int, optional
+        Number of worker processes, by default the number of CPUs.
+
+    Returns
+    -------
+    dict
+        Forecast name -> search record: the winning candidate ('family', 'params',
+        'mean_mae'), the folds, the search settings and every candidate with its fold
+        MAEs and status ('completed', 'stopped early' or 'out of budget').
+
+    Raises
+    ------
+    ValueError
+        If `df` has missing feature values or too few rows for `n_splits` folds.
+    """
+
+    targets = TARGETS if targets is None else targets
+    if df[FEATURES].isna().any().any():
+        raise ValueError("The model search needs complete features, see the weather gap report of the store")
+    if len(df) <= n_splits + 1:
+        raise ValueError(f"{n_splits} folds need more than {n_splits + 1} rows, got {len(df)}")
+
+    started = time.perf_counter()
+    folds = preprocess_folds(df, n_splits)
+
+    # one entry per target and candidate, evaluated fold by fold
+    entries = []
+    for name, config in targets.items():
+        y = df[config['target']].to_numpy(dtype='float64')
+        for candidate in candidates(families):
+            if candidate['family'] == 'poisson' and y.min() < 0:
+                continue
+            entries.append({'name': name, 'y': y, 'candidate': candidate, 'fold_mae': [], 'status': 'completed'})
+
+    n_jobs = n_jobs or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=n_jobs, initializer=_set_folds, initargs=(folds,)) if n_jobs > 1 else None
+    if executor is None:
+        _set_folds(folds)
+
+    out_of_budget = False
+    try:
+        for fold in range(n_splits):
+            running = [entry for entry in entries if entry['status'] == 'completed']
+            if fold > 0 and time.perf_counter() - started > budget:
+                # the candidates still running keep the folds they completed
+                out_of_budget = True
+                for entry in running:
+                    entry['status'] = 'out of budget'
+                break
+
+            tasks = [(entry['candidate'], entry['y'], fold) for entry in running]
+            scores = executor.map(_score, *zip(*tasks)) if executor is not None else (_score(*task) for task in tasks)
+            for entry, mae in zip(running, scores):
+                entry['fold_mae'].append(mae)
+
+            if fold + 1 >= min_folds:
+                for name in targets:
+                    means = [np.mean(entry['fold_mae']) for entry in running if entry['name'] == name]
+                    best = min(means, default=np.inf)
+                    for entry in running:
+                        if entry['name'] == name and np.mean(entry['fold_mae']) > best * (1 + tolerance):
+                            entry['status'] = 'stopped early'
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    records = {}
+    for name, config in targets.items():
+        results = [entry for entry in entries if entry['name'] == name]
+        most_folds = max(len(entry['fold_mae']) for entry in results)
+        winner = min((entry for entry in results if len(entry['fold_mae']) == most_folds),
+                     key=lambda entry: np.mean(entry['fold_mae']))
+
+        records[name] = {
+            'target': config['target'],
+            'winner': {**winner['candidate'], 'mean_mae': float(np.mean(winner['fold_mae'])), 'folds': most_folds},
+            'metric': 'mean absolute error, time-series cross-validation',
+            'folds': [{'train_rows': len(data['train']), 'valid_start': data['valid_start'],
+                       'valid_end': data['valid_end']} for data in folds],
+            'settings': {'budget': budget, 'tolerance': tolerance, 'min_folds': min_folds, 'out_of_budget': out_of_budget},
+            'training_rows': len(df),
+            'training_dates': [df.index[0].strftime('%Y-%m-%d'), df.index[-1].strftime('%Y-%m-%d')],
+            'elapsed': round(time.perf_counter() - started, 2),
+            'candidates': sorted(({**entry['candidate'], 'fold_mae': [float(mae) for mae in entry['fold_mae']],
+                                   'mean_mae': float(np.mean(entry['fold_mae'])), 'status': entry['status']}
+                                  for entry in results),
+                                 key=lambda record: (-len(record['fold_mae']), record['mean_mae'])),
+        }
+
+    return records
+
+
+def search_all(store: str = DEFAULT_STORE, targets: Optional[Dict[str, dict]] = None, **kwargs) -> Dict[str, Pipeline]:
+    """
+    Search the best model of every forecast target of one store and save it.
+
+    The winning pipeline of each target is refitted on the whole training table and
+    written to `best_model_path` (the production pipelines of `src.model_config.TARGETS`
+    are left unchanged). The search records are merged into SEARCH_RECORD_FILE in the
+    store's model directory.
+
+    Parameters
+    ----------
+    store : str, optional
+        Store id, by default `src.stores.DEFAULT_STORE`.
+    targets : dict, optional
+        Forecast name -> target configuration with a 'target' entry, by default
+        `src.model_config.TARGETS`.
+    **kwargs
+        Passed to `search` (families, n_splits, budget, tolerance, min_folds, n_jobs).
+
+    Returns
+    -------
+    dict
+        Forecast name -> fitted winning pipeline.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the training table of `store` does not exist.
+    """
+
+    targets = TARGETS if targets is None else targets
+
+    target_columns = list(dict.fromkeys(config['target'] for config in targets.values()))
+    train_df = read_table(store_path('train', store), columns=FEATURES + target_columns, index_col='date')
+
+    records = search(train_df, targets, **kwargs)
+
+    pipelines = {}
+    for name, record in records.items():
+        pipeline = make_candidate(record['winner']).fit(train_df[FEATURES], train_df[record['target']])
+        with atomic_open(best_model_path(name, store)) as f:
+            pickle.dump(pipeline, f)
+        pipelines[name] = pipeline
+
+    record_path = store_path('models', store, SEARCH_RECORD_FILE)
+    previous = {}
+    if os.path.exists(record_path):
+        with open(record_path) as f:
+            previous = json.load(f)
+
+    with atomic_open(record_path, mode='w') as f:
+        json.dump({**previous, **records}, f, indent=2)
+
+    return pipelines
@@ -0,0 +1,154 @@
+import pickle
+from typing import Dict
+
+import numpy as np
+from sklearn.linear_model import LinearRegression
+from sklearn.pipeline import Pipeline
+
+from src.model_config import FEATURES, NUMERICAL_FEATURES, TARGETS, model_path
+from src.prediction_intervals import bootstrap_intervals, intervals_path
+from src.scoring_kernel import compile_pipeline, kernel_path
+from src.storage import atomic_open, read_table
+from src.stores import DEFAULT_STORE, store_path
+from src.training import NORMAL_EQUATIONS_FILE, NormalEquations
+
+
+def _set_scaler(pipeline, mean, var, n):
+    # the scaler a full refit would fit, from the summed statistics; returns the previous one
+    scaler = pipeline.named_steps['columntransformer'].named_transformers_['standardscaler']
+    previous = scaler.mean_.copy(), scaler.scale_.copy()
+
+    # constant features keep a unit scale, as in `StandardScaler`
+    eps = np.finfo(np.float64).eps
+    constant = var <= n * eps * var + (n * mean * eps) ** 2
+    scaler.mean_, scaler.var_, scaler.n_samples_seen_ = mean, var, np.int64(n)
+    scaler.scale_ = np.where(constant, 1.0, np.sqrt(var))
+
+    return previous
+
+
+def _set_linear(pipeline, coef, intercept):
+    # unscaled least-squares coefficients -> coefficients on the scaled design matrix
+    scaler = pipeline.named_steps['columntransformer'].named_transformers_['standardscaler']
+    numerical = slice(-len(NUMERICAL_FEATURES), None)
+    estimator = pipeline.named_steps['linearregression']
+
+    estimator.coef_ = coef.copy()
+    estimator.coef_[numerical] = coef[numerical] * scaler.scale_
+    estimator.intercept_ = float(intercept + scaler.mean_ @ coef[numerical])
+
+
+def _warm_start(pipeline, previous_scaler, train_df, target):
+    # refit the regressor from its previous coefficients, re-expressed for the new scaler
+    scaler = pipeline.named_steps['columntransformer'].named_transformers_['standardscaler']
+    previous_mean, previous_scale = previous_scaler
+    numerical = slice(-len(NUMERICAL_FEATURES), None)
+    estimator = pipeline.steps[-1][1]
+
+    unscaled = estimator.coef_[numerical] / previous_scale
+    estimator.intercept_ += (scaler.mean_ - previous_mean) @ unscaled
+    estimator.coef_[numerical] = unscaled * scaler.scale_
+
+    X = pipeline.named_steps['columntransformer'].transform(train_df[FEATURES])
+    estimator.set_params(warm_start=True).fit(X, train_df[target])
+    estimator.set_params(warm_start=False)
+
+
+def update_pipelines(store: str = DEFAULT_STORE, refit: bool = True, n_boot: int = 1000, seed: int = 0) -> Dict[str, Pipeline]:
+    """
+    Add the days appended to a store's training table since the last update to its pipelines.
+
+    The linear regressions are updated from their `NormalEquations`: each new day is a
+    rank-one update of X'X and X'y, after which the coefficients and the scaler statistics
+    are solved from the sums, without refitting on the history, and the pipelines predict like a full refit
+    with `src.training.train_all`. The other regressors (the Poisson regression) are
+    refitted on the whole training table starting from their previous coefficients, which
+    takes a few solver iterations instead of a cold fit.
+
+    The prediction intervals of the updated pipelines are bootstrapped again on the whole
+    training table (see `src.prediction_intervals.bootstrap_intervals`), so that the
+    dashboard never shows intervals of the previous model around the new forecasts.
+
+    The updated pipelines, their scoring kernels and intervals and the normal equations are
+    written atomically (the normal equations last), so the dashboard never loads a partially
+    written model and an interrupted update can be run again.
+
+    Parameters
+    ----------
+    store : str, optional
+        Store id, by default `src.stores.DEFAULT_STORE`.
+    refit : bool, optional
+        Whether to warm-start the regressors without normal equations, by default True.
+        If False, only the linear regressions are updated.
+    n_boot : int, optional
+        Number of bootstrap resamples of the prediction intervals, by default 1000 (as
+        `scripts/export_intervals.py`).
+    seed : int, optional
+        Seed of the resampling, by default 0.
+
+    Returns
+    -------
+    dict
+        Forecast name -> updated pipeline; empty if the training table has no new day.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the normal equations or the training table of `store` do not exist (run
+        `scripts/train_models.py` first).
+    ValueError
+        If the normal equations do not cover every linear target of `src.model_config.TARGETS`.
+
+    Examples
+    --------
+    >>> update_pipelines('main')
+    """
+
+    equations_path = store_path('models', store, NORMAL_EQUATIONS_FILE)
+    equations = NormalEquations.load(equations_path)
+
+    linear = [name for name, config in TARGETS.items() if type(config['estimator']) is LinearRegression]
+    missing = sorted(set(linear) - set(equations.targets))
+    if missing:
+        raise ValueError(f"{equations_path} has no statistics for {missing}, retrain with scripts/train_models.py")
+    warm_started = [name for name in TARGETS if name not in equations.targets] if refit else []
+
+    columns = FEATURES + list(dict.fromkeys(config['target'] for config in TARGETS.values()))
+    train_path = store_path('train', store)
+    new_df = read_table(train_path, columns=columns, index_col='date',
+                        filters=[('date', '>', equations.last_date)]).sort_index()
+    if new_df.empty:
+        return {}
+
+    equations.update(new_df)
+    mean, var = equations.scaler_stats()
+    coef, intercept = equations.solve()
+
+    pipelines = {}
+    for k, name in enumerate(equations.targets):
+        with open(model_path(name, store), 'rb') as f:
+            pipelines[name] = pickle.load(f)
+        _set_scaler(pipelines[name], mean, var, equations.n)
+        _set_linear(pipelines[name], coef[:, k], intercept[k])
+
+    # the warm starts and the intervals need the whole table
+    train_df = read_table(train_path, columns=columns, index_col='date')
+    for name in warm_started:
+        with open(model_path(name, store), 'rb') as f:
+            pipelines[name] = pickle.load(f)
+        previous_scaler = _set_scaler(pipelines[name], mean, var, equations.n)
+        _warm_start(pipelines[name], previous_scaler, train_df, TARGETS[name]['target'])
+
+    intervals = {name: bootstrap_intervals(pipeline, train_df, TARGETS[name]['target'], n_boot=n_boot, seed=seed)
+                 for name, pipeline in pipelines.items()}
+
+    for name, pipeline in pipelines.items():
+        path = model_path(name, store)
+        with atomic_open(path) as f:
+            pickle.dump(pipeline, f)
+        compile_pipeline(pipeline).save(kernel_path(path))
+        intervals[name].save(intervals_path(path))
+
+    equations.save(equations_path)
+
+    return pipelines
@@ -0,0 +1,336 @@
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from src.instrumentation import write_timing
+from src.model_config import TARGETS, model_path
+from src.prediction_intervals import intervals_path
+from src.scoring_kernel import kernel_path
+from src.storage import content_hash
+from src.stores import list_stores, store_path
+from src.training import NORMAL_EQUATIONS_FILE
+
+# stage name -> hashes of the inputs and outputs of its last successful run
+STATE_FILE = '.pipeline_state.json'
+# file -> (mtime_ns, size, sha256), avoids re-reading unchanged files
+HASH_MEMO_FILE = '.pipeline_hashes.json'
+
+
+class Stage(NamedTuple):
+    """
+    One step of the pipeline.
+
+    `inputs` are files, directories or glob patterns read by the script (the script itself
+    is always an input); `outputs` are the files or directories it writes. A stage depends
+    on every stage that writes one of its inputs. `args` are passed to the script, e.g.
+    the store it processes.
+    """
+    name: str
+    script: str
+    inputs: List[str]
+    outputs: List[str]
+    args: Tuple[str, ...] = ()
+
+
+_WEATHER = ['data/processed/weather.parquet', 'data/processed/weather_fallback']
+
+_RESULTS = [
+    ('results_total_sales', 'scripts/get_model_results_total.py', 'total_sales', 'total_sales'),
+    ('results_item_A', 'scripts/get_model_results_A.py', 'item_A_sales', 'item_A'),
+    ('results_item_B', 'scripts/get_model_results_B.py', 'item_B_sales', 'item_B'),
+    ('results_orders', 'scripts/get_model_results_orders.py', 'orders', 'orders'),
+]
+
+
+def store_stages(store: str) -> List[Stage]:
+    """
+    Stages that process one store, from its sales workbooks to its model results.
+
+    Stage names are suffixed with the store id (e.g. 'train:main') and every script is
+    called with `--store <store>`, so the stages of different stores are independent
+    and run in parallel.
+
+    Parameters
+    ----------
+    store : str
+        Store id.
+
+    Returns
+    -------
+    list of Stage
+    """
+
+    def path(name, *parts):
+        return store_path(name, store, *parts)
+
+    models = [model_path(name, store) for name in TARGETS]
+    args = ('--store', store)
+
+    stages = [
+        Stage(f'sales:{store}', 'scripts/prepare_sales.csv.py',
+              [path('sales_inputs', '*.xlsx'), 'src/data_validation.py', 'src/schemas.py', 'src/rollups.py', 'src/storage.py'],
+              [path('sales'), path('rollups')], args),
+        Stage(f'combined:{store}', 'scripts/prepare_combined.csv.py',
+              [path('sales')] + _WEATHER + ['src/weather_join.py', 'src/aggregate_cube.py', 'src/data_validation.py', 'src/schemas.py', 'src/feature_functions.py', 'src/storage.py'],
+              [path('combined'), path('weather_gaps'), path('cube'), path('cube_history'), path('train'), path('test')], args),
+        Stage(f'train:{store}', 'scripts/train_models.py',
+              [path('train'), 'src/training.py', 'src/model_config.py', 'src/storage.py'],
+              models + [path('models', NORMAL_EQUATIONS_FILE)], args),
+        Stage(f'kernels:{store}', 'scripts/export_kernels.py',
+              models + [path('test'), 'src/scoring_kernel.py', 'src/forecast_batch.py', 'src/model_config.py'],
+              [kernel_path(model) for model in models], args),
+        Stage(f'intervals:{store}', 'scripts/export_intervals.py',
+              models + [path('train'), path('test'), 'src/prediction_intervals.py', 'src/training.py', 'src/model_config.py'],
+              [intervals_path(model) for model in models], args),
+        Stage(f'backtest:{store}', 'scripts/backtest.py',
+              [path('combined'), 'src/backtest.py', 'src/training.py', 'src/model_config.py'],
+              [path('results', 'backtest.parquet')], args),
+    ]
+
+    for name, script, target, suffix in _RESULTS:
+        stages.append(Stage(
+            f'{name}:{store}', script,
+            [path('train'), path('test'), model_path(target, store), 'src/diagnostics_plots.py', 'src/storage.py'],
+            [path('results', f'mae_grouped_{suffix}.csv'), path('results', f'trained_coef_{suffix}.csv'),
+             path('results', f'fit_series_{suffix}.parquet')],
+            args))
+
+    return stages
+
+
+def build_pipeline(stores: Optional[List[str]] = None) -> List[Stage]:
+    """
+    Build the pipeline: the shared weather stage and the stages of every store.
+
+    Parameters
+    ----------
+    stores : list of str, optional
+        Stores to process, by default every store with a sales input directory
+        (see `src.stores.list_stores`).
+
+    Returns
+    -------
+    list of Stage
+    """
+
+    stores = list_stores() if stores is None else stores
+
+    pipeline = [
+        Stage('weather', 'scripts/prepare_weather.csv.py',
+              ['data/inputs/weather/*.csv', 'data/inputs/weather/fallback/*.csv', 'src/weather_ingest.py', 'src/data_validation.py', 'src/schemas.py', 'src/storage.py'],
+              _WEATHER),
+    ]
+    for store in stores:
+        pipeline.extend(store_stages(store))
+
+    return pipeline
+
+
+def _is_within(path, output):
+    path, output = os.path.normpath(path), os.path.normpath(output)
+    return path == output or path.startswith(output + os.sep)
+
+
+def stage_dependencies(stages: List[Stage]) -> Dict[str, set]:
+    """
+    Derive the stage graph from the declared inputs and outputs.
+
+    Parameters
+    ----------
+    stages : list of Stage
+        Stages of the pipeline.
+
+    Returns
+    -------
+    dict
+        Stage name -> names of the stages it depends on.
+
+    Raises
+    ------
+    ValueError
+        If two stages write the same output or the stages form a cycle.
+    """
+
+    producers = {}
+    for stage in stages:
+        for output in stage.outputs:
+            if output in producers:
+                raise ValueError(f"{output} is written by both {producers[output]} and {stage.name}")
+            producers[output] = stage.name
+
+    dependencies = {
+        stage.name: {producer for output, producer in producers.items()
+                     if producer != stage.name and any(_is_within(path, output) for path in stage.inputs)}
+        for stage in stages
+    }
+
+    # Kahn's algorithm, only to detect cycles
+    remaining = {name: set(deps) for name, deps in dependencies.items()}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Pipeline stages form a cycle: {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+    return dependencies
+
+
+def _resolve(patterns):
+    paths = []
+    for pattern in patterns:
+        paths.extend(sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern])
+    return paths
+
+
+def _hash_paths(paths, memo):
+    return {path: content_hash(path, memo) for path in paths}
+
+
+def _read_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_json(path, payload):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _run_script(script, args=(), profile_path=None):
+    start = time.perf_counter()
+    profile = ['-m', 'cProfile', '-o', profile_path] if profile_path is not None else []
+    completed = subprocess.run([sys.executable, *profile, script, *args], capture_output=True, text=True)
+    return completed.returncode, (completed.stdout + completed.stderr).strip(), time.perf_counter() - start
+
+
+def run_pipeline(stages: Optional[List[Stage]] = None, jobs: Optional[int] = None, force: bool = False,
+                 dry_run: bool = False, log: Callable[[str], None] = print,
+                 profile_dir: Optional[str] = None) -> Dict[str, str]:
+    """
+    Run the pipeline, skipping stages whose inputs and outputs have not changed.
+
+    A stage is skipped when the content hashes of its script and inputs match those of
+    its last successful run and its outputs still hash to what that run wrote. Stages run
+    as separate Python processes, at most `jobs` at a time, as soon as the stages they
+    depend on have finished, so independent stages (e.g. different stores, or the four
+    results scripts of a store) run in parallel. If an upstream stage reruns but writes identical outputs, downstream stages
+    are still skipped. The duration of every stage that runs is appended to the timings
+    log (see `src.instrumentation`), with source 'run_pipeline'.
+
+    Parameters
+    ----------
+    stages : list of Stage, optional
+        Stages to run, by default `build_pipeline()` (every store).
+    jobs : int, optional
+        Maximum number of stages running at once, by default the number of CPUs.
+    force : bool, optional
+        Rerun every stage regardless of the recorded hashes.
+    dry_run : bool, optional
+        Only report which stages would run.
+    log : callable, optional
+        Receives one progress message per stage, by default `print`.
+    profile_dir : str, optional
+        Directory the stages that run are profiled to with cProfile, one
+        `<stage>.prof` file per stage (e.g. 'train_main.prof'), by default no profiling.
+
+    Returns
+    -------
+    dict
+        Stage name -> 'ran', 'skipped', 'failed' or 'blocked' (an upstream stage failed);
+        'outdated' for stages that would run in a dry run.
+    """
+
+    stages = build_pipeline() if stages is None else stages
+    dependencies = stage_dependencies(stages)
+
+    state = _read_json(STATE_FILE, {})
+    memo = {path: tuple(entry) for path, entry in _read_json(HASH_MEMO_FILE, {}).items()}
+    status = {}
+    pending = {stage.name: stage for stage in stages}
+    running = {}
+
+    def schedule():
+        progressed = True
+        while progressed:
+            progressed = False
+            for name, stage in list(pending.items()):
+                if not dependencies[name] <= status.keys():
+                    continue
+                del pending[name]
+                progressed = True
+
+                upstream = {status[dep] for dep in dependencies[name]}
+                if upstream & {'failed', 'blocked'}:
+                    status[name] = 'blocked'
+                    log(f"[blocked] {name}")
+                    continue
+                if dry_run and 'outdated' in upstream:
+                    status[name] = 'outdated'
+                    log(f"[outdated] {name}")
+                    continue
+
+                try:
+                    inputs = _hash_paths([stage.script] + _resolve(stage.inputs), memo)
+                except FileNotFoundError as error:
+                    status[name] = 'failed'
+                    log(f"[failed] {name}: {error}")
+                    continue
+
+                recorded = state.get(name, {})
+                up_to_date = (not force and recorded.get('inputs') == inputs
+                              and all(os.path.exists(output) for output in stage.outputs)
+                              and recorded.get('outputs') == _hash_paths(stage.outputs, memo))
+
+                if up_to_date:
+                    status[name] = 'skipped'
+                    log(f"[skipped] {name}")
+                elif dry_run:
+                    status[name] = 'outdated'
+                    log(f"[outdated] {name}")
+                else:
+                    log(f"[running] {name}")
+                    profile_path = os.path.join(profile_dir, name.replace(':', '_') + '.prof') if profile_dir else None
+                    running[executor.submit(_run_script, stage.script, stage.args, profile_path)] = (stage, inputs)
+
+    if profile_dir is not None and not dry_run:
+        os.makedirs(profile_dir, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+        schedule()
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage, inputs = running.pop(future)
+                returncode, output, seconds = future.result()
+
+                missing = [path for path in stage.outputs if not os.path.exists(path)]
+                if returncode == 0 and missing:
+                    returncode, output = 1, f"{output}\nStage did not write {', '.join(missing)}".strip()
+                write_timing({'source': 'run_pipeline', 'stage': stage.name, 'seconds': round(seconds, 6),
+                              'status': 'ok' if returncode == 0 else 'error'})
+
+                if returncode == 0:
+                    status[stage.name] = 'ran'
+                    state[stage.name] = {'inputs': inputs, 'outputs': _hash_paths(stage.outputs, memo)}
+                    _write_json(STATE_FILE, state)
+                    log(f"[ran] {stage.name} ({seconds:.1f}s)" + (f"\n{output}" if output else ''))
+                else:
+                    status[stage.name] = 'failed'
+                    log(f"[failed] {stage.name} ({seconds:.1f}s)\n{output}")
+            schedule()
+
+    _write_json(HASH_MEMO_FILE, memo)
+
+    return status
@@ -0,0 +1,262 @@
+import os
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.model_config import CATEGORICAL_FEATURES, CATEGORY_ORDERS, FEATURES, NUMERICAL_FEATURES
+from src.storage import atomic_open
+
+
+class BootstrapIntervals:
+    """
+    Prediction intervals of a forecasting pipeline from bootstrap refits, served with one
+    matrix-vector product.
+
+    Every row of `coef` holds the intercept and the coefficients of one bootstrap refit on
+    the unscaled design matrix (see `src.training.design_matrix`), and `noise` one
+    resampled training residual. A simulated forecast is the refit's prediction plus its
+    residual (a raw residual for an identity link, a Pearson residual scaled by the square
+    root of the predicted mean for a log link), and the interval bounds are quantiles of
+    the simulated forecasts.
+
+    Parameters
+    ----------
+    coef : np.ndarray
+        Bootstrap coefficients of shape (n_boot, 1 + n_columns), intercept first.
+    noise : np.ndarray
+        Resampled residuals of shape (n_boot,).
+    log_link : bool
+        Whether predictions are `exp` of the linear predictor (poisson regression).
+    """
+
+    def __init__(self, coef: np.ndarray, noise: np.ndarray, log_link: bool):
+        self.coef = np.ascontiguousarray(coef, dtype=np.float64)
+        self.noise = np.asarray(noise, dtype=np.float64)
+        self.log_link = bool(log_link)
+
+        # design column of every category (the dropped first category has none)
+        self._columns = []
+        position = 1
+        for name, categories in zip(CATEGORICAL_FEATURES, CATEGORY_ORDERS):
+            self._columns.append((name, {category: position + i for i, category in enumerate(categories[1:])}))
+            position += len(categories) - 1
+        self._numerical = tuple(enumerate(NUMERICAL_FEATURES, start=position))
+
+    def draws(self, record: dict) -> np.ndarray:
+        """
+        Simulated forecasts of a single scenario, one per bootstrap refit.
+
+        Parameters
+        ----------
+        record : dict
+            Feature name -> value for every feature in `src.model_config.FEATURES`.
+
+        Returns
+        -------
+        np.ndarray
+            Shape (n_boot,).
+
+        Raises
+        ------
+        ValueError
+            If a categorical feature holds an unknown category.
+        """
+
+        x = np.zeros(self.coef.shape[1])
+        x[0] = 1.0
+        for name, columns in self._columns:
+            value = record[name]
+            if value in columns:
+                x[columns[value]] = 1.0
+            elif value not in CATEGORY_ORDERS[CATEGORICAL_FEATURES.index(name)]:
+                raise ValueError(f"Found unknown category {value!r} in column {name!r}")
+        for position, name in self._numerical:
+            x[position] = record[name]
+
+        z = self.coef @ x
+        if self.log_link:
+            mean = np.exp(z)
+            return np.maximum(mean + self.noise * np.sqrt(mean), 0.0)
+        return z + self.noise
+
+    def interval(self, record: dict, level: float = 0.8) -> Tuple[float, float]:
+        """
+        Central prediction interval of a single scenario.
+
+        Parameters
+        ----------
+        record : dict
+            Feature name -> value for every feature in `src.model_config.FEATURES`.
+        level : float, optional
+            Coverage of the interval, by default 0.8.
+
+        Returns
+        -------
+        low, high : float
+        """
+
+        # the 'linear' quantiles of `np.quantile`, read from the sorted draws (np.quantile costs more than the draws)
+        draws = np.sort(self.draws(record))
+        bounds = []
+        for q in ((1 - level) / 2, (1 + level) / 2):
+            position = q * (len(draws) - 1)
+            below = int(position)
+            above = min(below + 1, len(draws) - 1)
+            bounds.append(float(draws[below] + (position - below) * (draws[above] - draws[below])))
+        return bounds[0], bounds[1]
+
+    def save(self, path: str) -> None:
+        """
+        Atomically write the bootstrap coefficients and residuals to an `.npz` file.
+
+        Parameters
+        ----------
+        path : str
+            Destination file.
+        """
+
+        with atomic_open(path) as f:
+            np.savez(f, coef=self.coef, noise=self.noise, log_link=np.bool_(self.log_link))
+
+    @classmethod
+    def load(cls, path: str) -> 'BootstrapIntervals':
+        """
+        Read intervals written by `save`.
+
+        Parameters
+        ----------
+        path : str
+            Intervals `.npz` file.
+
+        Returns
+        -------
+        BootstrapIntervals
+
+        Raises
+        ------
+        FileNotFoundError
+            If `path` does not exist.
+        """
+
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} does not exist")
+
+        with np.load(path, allow_pickle=False) as arrays:
+            return cls(arrays['coef'], arrays['noise'], arrays['log_link'].item())
+
+
+def intervals_path(model_path: str) -> str:
+    """
+    Return the bootstrap intervals file that belongs to a pickled pipeline.
+
+    Examples
+    --------
+    >>> intervals_path('model/main/pr_pipe_orders.pkl')
+    'model/main/pr_pipe_orders_intervals.npz'
+    """
+
+    return os.path.splitext(model_path)[0] + '_intervals.npz'
+
+
+def _linear_refits(X, y, weights):
+    # weighted least squares of every resample at once: batched normal equations centered on the
+    # means of each resample; a column without values in a resample (an unseen category) gets a
+    # coefficient of 0, like sklearn's minimum-norm solution
+    n = len(y)
+    present = (weights @ (X != 0)) > 0
+    shift = X.mean(axis=0)
+    X = X - shift  # a fixed shift keeps the sums well conditioned
+    x_mean, y_mean = weights @ X / n, weights @ y / n
+    sxx = np.einsum('bn,ni,nj->bij', weights, X, X, optimize=True) - n * x_mean[:, :, None] * x_mean[:, None, :]
+    sxy = weights @ (X * y[:, None]) - n * x_mean * y_mean[:, None]
+    sxx *= present[:, :, None] & present[:, None, :]
+    sxy *= present
+
+    coef = np.einsum('bij,bj->bi', np.linalg.pinv(sxx, hermitian=True), sxy)
+    intercept = y_mean - np.einsum('bi,bi->b', x_mean, coef) - coef @ shift
+    return np.hstack([intercept[:, None], coef])
+
+
+def _poisson_refits(X, y, weights, start, alpha, penalty, max_iter=50, tol=1e-10):
+    # penalized Poisson regression of every resample at once: batched Newton steps from the full fit,
+    # with the objective of `PoissonRegressor` (mean half deviance + alpha / 2 * |coef|^2)
+    n = len(y)
+    coef = np.tile(start, (len(weights), 1))
+    ridge = alpha * np.diag(penalty)
+    for _ in range(max_iter):
+        mean = np.exp(coef @ X.T)
+        gradient = (weights * (mean - y)) @ X / n + alpha * penalty * coef
+        hessian = np.einsum('bn,ni,nj->bij', weights * mean, X, X, optimize=True) / n + ridge
+        step = np.linalg.solve(hessian, gradient[:, :, None])[:, :, 0]
+        coef -= step
+        if np.abs(step).max() < tol:
+            break
+    return coef
+
+
+def bootstrap_intervals(pipeline, df: pd.DataFrame, target: str, n_boot: int = 1000, seed: int = 0) -> BootstrapIntervals:
+    """
+    Pairs bootstrap of a trained forecasting pipeline over its training data.
+
+    Each resample draws the training rows with replacement, encoded as a row of
+    multinomial counts, and all resamples are refitted together with batched NumPy
+    solves instead of one sklearn fit each: the weighted normal equations for a linear
+    regression, and Newton steps on the penalized deviance (started from the trained
+    coefficients, with the trained scaler) for a poisson regression. Each refit is
+    paired with one residual of the trained pipeline drawn at random.
+
+    Parameters
+    ----------
+    pipeline : sklearn.pipeline.Pipeline
+        Trained `make_pipeline(preprocessor, LinearRegression | PoissonRegressor)`.
+    df : pd.DataFrame
+        Training data of the pipeline, with all columns in FEATURES and `target`.
+    target : str
+        Predicted column.
+    n_boot : int, optional
+        Number of bootstrap resamples, by default 1000.
+    seed : int, optional
+        Seed of the resampling, by default 0.
+
+    Returns
+    -------
+    BootstrapIntervals
+
+    Raises
+    ------
+    TypeError
+        If the regressor of the pipeline is not a linear or poisson regression.
+    """
+
+    # sklearn is only needed to bootstrap, the dashboard loads saved intervals without it
+    from sklearn.linear_model import LinearRegression, PoissonRegressor
+    from src.training import design_matrix
+
+    estimator = pipeline[-1]
+    if not isinstance(estimator, (LinearRegression, PoissonRegressor)):
+        raise TypeError(f"Cannot bootstrap estimator {type(estimator).__name__}")
+
+    rng = np.random.default_rng(seed)
+    X = np.hstack([np.ones((len(df), 1)), design_matrix(df)])
+    y = df[target].to_numpy(dtype='float64')
+    weights = rng.multinomial(len(y), np.full(len(y), 1 / len(y)), size=n_boot).astype(np.float64)
+    predicted = pipeline.predict(df[FEATURES])
+
+    if isinstance(estimator, LinearRegression):
+        coef = _linear_refits(X[:, 1:], y, weights)
+        residuals = y - predicted
+    else:
+        # refit in the standardized space the penalty applies to, then fold the scaler back in
+        scaler = pipeline[0].named_transformers_['standardscaler']
+        numerical = slice(X.shape[1] - len(NUMERICAL_FEATURES), X.shape[1])
+        Xs = X.copy()
+        Xs[:, numerical] = (X[:, numerical] - scaler.mean_) / scaler.scale_
+        penalty = np.r_[0.0, np.ones(X.shape[1] - 1)]
+        start = np.r_[estimator.intercept_, estimator.coef_]
+        coef = _poisson_refits(Xs, y, weights, start, estimator.alpha, penalty)
+        coef[:, numerical] /= scaler.scale_
+        coef[:, 0] -= coef[:, numerical] @ scaler.mean_
+        residuals = (y - predicted) / np.sqrt(predicted)
+
+    return BootstrapIntervals(coef, rng.choice(residuals, size=n_boot), log_link=isinstance(estimator, PoissonRegressor))
@@ -0,0 +1,272 @@
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from src.forecast_batch import FLAG_COLUMNS, SCENARIO_COLUMNS, build_scenario_features, forecast_batches
+
+
+class LatencyStats:
+    """
+    Thread-safe rolling window of request latencies and batch sizes.
+
+    Parameters
+    ----------
+    window : int, optional
+        Number of most recent requests (and batches) kept, by default 10,000.
+    """
+
+    def __init__(self, window: int = 10_000):
+        self._latencies = deque(maxlen=window)
+        self._batch_sizes = deque(maxlen=window)
+        self._requests = 0
+        self._lock = threading.Lock()
+
+    def record_request(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+            self._requests += 1
+
+    def record_batch(self, n_rows: int) -> None:
+        with self._lock:
+            self._batch_sizes.append(n_rows)
+
+    def summary(self) -> dict:
+        """Request count, p50/p99 latency in milliseconds and mean batch size."""
+        with self._lock:
+            latencies = np.array(self._latencies)
+            batch_sizes = np.array(self._batch_sizes)
+            requests = self._requests
+
+        summary = {'requests': requests, 'latency_ms': {'p50': None, 'p99': None}, 'batches': len(batch_sizes), 'mean_batch_rows': None}
+        if len(latencies):
+            p50, p99 = np.percentile(latencies * 1000, [50, 99])
+            summary['latency_ms'] = {'p50': round(p50, 3), 'p99': round(p99, 3)}
+        if len(batch_sizes):
+            summary['mean_batch_rows'] = round(batch_sizes.mean(), 2)
+
+        return summary
+
+
+class MicroBatcher:
+    """
+    Group concurrent forecast requests into micro-batches scored with one `predict` call per pipeline.
+
+    A background thread waits for the first request, then keeps collecting requests until
+    the batch holds `max_batch_rows` scenarios or `max_wait_ms` has passed.
+
+    Parameters
+    ----------
+    pipelines : dict
+        Forecast name -> fitted pipeline, kept loaded for the lifetime of the batcher.
+    max_batch_rows : int, optional
+        Maximum number of scenarios scored together, by default 512.
+    max_wait_ms : float, optional
+        Longest time the first request of a batch waits for others, by default 5 ms.
+    stats : LatencyStats, optional
+        Receives the size of every scored batch.
+    """
+
+    def __init__(self, pipelines: Dict[str, object], max_batch_rows: int = 512, max_wait_ms: float = 5.0, stats: LatencyStats = None):
+        self.pipelines = pipelines
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000
+        self.stats = stats
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, records: List[dict]) -> Future:
+        """
+        Queue scenarios for forecasting.
+
+        Only the presence of the required scenario columns is checked here. DataFrames are
+        built once per micro-batch by the batching thread, which keeps the per-request work
+        done in the HTTP threads small.
+
+        Parameters
+        ----------
+        records : list of dict
+            One dict per forecasting scenario (see `src.forecast_batch.build_scenario_features`).
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Resolves to a list with one record per scenario, holding the scenario and one
+            'forecast_<name>' value per pipeline.
+
+        Raises
+        ------
+        ValueError
+            If `records` is empty.
+        KeyError
+            If a scenario is missing a required column.
+        """
+
+        if len(records) == 0:
+            raise ValueError("No scenarios to forecast")
+
+        for record in records:
+            missing = set(SCENARIO_COLUMNS) - set(record)
+            if missing:
+                raise KeyError(f"Missing scenario columns: {sorted(missing)}")
+
+        future = Future()
+        self._queue.put((records, future))
+        return future
+
+    def close(self) -> None:
+        """Stop the batching thread once the queued requests are scored."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            batch, n_rows = [item], len(item[0])
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+
+            while n_rows < self.max_batch_rows:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+                n_rows += len(item[0])
+
+            self._score(batch)
+            if stop:
+                return
+
+    def _score(self, batch):
+        try:
+            forecasts = self._predict([record for records, _ in batch for record in records])
+        except Exception:
+            # a malformed request poisons the whole batch, score requests one by one instead
+            for records, future in batch:
+                try:
+                    future.set_result(self._predict(records))
+                except Exception as error:
+                    future.set_exception(error)
+            return
+
+        start = 0
+        for records, future in batch:
+            end = start + len(records)
+            future.set_result(forecasts[start:end])
+            start = end
+
+    def _predict(self, records):
+        # flags default to False per scenario: in a batch frame, a flag set by one client would be missing for the others
+        records = [{**dict.fromkeys(FLAG_COLUMNS, False), **record} for record in records]
+        features = build_scenario_features(pd.DataFrame.from_records(records))
+        forecasts = next(forecast_batches(features, self.pipelines, chunk_size=len(features)))
+        forecasts['date'] = forecasts['date'].dt.strftime('%Y-%m-%d')
+
+        if self.stats is not None:
+            self.stats.record_batch(len(features))
+
+        return forecasts.to_dict(orient='records')
+
+
+class _PredictionHTTPServer(ThreadingHTTPServer):
+    # clients such as POS tablets connect in bursts, the default backlog of 5 drops them
+    request_queue_size = 128
+
+
+def make_server(host: str, port: int, batcher: MicroBatcher, stats: LatencyStats, timeout: float = 10.0) -> ThreadingHTTPServer:
+    """
+    Create the HTTP prediction server.
+
+    Endpoints:
+        - `POST /predict`: JSON body `{"scenarios": [{"date": "2025-06-01", "hours_opened": 11,
+          "avg_temperature": 18, "rain": 0, "snow": 0}, ...]}` (or a single scenario object).
+          Responds with `{"forecasts": [...]}`, one record per scenario.
+        - `GET /metrics`: request count, p50/p99 latency and micro-batch sizes.
+        - `GET /health`: liveness check.
+
+    Parameters
+    ----------
+    host : str
+        Interface to bind.
+    port : int
+        Port to listen on.
+    batcher : MicroBatcher
+        Batcher holding the warm pipelines.
+    stats : LatencyStats
+        Collects request latencies.
+    timeout : float, optional
+        Seconds a request waits for its forecasts, by default 10.
+
+    Returns
+    -------
+    http.server.ThreadingHTTPServer
+        The server, not yet started (call `serve_forever`).
+    """
+
+    class PredictionHandler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            if self.path == '/metrics':
+                self._respond(200, stats.summary())
+            elif self.path == '/health':
+                self._respond(200, {'status': 'ok', 'models': list(batcher.pipelines)})
+            else:
+                self._respond(404, {'error': f"Unknown endpoint {self.path}"})
+
+        def do_POST(self):
+            if self.path != '/predict':
+                self._respond(404, {'error': f"Unknown endpoint {self.path}"})
+                return
+
+            start = time.perf_counter()
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                records = body.get('scenarios', body) if isinstance(body, dict) else body
+                future = batcher.submit(records if isinstance(records, list) else [records])
+            except (ValueError, KeyError, TypeError) as error:
+                self._respond(400, {'error': str(error.args[0]) if error.args else repr(error)})
+                return
+
+            try:
+                forecasts = future.result(timeout=timeout)
+            except (ValueError, TypeError) as error:
+                # scenario values the pipelines cannot score, e.g. text instead of numbers
+                self._respond(400, {'error': str(error)})
+                return
+            except Exception as error:
+                self._respond(500, {'error': str(error)})
+                return
+
+            stats.record_request(time.perf_counter() - start)
+            self._respond(200, {'forecasts': forecasts})
+
+        def _respond(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return _PredictionHTTPServer((host, port), PredictionHandler)
@@ -0,0 +1,152 @@
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+# pandas frequencies of the trend charts: weeks ending on Sunday and calendar months, labelled by their last day
+ROLLUP_FREQUENCIES = ('W', 'M')
+ROLLUP_MEASURES = ['total_sales_normalized', 'tips_normalized', 'in_store_orders', 'item_A_sales', 'item_B_sales',
+                   'item_C_sales', 'sales_per_order']
+
+
+def _rollup_columns(measures):
+    return [f'{measure}_{stat}' for measure in measures for stat in ('sum', 'days')]
+
+
+def _bucket_labels(dates, frequency):
+    # label of the bucket of every date, as given by `resample(frequency)`
+    if frequency == 'W':
+        return dates + pd.to_timedelta(6 - dates.dayofweek, unit='D')
+    return dates + pd.offsets.MonthEnd(0)
+
+
+def _calendar(first, last, frequency):
+    # labels of every bucket from `first` to `last`; vectorized, `pd.date_range` builds them one by one
+    if frequency == 'W':
+        days = np.arange(np.datetime64(first, 'D'), np.datetime64(last, 'D') + 1, 7)
+    else:
+        months = np.arange(np.datetime64(first, 'M'), np.datetime64(last, 'M') + 1)
+        days = (months + 1).astype('datetime64[D]') - 1
+    return pd.DatetimeIndex(days.astype('datetime64[ns]'), name='date')
+
+
+def build_rollups(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregate daily sales into weekly and monthly buckets for the trend charts.
+
+    Every bucket holds, for each of the ROLLUP_MEASURES, the sum of its daily values and
+    the number of days with a value. These are additive, so buckets of new days are merged
+    into existing ones by adding them (see `update_rollups`), and the bucket means are
+    read back with `rollup_means`.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Daily sales indexed by date, with 'total_sales_normalized', 'tips_normalized',
+        'in_store_orders' and the item sales.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per frequency of ROLLUP_FREQUENCIES and non-empty bucket ('period', the
+        last day of the bucket), sorted by frequency and period.
+    """
+
+    dates = pd.DatetimeIndex(df.index).normalize()
+    columns = {}
+    for measure in ROLLUP_MEASURES:
+        if measure == 'sales_per_order':
+            # NaN on days without orders, as in the daily data of the sales monitor
+            with np.errstate(invalid='ignore', divide='ignore'):
+                values = df['total_sales_normalized'].to_numpy(dtype='float64') / df['in_store_orders'].to_numpy(dtype='float64')
+        else:
+            values = df[measure].to_numpy(dtype='float64')
+        present = ~np.isnan(values)
+        columns[f'{measure}_sum'] = np.where(present, values, 0.0)
+        columns[f'{measure}_days'] = present.astype(np.int64)
+
+    days = pd.DataFrame(columns)
+    rollups = [days.groupby(_bucket_labels(dates, frequency).to_numpy()).sum()
+                   .rename_axis('period').reset_index().assign(frequency=frequency)
+               for frequency in ROLLUP_FREQUENCIES]
+
+    rollups = pd.concat(rollups, ignore_index=True)[['frequency', 'period'] + _rollup_columns(ROLLUP_MEASURES)]
+    return rollups.sort_values(['frequency', 'period'], ignore_index=True)
+
+
+def update_rollups(rollups: Optional[pd.DataFrame], df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add new days to the weekly and monthly rollups, changing only the buckets they fall in.
+
+    Parameters
+    ----------
+    rollups : pd.DataFrame or None
+        Rollups built by `build_rollups` or `update_rollups`; None, empty or with other
+        columns (e.g. written by an older version) to build them from `df` alone.
+    df : pd.DataFrame
+        New daily sales indexed by date, all later than the days already in `rollups`
+        (days present in both would be counted twice).
+
+    Returns
+    -------
+    pd.DataFrame
+        The updated rollups.
+    """
+
+    new = build_rollups(df)
+    if rollups is None or rollups.empty or list(rollups.columns) != list(new.columns):
+        return new
+
+    # buckets before the first new day are kept as they are, the others are merged by adding sums and days
+    first = new.groupby('frequency')['period'].min()
+    touched = rollups['period'].to_numpy() >= rollups['frequency'].map(first).to_numpy()
+    merged = (pd.concat([rollups[touched], new], ignore_index=True)
+              .groupby(['frequency', 'period'], as_index=False).sum())
+
+    rollups = pd.concat([rollups[~touched], merged], ignore_index=True)
+    return rollups.sort_values(['frequency', 'period'], ignore_index=True)
+
+
+def rollup_means(rollups: pd.DataFrame, frequency: str, measures: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Mean daily value of measures per bucket, as `resample(frequency).mean()` of the daily sales.
+
+    Parameters
+    ----------
+    rollups : pd.DataFrame
+        Rollups built by `build_rollups` or `update_rollups`.
+    frequency : str
+        One of ROLLUP_FREQUENCIES: 'W' (weeks ending on Sunday) or 'M' (calendar months).
+    measures : list of str, optional
+        Measures to return, by default ROLLUP_MEASURES.
+
+    Returns
+    -------
+    pd.DataFrame
+        Indexed by the last day of every bucket from the first to the last bucket with
+        data ('date'), with one column per measure (NaN for buckets without a value).
+
+    Raises
+    ------
+    ValueError
+        If `frequency` is not one of ROLLUP_FREQUENCIES.
+
+    Examples
+    --------
+    >>> rollup_means(rollups, 'W', ['in_store_orders', 'sales_per_order'])
+    """
+
+    if frequency not in ROLLUP_FREQUENCIES:
+        raise ValueError(f"Unknown rollup frequency {frequency!r}, expected one of {ROLLUP_FREQUENCIES}")
+
+    measures = ROLLUP_MEASURES if measures is None else measures
+    buckets = rollups[rollups['frequency'] == frequency].set_index('period')
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = pd.DataFrame({measure: buckets[f'{measure}_sum'].to_numpy() / buckets[f'{measure}_days'].to_numpy()
+                              for measure in measures}, index=buckets.index)
+
+    # resample also returns the empty buckets between the first and the last one
+    if means.empty:
+        return means.rename_axis('date')
+    return means.reindex(_calendar(means.index.min(), means.index.max(), frequency))
@@ -0,0 +1,56 @@
+from typing import NamedTuple, Optional, Tuple
+
+# column specs of the sales, weather and combined tables, shared by the validators
+# (`src.data_validation`) and the typed loader (`src.typed_loader`); kept free of pandera so
+# that the dashboard can read them without importing it
+
+DAY_TYPES = ("Weekday", "Weekend", "Friday", "Unusual", "Holiday")
+
+
+class ColumnSpec(NamedTuple):
+    """
+    Expected dtype and value checks of one column.
+
+    `dtype` is one of 'datetime', 'int', 'float', 'str', 'bool' or 'category'; `ge` is a
+    lower bound and `isin` the allowed values. Null values are rejected unless `nullable`.
+    """
+    dtype: str
+    ge: Optional[float] = None
+    isin: Optional[Tuple] = None
+    nullable: bool = False
+
+
+SALES_SPEC = {
+    "store_id": ColumnSpec('str'),
+    "date": ColumnSpec('datetime'),
+    "hours_opened": ColumnSpec('int', ge=0),
+    "tips_normalized": ColumnSpec('float', ge=0),
+    "total_sales_normalized": ColumnSpec('float', ge=0),
+    "in_store_orders": ColumnSpec('float', ge=0),
+    "item_A_sales": ColumnSpec('float', ge=0),
+    "item_B_sales": ColumnSpec('float', ge=0),
+    "item_C_sales": ColumnSpec('float', ge=0),
+    "HCF_sales": ColumnSpec('float', ge=0),
+    "type_of_day": ColumnSpec('str', isin=DAY_TYPES),
+}
+
+WEATHER_SPEC = {
+    "date": ColumnSpec('datetime', nullable=True),
+    "avg_temperature": ColumnSpec('float', nullable=True),
+    "rain": ColumnSpec('float', nullable=True),
+    "snow": ColumnSpec('float', nullable=True),
+}
+
+COMBINED_SPEC = {
+    **SALES_SPEC,
+    "avg_temperature": ColumnSpec('float', nullable=True),
+    "rain": ColumnSpec('float', nullable=True),
+    "snow": ColumnSpec('float', nullable=True),
+    "is_long_weekend": ColumnSpec('bool'),
+    "is_HCF": ColumnSpec('bool'),
+    "is_holiday": ColumnSpec('bool'),
+    "day_of_week": ColumnSpec('category', isin=('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')),
+    "season": ColumnSpec('category', isin=('Winter', 'Spring', 'Summer', 'Fall')),
+}
+
+SPECS = {'sales': SALES_SPEC, 'weather': WEATHER_SPEC, 'combined': COMBINED_SPEC}
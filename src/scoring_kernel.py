@@ -0,0 +1,251 @@
+import math
+import os
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from src.storage import atomic_open
+
+
+class ScoringKernel:
+    """
+    Pure NumPy scoring kernel equivalent to a fitted `(ColumnTransformer, linear model)` pipeline.
+
+    The prediction of such a pipeline is `link(intercept + x_num @ coef_num + sum of category
+    offsets)`. The scaler parameters are folded into the numerical coefficients and the
+    intercept, and every one-hot column becomes an offset looked up by category value (the
+    dropped category has offset 0).
+
+    Parameters
+    ----------
+    intercept : float
+        Intercept with the scaler means folded in.
+    numerical_coef : dict
+        Numerical feature -> coefficient on the unscaled feature.
+    category_offsets : dict
+        Categorical feature -> {category value -> offset}.
+    log_link : bool
+        Whether predictions are `exp` of the linear predictor (poisson regression).
+    """
+
+    def __init__(self, intercept: float, numerical_coef: Dict[str, float], category_offsets: Dict[str, dict], log_link: bool):
+        self.intercept = float(intercept)
+        self.numerical_coef = {name: float(coef) for name, coef in numerical_coef.items()}
+        self.category_offsets = {name: {value: float(offset) for value, offset in offsets.items()}
+                                 for name, offsets in category_offsets.items()}
+        self.log_link = bool(log_link)
+
+        # plain Python tuples keep `predict_one` free of NumPy scalar overhead
+        self._numerical = tuple(self.numerical_coef.items())
+        self._categorical = tuple(self.category_offsets.items())
+
+    @property
+    def features(self) -> List[str]:
+        """Names of the input features, numerical first."""
+        return list(self.numerical_coef) + list(self.category_offsets)
+
+    def predict_one(self, record: dict) -> float:
+        """
+        Score a single scenario.
+
+        Parameters
+        ----------
+        record : dict
+            Feature name -> value for every feature in `features`.
+
+        Returns
+        -------
+        float
+            The prediction of the compiled pipeline.
+
+        Raises
+        ------
+        KeyError
+            If a feature is missing from `record`.
+        ValueError
+            If a categorical feature holds a category unknown to the pipeline.
+        """
+
+        z = self.intercept
+        for name, coef in self._numerical:
+            z += coef * record[name]
+
+        for name, offsets in self._categorical:
+            try:
+                z += offsets[record[name]]
+            except KeyError:
+                if name not in record:
+                    raise
+                raise ValueError(f"Found unknown category {record[name]!r} in column {name!r}") from None
+
+        return math.exp(z) if self.log_link else z
+
+    def predict(self, features: pd.DataFrame) -> np.ndarray:
+        """
+        Score many scenarios at once.
+
+        Parameters
+        ----------
+        features : pd.DataFrame
+            One row per scenario with every column in `features`.
+
+        Returns
+        -------
+        np.ndarray
+            The predictions of the compiled pipeline.
+
+        Raises
+        ------
+        ValueError
+            If a categorical feature holds a category unknown to the pipeline.
+        """
+
+        numerical = features[list(self.numerical_coef)].to_numpy(dtype=np.float64)
+        z = numerical @ np.fromiter(self.numerical_coef.values(), dtype=np.float64) + self.intercept
+
+        for name, offsets in self._categorical:
+            codes = pd.Categorical(features[name], categories=list(offsets)).codes
+            if (codes < 0).any():
+                unknown = features[name][codes < 0].iloc[0]
+                raise ValueError(f"Found unknown category {unknown!r} in column {name!r}")
+            z += np.fromiter(offsets.values(), dtype=np.float64)[codes]
+
+        return np.exp(z) if self.log_link else z
+
+    def save(self, path: str) -> None:
+        """
+        Atomically write the kernel to an `.npz` file (no pickled objects).
+
+        Parameters
+        ----------
+        path : str
+            Destination file.
+        """
+
+        arrays = {
+            'intercept': np.float64(self.intercept),
+            'log_link': np.bool_(self.log_link),
+            'numerical_features': np.array(list(self.numerical_coef), dtype=str),
+            'numerical_coef': np.fromiter(self.numerical_coef.values(), dtype=np.float64),
+            'categorical_features': np.array(list(self.category_offsets), dtype=str),
+        }
+        for i, offsets in enumerate(self.category_offsets.values()):
+            arrays[f'categories_{i}'] = np.array(list(offsets))
+            arrays[f'offsets_{i}'] = np.fromiter(offsets.values(), dtype=np.float64)
+
+        with atomic_open(path) as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> 'ScoringKernel':
+        """
+        Read a kernel written by `save`.
+
+        Parameters
+        ----------
+        path : str
+            Kernel `.npz` file.
+
+        Returns
+        -------
+        ScoringKernel
+
+        Raises
+        ------
+        FileNotFoundError
+            If `path` does not exist.
+        """
+
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} does not exist")
+
+        with np.load(path, allow_pickle=False) as arrays:
+            numerical_coef = dict(zip(arrays['numerical_features'].tolist(), arrays['numerical_coef'].tolist()))
+            category_offsets = {
+                name: dict(zip(arrays[f'categories_{i}'].tolist(), arrays[f'offsets_{i}'].tolist()))
+                for i, name in enumerate(arrays['categorical_features'].tolist())
+            }
+            return cls(arrays['intercept'].item(), numerical_coef, category_offsets, arrays['log_link'].item())
+
+
+def kernel_path(model_path: str) -> str:
+    """
+    Return the kernel file that belongs to a pickled pipeline.
+
+    Examples
+    --------
+    >>> kernel_path('model/pr_pipe_orders.pkl')
+    'model/pr_pipe_orders.npz'
+    """
+
+    return os.path.splitext(model_path)[0] + '.npz'
+
+
+def compile_pipeline(pipeline) -> ScoringKernel:
+    """
+    Compile a fitted `make_pipeline(ColumnTransformer, linear model)` into a scoring kernel.
+
+    Supported column transformers hold `OneHotEncoder` and `StandardScaler` steps (any other
+    columns dropped); supported models expose `coef_` and `intercept_`, with a log link for
+    `PoissonRegressor` and `GammaRegressor` and an identity link otherwise.
+
+    Parameters
+    ----------
+    pipeline : sklearn.pipeline.Pipeline
+        Fitted pipeline, e.g. one loaded from `model/`.
+
+    Returns
+    -------
+    ScoringKernel
+
+    Raises
+    ------
+    TypeError
+        If the pipeline contains a step the kernel cannot represent.
+    """
+
+    # sklearn is only needed to compile, the dashboard loads compiled kernels without it
+    from sklearn.linear_model import GammaRegressor, PoissonRegressor
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+    if len(pipeline.steps) != 2:
+        raise TypeError(f"Expected a (column transformer, estimator) pipeline, got steps {list(pipeline.named_steps)}")
+
+    preprocessor, estimator = pipeline[0], pipeline[-1]
+    if not (hasattr(estimator, 'coef_') and hasattr(estimator, 'intercept_')):
+        raise TypeError(f"Cannot compile estimator {type(estimator).__name__}")
+
+    coef = np.ravel(estimator.coef_).astype(np.float64)
+    intercept = float(np.ravel(estimator.intercept_)[0])
+    numerical_coef, category_offsets = {}, {}
+
+    for name, transformer, columns in preprocessor.transformers_:
+        if transformer == 'drop' or name == 'remainder':
+            continue
+        block = coef[preprocessor.output_indices_[name]]
+
+        if isinstance(transformer, StandardScaler):
+            scale = transformer.scale_ if transformer.scale_ is not None else np.ones(len(columns))
+            mean = transformer.mean_ if transformer.with_mean else np.zeros(len(columns))
+            folded = block / scale
+            intercept -= float(folded @ mean)
+            numerical_coef.update(zip(columns, folded))
+
+        elif isinstance(transformer, OneHotEncoder):
+            dropped = transformer.drop_idx_ if transformer.drop_idx_ is not None else [None] * len(columns)
+            position = 0
+            for column, categories, drop_idx in zip(columns, transformer.categories_, dropped):
+                offsets = {}
+                for i, category in enumerate(categories.tolist()):
+                    if drop_idx is not None and i == drop_idx:
+                        offsets[category] = 0.0
+                    else:
+                        offsets[category] = block[position]
+                        position += 1
+                category_offsets[column] = offsets
+
+        else:
+            raise TypeError(f"Cannot compile transformer {type(transformer).__name__}")
+
+    return ScoringKernel(intercept, numerical_coef, category_offsets, log_link=isinstance(estimator, (PoissonRegressor, GammaRegressor)))
@@ -0,0 +1,276 @@
+import os
+import json
+import hashlib
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+WATERMARK_FILE = '_watermark.json'
+
+
+def write_table(df: pd.DataFrame, path: str, compression: str = 'zstd') -> None:
+    """
+    Write a DataFrame to a compressed Parquet file, keeping its column dtypes.
+
+    Datetime, boolean and categorical columns (including their category order) are
+    stored as typed Parquet columns, so readers do not need to re-parse dates or
+    re-infer dtypes. The DataFrame index is not written.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The DataFrame to store.
+    path : str
+        Destination path of the Parquet file. Missing parent directories are created.
+    compression : str, optional
+        Parquet compression codec, by default 'zstd'.
+
+    Returns
+    -------
+    None
+
+    Examples
+    --------
+    >>> write_table(combined_df, 'data/processed/combined.parquet')
+    """
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_table(table, path, compression=compression)
+
+
+def read_table(path: str, columns: Optional[List[str]] = None, index_col: Optional[str] = None,
+               filters: Optional[list] = None) -> pd.DataFrame:
+    """
+    Read a Parquet file written by `write_table`, optionally only a subset of its columns.
+
+    The file is memory-mapped and only the requested columns are decoded. `path` can also
+    be the root of a partitioned store written by `append_partitions`, in which case all
+    partitions are read in date order.
+
+    Parameters
+    ----------
+    path : str
+        Path of the Parquet file or partitioned store.
+    columns : list of str, optional
+        Columns to read. Reads all columns if None.
+    index_col : str, optional
+        Column to use as the index of the returned DataFrame (e.g. 'date'). It is
+        read even if it is not listed in `columns`.
+    filters : list, optional
+        Row filters in the pyarrow format, e.g. `[('date', '>', timestamp)]`. Row groups
+        whose statistics exclude every match are not decoded.
+
+    Returns
+    -------
+    pd.DataFrame
+        The stored data with its original dtypes.
+
+    Raises
+    ------
+    FileNotFoundError
+        If `path` does not exist.
+
+    Examples
+    --------
+    >>> read_table('data/modelling/test.parquet', columns=['item_A_sales'], index_col='date')
+    """
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} does not exist")
+
+    if columns is not None and index_col is not None and index_col not in columns:
+        columns = [index_col] + list(columns)
+
+    df = pq.read_table(path, columns=columns, filters=filters, memory_map=True, partitioning=None).to_pandas()
+
+    if index_col is not None:
+        df = df.set_index(index_col)
+
+    return df
+
+
+def append_partitions(df: pd.DataFrame, root: str, date_col: str = 'date') -> List[str]:
+    """
+    Append rows to a month-partitioned Parquet store.
+
+    Rows are grouped by calendar month and each group is written as a new file
+    `<root>/month=YYYY-MM/part-<first date>-<last date>.parquet`. Existing files are
+    never rewritten, so the cost of an append only depends on the number of new rows.
+    Files sort in date order as long as appended rows are newer than the stored ones.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Rows to append, with a datetime column `date_col`.
+    root : str
+        Root directory of the store. Created if missing.
+    date_col : str, optional
+        Name of the date column, by default 'date'.
+
+    Returns
+    -------
+    list of str
+        Paths of the files written.
+
+    Examples
+    --------
+    >>> append_partitions(new_sales_df, 'data/processed/sales')
+    ['data/processed/sales/month=2025-05/part-20250501-20250510.parquet']
+    """
+
+    written = []
+    df = df.sort_values(date_col)
+
+    for month, part in df.groupby(df[date_col].dt.strftime('%Y-%m'), sort=True):
+        first, last = part[date_col].iloc[0], part[date_col].iloc[-1]
+        path = os.path.join(root, f"month={month}", f"part-{first:%Y%m%d}-{last:%Y%m%d}.parquet")
+        write_table(part, path)
+        written.append(path)
+
+    return written
+
+
+@contextmanager
+def atomic_open(path: str, mode: str = 'wb') -> Iterator:
+    """
+    Open a temporary file that atomically replaces `path` when the block succeeds.
+
+    Readers of `path` (e.g. the dashboard loading a model) see either the previous or the
+    new content, never a partially written file. If the block raises, `path` is left
+    unchanged and the temporary file is removed.
+
+    Parameters
+    ----------
+    path : str
+        Destination file. Missing parent directories are created.
+    mode : str, optional
+        Mode of the temporary file, by default 'wb'.
+
+    Examples
+    --------
+    >>> with atomic_open('model/main/lr_pipe_total_sales.pkl') as f:
+    ...     pickle.dump(pipeline, f)
+    """
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, mode) as f:
+            yield f
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def read_watermark(root: str) -> dict:
+    """
+    Read the ingestion watermark of a partitioned store.
+
+    Parameters
+    ----------
+    root : str
+        Root directory of the store.
+
+    Returns
+    -------
+    dict
+        The stored watermark, or an empty dict if the store has none yet.
+    """
+
+    path = os.path.join(root, WATERMARK_FILE)
+
+    if not os.path.exists(path):
+        return {}
+
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_watermark(root: str, watermark: dict) -> None:
+    """
+    Atomically replace the ingestion watermark of a partitioned store.
+
+    Parameters
+    ----------
+    root : str
+        Root directory of the store. Created if missing.
+    watermark : dict
+        JSON serializable watermark.
+
+    Returns
+    -------
+    None
+    """
+
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, WATERMARK_FILE)
+    tmp_path = path + '.tmp'
+
+    with open(tmp_path, 'w') as f:
+        json.dump(watermark, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def content_hash(path: str, memo: Optional[Dict[str, Tuple[int, int, str]]] = None) -> str:
+    """
+    Return a hash of the content of a file, or of every file below a directory.
+
+    Files are only re-read when their modification time or size differ from the entry in
+    `memo`, so repeated calls on unchanged artifacts cost one `os.stat` per file.
+
+    Parameters
+    ----------
+    path : str
+        Path of a file or directory (e.g. a partitioned Parquet store).
+    memo : dict, optional
+        File path -> (mtime_ns, size, sha256) of previously hashed files. Updated in place.
+
+    Returns
+    -------
+    str
+        Hex digest that changes whenever the content (or, for directories, the set of
+        files) changes.
+
+    Raises
+    ------
+    FileNotFoundError
+        If `path` does not exist.
+    """
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} does not exist")
+
+    memo = {} if memo is None else memo
+
+    if os.path.isdir(path):
+        files = sorted(os.path.join(root, name) for root, _, names in os.walk(path) for name in names)
+    else:
+        files = [path]
+
+    digest = hashlib.sha256()
+    for file in files:
+        stat = os.stat(file)
+        cached = memo.get(file)
+
+        if cached is None or tuple(cached[:2]) != (stat.st_mtime_ns, stat.st_size):
+            file_digest = hashlib.sha256()
+            with open(file, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    file_digest.update(block)
+            cached = (stat.st_mtime_ns, stat.st_size, file_digest.hexdigest())
+            memo[file] = cached
+
+        digest.update(file.encode())
+        digest.update(cached[2].encode())
+
+    return digest.hexdigest()
@@ -0,0 +1,74 @@
+import os
+from typing import List
+
+# store of the original single-cafe data; scripts and pages use it when no store is given
+DEFAULT_STORE = 'main'
+
+# every per-store artifact, formatted with the store id
+STORE_PATHS = {
+    'sales_inputs': 'data/inputs/sales/{store}',
+    'sales': 'data/processed/sales/{store}',
+    'rollups': 'data/processed/{store}/rollups.parquet',
+    'combined': 'data/processed/{store}/combined.parquet',
+    'weather_gaps': 'data/processed/{store}/weather_gaps.csv',
+    'cube': 'data/processed/{store}/aggregate_cube.parquet',
+    'cube_history': 'data/processed/{store}/aggregate_cube_history.json',
+    'train': 'data/modelling/{store}/train.parquet',
+    'test': 'data/modelling/{store}/test.parquet',
+    'models': 'model/{store}',
+    'results': 'results/{store}',
+}
+
+
+def store_path(name: str, store: str = DEFAULT_STORE, *parts: str) -> str:
+    """
+    Path of a per-store artifact.
+
+    Parameters
+    ----------
+    name : str
+        Artifact name, one of STORE_PATHS.
+    store : str, optional
+        Store id, by default DEFAULT_STORE.
+    *parts : str
+        Path components appended to the artifact path (e.g. a file in a directory).
+
+    Returns
+    -------
+    str
+
+    Examples
+    --------
+    >>> store_path('train', 'downtown')
+    'data/modelling/downtown/train.parquet'
+    >>> store_path('results', 'main', 'mae_grouped_orders.csv')
+    'results/main/mae_grouped_orders.csv'
+    """
+
+    return os.path.join(STORE_PATHS[name].format(store=store), *parts)
+
+
+def list_stores(name: str = 'sales_inputs') -> List[str]:
+    """
+    Stores that have an artifact, by default the stores with a sales input directory.
+
+    Parameters
+    ----------
+    name : str, optional
+        Artifact name, one of STORE_PATHS whose path starts with a directory per store
+        (e.g. 'sales_inputs' for the stores to process, 'sales' or 'results' for the
+        stores already processed).
+
+    Returns
+    -------
+    list of str
+        Sorted store ids.
+    """
+
+    root, _, _ = STORE_PATHS[name].partition('{store}')
+    if not os.path.isdir(root):
+        return []
+
+    return sorted(entry.name for entry in os.scandir(root)
+                  if entry.is_dir() and not entry.name.startswith(('_', '.'))
+                  and os.path.exists(store_path(name, entry.name)))
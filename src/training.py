@@ -0,0 +1,345 @@
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.compose import ColumnTransformer, make_column_transformer
+from sklearn.linear_model import LinearRegression
+from sklearn.pipeline import Pipeline, make_pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from src.instrumentation import timed
+from src.model_config import CATEGORICAL_FEATURES, CATEGORY_ORDERS, FEATURES, NUMERICAL_FEATURES, TARGETS
+from src.storage import atomic_open, read_table
+from src.stores import DEFAULT_STORE, store_path
+
+
+# sums of squares and cross-products of the linear targets, next to the trained pipelines
+NORMAL_EQUATIONS_FILE = 'normal_equations.npz'
+
+
+def make_preprocessor() -> ColumnTransformer:
+    """
+    Build the (unfitted) column transformer shared by every forecasting pipeline.
+
+    Returns
+    -------
+    sklearn.compose.ColumnTransformer
+        One-hot encodes the categorical features and standardizes the numerical features.
+    """
+
+    return make_column_transformer(
+        (OneHotEncoder(drop='first', categories=CATEGORY_ORDERS), CATEGORICAL_FEATURES),
+        (StandardScaler(), NUMERICAL_FEATURES)
+    )
+
+
+def design_matrix(df: pd.DataFrame) -> np.ndarray:
+    """
+    Unscaled design matrix of the forecasting pipelines, without intercept column.
+
+    The categories are fixed by CATEGORY_ORDERS, so the encoding does not depend on the
+    rows it is fitted on. Standardizing the numerical features only rescales them, which
+    does not change the predictions of a linear regression with intercept, so a linear
+    regression fitted on this matrix predicts like the trained pipelines.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Rows with all columns in `src.model_config.FEATURES`.
+
+    Returns
+    -------
+    np.ndarray
+        One-hot encoded categorical features (first category dropped) followed by the
+        numerical features, as float64.
+    """
+
+    encoder = OneHotEncoder(drop='first', categories=CATEGORY_ORDERS, sparse_output=False)
+    categorical = encoder.fit_transform(df[CATEGORICAL_FEATURES])
+
+    return np.hstack([categorical, df[NUMERICAL_FEATURES].to_numpy(dtype='float64')])
+
+
+class NormalEquations:
+    """
+    Sufficient statistics of the linear regression targets of one store.
+
+    Stores the number of rows and the sums of X, y, X'X and X'y of the unscaled design
+    matrix (see `design_matrix`), shifted by fixed column means to keep the centered sums
+    well conditioned. A new day is added with a rank-one update of X'X and X'y, and the
+    least-squares coefficients and the scaler statistics of the pipelines are recovered
+    from the sums, so updating a model does not depend on the length of the history.
+
+    Parameters
+    ----------
+    targets : dict
+        Forecast name -> predicted column, in the column order of `y_sum` and `xty`.
+    shift : np.ndarray
+        Column means subtracted from the design matrix before summing.
+    n : int
+        Number of rows added.
+    x_sum, y_sum : np.ndarray
+        Column sums of the shifted design matrix and of the targets.
+    xtx, xty : np.ndarray
+        X'X and X'y of the shifted design matrix.
+    last_date : np.datetime64
+        Date of the last row added.
+    """
+
+    def __init__(self, targets: Dict[str, str], shift: np.ndarray, n: int, x_sum: np.ndarray, y_sum: np.ndarray,
+                 xtx: np.ndarray, xty: np.ndarray, last_date: np.datetime64):
+        self.targets = dict(targets)
+        self.shift = shift
+        self.n = int(n)
+        self.x_sum, self.y_sum = x_sum, y_sum
+        self.xtx, self.xty = xtx, xty
+        self.last_date = np.datetime64(last_date, 'ns')
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, targets: Dict[str, str]) -> 'NormalEquations':
+        """
+        Sum the rows of a training table.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Training rows indexed by date, with all columns in `src.model_config.FEATURES`
+            and the predicted columns.
+        targets : dict
+            Forecast name -> predicted column.
+
+        Returns
+        -------
+        NormalEquations
+        """
+
+        X = design_matrix(df)
+        shift = X.mean(axis=0)
+        p, k = X.shape[1], len(targets)
+        equations = cls(targets, shift, 0, np.zeros(p), np.zeros(k), np.zeros((p, p)), np.zeros((p, k)),
+                        np.datetime64('NaT'))
+        equations._add(X, df, df.index.max())
+        return equations
+
+    def _add(self, X, df, last_date):
+        X = X - self.shift
+        Y = df[list(self.targets.values())].to_numpy(dtype='float64')
+        self.n += len(X)
+        self.x_sum += X.sum(axis=0)
+        self.y_sum += Y.sum(axis=0)
+        self.xtx += X.T @ X
+        self.xty += X.T @ Y
+        self.last_date = np.datetime64(last_date, 'ns')
+
+    def update(self, df: pd.DataFrame) -> None:
+        """
+        Add new days: one rank-one update of X'X and X'y per row.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            New rows indexed by date, all after `last_date`.
+
+        Raises
+        ------
+        ValueError
+            If a row is not after `last_date`.
+        """
+
+        if len(df) == 0:
+            return
+        if (df.index.to_numpy(dtype='datetime64[ns]') <= self.last_date).any():
+            raise ValueError(f"Rows must be after {self.last_date}, retrain with scripts/train_models.py to restate history")
+
+        # X'X += x x' for every row, summed in one matrix product
+        self._add(design_matrix(df), df, df.index.max())
+
+    def solve(self):
+        """
+        Least-squares coefficients on the unscaled design matrix.
+
+        Returns
+        -------
+        coef : np.ndarray
+            Coefficients of shape (number of design columns, number of targets), with the
+            minimum norm when a category has not been seen yet (like sklearn).
+        intercept : np.ndarray
+            One intercept per target.
+        """
+
+        x_mean, y_mean = self.x_sum / self.n, self.y_sum / self.n
+        sxx = self.xtx - self.n * np.outer(x_mean, x_mean)
+        sxy = self.xty - self.n * np.outer(x_mean, y_mean)
+        coef = np.linalg.lstsq(sxx, sxy, rcond=None)[0]
+
+        return coef, y_mean - (x_mean + self.shift) @ coef
+
+    def scaler_stats(self):
+        """
+        Mean and (population) variance of the numerical features, as fitted by `StandardScaler`.
+
+        Returns
+        -------
+        mean, var : np.ndarray
+        """
+
+        numerical = slice(-len(NUMERICAL_FEATURES), None)
+        x_mean = self.x_sum[numerical] / self.n
+        var = np.diag(self.xtx)[numerical] / self.n - x_mean ** 2
+
+        return x_mean + self.shift[numerical], np.maximum(var, 0.0)
+
+    def save(self, path: str) -> None:
+        """
+        Atomically write the statistics to an `.npz` file (no pickled objects).
+
+        Parameters
+        ----------
+        path : str
+            Destination file.
+        """
+
+        with atomic_open(path) as f:
+            np.savez(f, names=np.array(list(self.targets), dtype=str), columns=np.array(list(self.targets.values()), dtype=str),
+                     shift=self.shift, n=np.int64(self.n), x_sum=self.x_sum, y_sum=self.y_sum,
+                     xtx=self.xtx, xty=self.xty, last_date=self.last_date)
+
+    @classmethod
+    def load(cls, path: str) -> 'NormalEquations':
+        """
+        Read statistics written by `save`.
+
+        Parameters
+        ----------
+        path : str
+            Path of the `.npz` file.
+
+        Returns
+        -------
+        NormalEquations
+
+        Raises
+        ------
+        FileNotFoundError
+            If `path` does not exist.
+        """
+
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} does not exist")
+
+        with np.load(path) as arrays:
+            return cls(dict(zip(arrays['names'].tolist(), arrays['columns'].tolist())), arrays['shift'], arrays['n'],
+                       arrays['x_sum'], arrays['y_sum'], arrays['xtx'], arrays['xty'], arrays['last_date'])
+
+
+def fit_pipelines(train_df: pd.DataFrame, targets: Optional[Dict[str, dict]] = None, n_jobs: Optional[int] = None) -> Dict[str, Pipeline]:
+    """
+    Fit the pipeline of every forecast target on one shared design matrix.
+
+    The preprocessor only depends on the features, so it is fitted and applied once. The
+    regressors are then fitted on the same transformed matrix in a thread pool (NumPy and
+    SciPy release the GIL during the heavy linear algebra). Each returned pipeline is
+    `make_pipeline(preprocessor, regressor)` and predicts exactly like a pipeline fitted
+    on its own.
+
+    Parameters
+    ----------
+    train_df : pd.DataFrame
+        Training data with all columns in `src.model_config.FEATURES` and every target column.
+    targets : dict, optional
+        Forecast name -> target configuration with 'target' and 'estimator' entries, by
+        default `src.model_config.TARGETS`.
+    n_jobs : int, optional
+        Number of regressors fitted concurrently, by default one per target.
+
+    Returns
+    -------
+    dict
+        Forecast name -> fitted pipeline.
+
+    Raises
+    ------
+    KeyError
+        If a feature or target column is missing from `train_df`.
+    """
+
+    targets = TARGETS if targets is None else targets
+
+    missing = set(FEATURES).union(config['target'] for config in targets.values()) - set(train_df.columns)
+    if missing:
+        raise KeyError(f"Missing training columns: {sorted(missing)}")
+
+    preprocessor = make_preprocessor()
+    X_train = preprocessor.fit_transform(train_df[FEATURES])
+
+    def fit_one(config):
+        return clone(config['estimator']).fit(X_train, train_df[config['target']])
+
+    with ThreadPoolExecutor(max_workers=n_jobs or len(targets)) as executor:
+        estimators = dict(zip(targets, executor.map(fit_one, targets.values())))
+
+    return {name: make_pipeline(preprocessor, estimator) for name, estimator in estimators.items()}
+
+
+def train_all(store: str = DEFAULT_STORE, targets: Optional[Dict[str, dict]] = None,
+              n_jobs: Optional[int] = None) -> Dict[str, Pipeline]:
+    """
+    Train and save the pipelines of every forecast target of one store in one run.
+
+    The pipelines are written atomically, together with the `NormalEquations` of the
+    linear targets, from which `src.online_update.update_pipelines` adds new days. The
+    normal equations also keep the linear targets of the previous run that are not
+    trained again (e.g. after `--target total_sales`), re-summed on the current training
+    table so that every target covers the same rows.
+
+    Parameters
+    ----------
+    store : str, optional
+        Store id, by default `src.stores.DEFAULT_STORE`. The store's training table
+        (written by `scripts/prepare_combined.csv.py`) is read and its pipelines are
+        saved in its model directory.
+    targets : dict, optional
+        Forecast name -> target configuration with 'target', 'estimator' and 'model_file'
+        entries, by default `src.model_config.TARGETS`.
+    n_jobs : int, optional
+        Number of regressors fitted concurrently, by default one per target.
+
+    Returns
+    -------
+    dict
+        Forecast name -> fitted pipeline.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the training table of `store` does not exist.
+    """
+
+    targets = TARGETS if targets is None else targets
+    equations_path = store_path('models', store, NORMAL_EQUATIONS_FILE)
+
+    linear = {name: config['target'] for name, config in targets.items() if type(config['estimator']) is LinearRegression}
+    if linear and os.path.exists(equations_path):
+        linear = {**NormalEquations.load(equations_path).targets, **linear}
+
+    target_columns = list(dict.fromkeys([config['target'] for config in targets.values()] + list(linear.values())))
+    with timed('read'):
+        train_df = read_table(store_path('train', store), columns=FEATURES + target_columns, index_col='date')
+
+    with timed('fit'):
+        pipelines = fit_pipelines(train_df, targets, n_jobs=n_jobs)
+
+    with timed('write'):
+        for name, pipeline in pipelines.items():
+            with atomic_open(store_path('models', store, targets[name]['model_file'])) as f:
+                pickle.dump(pipeline, f)
+
+        # starting point of the incremental updates (see `src.online_update`)
+        if linear:
+            NormalEquations.from_frame(train_df, linear).save(equations_path)
+
+    return pipelines
@@ -0,0 +1,180 @@
+import os
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.schemas import SPECS
+from src.storage import read_table
+
+# largest absolute error a float column may take from being stored as float32 (a tenth of a cent)
+FLOAT32_TOLERANCE = 1e-3
+
+
+def _float32_allowed(values: np.ndarray, tolerance: float) -> bool:
+    # float32 keeps about 7 significant digits: enough for daily sales and weather, not for large sums
+    compact = values.astype(np.float32)
+    with np.errstate(invalid='ignore', over='ignore'):
+        error = np.abs(compact.astype(np.float64) - values)
+    return bool(np.isfinite(compact[np.isfinite(values)]).all() and not (error > tolerance).any())
+
+
+def _compact_column(series: pd.Series, spec, tolerance: float) -> pd.Series:
+    if spec is not None and spec.dtype in ('str', 'category'):
+        # the allowed values of the spec, in their order, so every read has the same categories
+        categories = list(spec.isin) if spec.isin is not None else None
+        if isinstance(series.dtype, pd.CategoricalDtype) and categories is None:
+            return series
+        return series.astype(pd.CategoricalDtype(categories))
+
+    if series.dtype == np.float64 and _float32_allowed(series.to_numpy(), tolerance):
+        return series.astype(np.float32)
+    if series.dtype == np.int64:
+        return pd.to_numeric(series, downcast='integer')
+
+    return series
+
+
+def compact_dtypes(df: pd.DataFrame, name: Optional[str] = None, tolerance: float = FLOAT32_TOLERANCE) -> pd.DataFrame:
+    """
+    Convert the columns of a table to the smallest dtypes that keep its values.
+
+    The spec of the table in `src.schemas.SPECS` decides how text is stored: its
+    'str' and 'category' columns become categoricals, with the allowed values of the spec as
+    categories when it lists them (e.g. 'type_of_day'). Float columns become float32 when no
+    value moves by more than `tolerance`, and int64 columns take the smallest integer dtype
+    holding their range. Datetime and boolean columns, and text columns outside the spec, are
+    kept as they are.
+
+    The compact table is meant for reading (e.g. in the dashboard): it does not pass
+    `validate_frame`, whose specs expect float64 and text columns, and models are fitted on
+    float64 data.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The table to convert. It is not modified.
+    name : str, optional
+        Spec of the table, one of 'sales', 'weather' or 'combined'. Without a spec, only
+        the numerical columns are converted.
+    tolerance : float, optional
+        Largest absolute error allowed by float32, by default FLOAT32_TOLERANCE.
+
+    Returns
+    -------
+    pd.DataFrame
+        A new table with the same columns, index and values.
+
+    Raises
+    ------
+    ValueError
+        If a text column has values outside the categories of its spec (they would be lost).
+
+    Examples
+    --------
+    >>> combined_df = compact_dtypes(read_table(store_path('combined', 'main'), index_col='date'), 'combined')
+    >>> combined_df['type_of_day'].dtype
+    CategoricalDtype(categories=['Weekday', 'Weekend', 'Friday', 'Unusual', 'Holiday'], ordered=False)
+    """
+
+    spec = SPECS[name] if name is not None else {}
+
+    columns = {}
+    for column, series in df.items():
+        columns[column] = _compact_column(series, spec.get(column), tolerance)
+        lost = columns[column].isna() & series.notna()
+        if lost.any():
+            raise ValueError(f"Column {column} has values outside its categories: {sorted(series[lost].astype(str).unique())}")
+
+    return pd.DataFrame(columns, index=df.index)
+
+
+def read_typed(path: str, name: Optional[str] = None, columns: Optional[List[str]] = None,
+               index_col: Optional[str] = 'date', tolerance: float = FLOAT32_TOLERANCE) -> pd.DataFrame:
+    """
+    Read a table with compact dtypes (see `compact_dtypes`) and a DatetimeIndex.
+
+    Parquet files and partitioned stores are read with `src.storage.read_table`; CSV files
+    are parsed with the date columns of the spec as dates.
+
+    Parameters
+    ----------
+    path : str
+        Path of a Parquet file, a partitioned store or a CSV file.
+    name : str, optional
+        Spec of the table, one of 'sales', 'weather' or 'combined'.
+    columns : list of str, optional
+        Columns to read. Reads all columns if None.
+    index_col : str, optional
+        Date column used as the index, by default 'date'. None to keep a range index.
+    tolerance : float, optional
+        Largest absolute error allowed by float32, by default FLOAT32_TOLERANCE.
+
+    Returns
+    -------
+    pd.DataFrame
+        The compact table, indexed by date.
+
+    Raises
+    ------
+    FileNotFoundError
+        If `path` does not exist.
+
+    Examples
+    --------
+    >>> combined_df = read_typed(store_path('combined', 'main'), 'combined', columns=['type_of_day', 'total_sales_normalized'])
+    """
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} does not exist")
+
+    if path.endswith('.csv'):
+        usecols = None if columns is None else list(dict.fromkeys(([index_col] if index_col else []) + list(columns)))
+        dates = [column for column, spec in (SPECS[name] if name is not None else {}).items() if spec.dtype == 'datetime']
+        header = pd.read_csv(path, nrows=0, usecols=usecols).columns
+        parse_dates = [column for column in dict.fromkeys(dates + ([index_col] if index_col else [])) if column in header]
+        df = pd.read_csv(path, usecols=usecols, parse_dates=parse_dates)
+        if index_col is not None:
+            df = df.set_index(index_col)
+    else:
+        df = read_table(path, columns=columns, index_col=index_col)
+
+    if index_col is not None and not isinstance(df.index, pd.DatetimeIndex):
+        df.index = pd.DatetimeIndex(pd.to_datetime(df.index), name=index_col)
+
+    return compact_dtypes(df, name, tolerance)
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """
+    Memory of every column of a table before and after `compact_dtypes`.
+
+    Parameters
+    ----------
+    before, after : pd.DataFrame
+        The table as read and its compact version.
+
+    Returns
+    -------
+    pd.DataFrame
+        Indexed by column (the index first, a 'total' row last), with the columns
+        'dtype_before', 'dtype_after', 'bytes_before', 'bytes_after' and 'saved' (share
+        of the memory saved).
+
+    Examples
+    --------
+    >>> memory_report(combined_df, compact_dtypes(combined_df, 'combined')).loc['total', 'saved']
+    0.73
+    """
+
+    bytes_before, bytes_after = before.memory_usage(deep=True), after.memory_usage(deep=True)
+    dtypes_before = pd.Series({'Index': before.index.dtype, **before.dtypes.to_dict()}).astype(str)
+    dtypes_after = pd.Series({'Index': after.index.dtype, **after.dtypes.to_dict()}).astype(str)
+
+    report = pd.DataFrame({'dtype_before': dtypes_before, 'dtype_after': dtypes_after,
+                           'bytes_before': bytes_before, 'bytes_after': bytes_after})
+    report.loc['total'] = ['', '', bytes_before.sum(), bytes_after.sum()]
+    report[['bytes_before', 'bytes_after']] = report[['bytes_before', 'bytes_after']].astype('int64')
+    report['saved'] = (1 - report['bytes_after'] / report['bytes_before']).round(2)
+
+    return report
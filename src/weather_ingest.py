@@ -0,0 +1,112 @@
+from typing import Iterable, List, Optional
+
+import pandas as pd
+
+from src.data_validation import validate_frame
+from src.storage import write_table
+
+WEATHER_COLUMNS = ['date', 'avg_temperature', 'rain', 'snow']
+
+# explicit dtypes, so that a chunk without decimals is not read as integers
+_WEATHER_DTYPES = {'avg_temperature': 'float64', 'rain': 'float64', 'snow': 'float64'}
+
+
+def _read_chunks(path, chunksize, start, end):
+    for chunk in pd.read_csv(path, usecols=WEATHER_COLUMNS, dtype=_WEATHER_DTYPES, parse_dates=['date'],
+                             chunksize=chunksize):
+        chunk = chunk[WEATHER_COLUMNS].dropna(subset=['date'])
+        if start is not None:
+            chunk = chunk[chunk['date'] >= start]
+        if end is not None:
+            chunk = chunk[chunk['date'] <= end]
+        yield chunk
+
+
+def stream_weather(paths: Iterable[str], start: Optional[str] = None, end: Optional[str] = None,
+                   chunksize: int = 50_000) -> pd.DataFrame:
+    """
+    Read daily weather archives in chunks, keeping only the modelling columns and dates.
+
+    Only the columns in WEATHER_COLUMNS are parsed (`usecols`) and rows outside
+    [`start`, `end`] are dropped chunk by chunk, so the memory used does not depend on
+    the size of the archives, only on `chunksize` and on the number of distinct days kept.
+    Rows without a date are dropped. When a date appears more than once, the last row read
+    wins: files are read in the given order, so a later export supersedes an earlier one.
+
+    Parameters
+    ----------
+    paths : iterable of str
+        CSV archives in the weatherstats format, read in order.
+    start, end : str, optional
+        First and last date to keep (inclusive), e.g. '2022-01-01'. Unbounded if None.
+    chunksize : int, optional
+        Number of CSV rows parsed at once, by default 50,000.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per date with the columns in WEATHER_COLUMNS, sorted by date.
+
+    Raises
+    ------
+    FileNotFoundError
+        If one of `paths` does not exist.
+    pandera.errors.SchemaError
+        If a chunk does not match the weather spec.
+
+    Examples
+    --------
+    >>> stream_weather(glob.glob('data/inputs/weather/*.csv'), start='2022-01-01')
+    """
+
+    start = None if start is None else pd.Timestamp(start)
+    end = None if end is None else pd.Timestamp(end)
+    kept: List[pd.DataFrame] = []
+
+    for path in paths:
+        for chunk in _read_chunks(path, chunksize, start, end):
+            validate_frame(chunk, 'weather')
+            kept.append(chunk)
+            # fold the chunks kept so far into one row per date, so that duplicated
+            # archives do not grow the buffer
+            if len(kept) > 1:
+                kept = [pd.concat(kept, ignore_index=True).drop_duplicates('date', keep='last')]
+
+    if not kept:
+        return pd.DataFrame({column: pd.Series(dtype='datetime64[ns]' if column == 'date' else 'float64')
+                             for column in WEATHER_COLUMNS})
+
+    weather_df = kept[0].drop_duplicates('date', keep='last')
+    return weather_df.sort_values('date', kind='stable').reset_index(drop=True)
+
+
+def ingest_weather(paths: Iterable[str], destination_path: str, start: Optional[str] = None,
+                   end: Optional[str] = None, chunksize: int = 50_000) -> pd.DataFrame:
+    """
+    Stream weather archives into a date-sorted Parquet table.
+
+    See `stream_weather`. Because the table is sorted by date, the min/max statistics of
+    its row groups are disjoint and date-filtered reads only decode the matching groups;
+    `src.storage.read_table(destination_path, index_col='date')` returns it date-indexed.
+
+    Parameters
+    ----------
+    paths : iterable of str
+        CSV archives in the weatherstats format, read in order.
+    destination_path : str
+        Destination Parquet file (e.g. 'data/processed/weather.parquet').
+    start, end : str, optional
+        First and last date to keep (inclusive). Unbounded if None.
+    chunksize : int, optional
+        Number of CSV rows parsed at once, by default 50,000.
+
+    Returns
+    -------
+    pd.DataFrame
+        The written table.
+    """
+
+    weather_df = stream_weather(paths, start=start, end=end, chunksize=chunksize)
+    write_table(weather_df, destination_path)
+
+    return weather_df
@@ -0,0 +1,197 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+WEATHER_VALUE_COLUMNS = ['avg_temperature', 'rain', 'snow']
+INTERPOLATION_METHODS = ('linear', 'ffill', 'none')
+GAP_REPORT_COLUMNS = ['column', 'start', 'end', 'days', 'filled_by']
+
+
+def _sorted_dates(weather_df):
+    dates = weather_df['date'].to_numpy(dtype='datetime64[ns]')
+    if len(dates) > 1 and not (dates[1:] > dates[:-1]).all():
+        raise ValueError("Weather dates must be unique and sorted, see `src.weather_ingest.stream_weather`")
+    return dates
+
+
+def covers(weather_df: pd.DataFrame, start, end) -> bool:
+    """
+    Check with two binary searches whether a sorted weather table has both `start` and `end`.
+
+    Parameters
+    ----------
+    weather_df : pd.DataFrame
+        Weather table with unique dates in increasing order.
+    start, end : datetime-like
+        First and last date that must be present.
+
+    Returns
+    -------
+    bool
+    """
+
+    dates = _sorted_dates(weather_df)
+    bounds = np.array([start, end], dtype='datetime64[ns]')
+    positions = np.searchsorted(dates, bounds)
+
+    return bool((positions < len(dates)).all() and (dates[np.minimum(positions, len(dates) - 1)] == bounds).all())
+
+
+def _align(weather_df, calendar, columns):
+    # values of `columns` on every day of `calendar`, NaN where the date is missing
+    dates = _sorted_dates(weather_df)
+    if len(dates) == 0:
+        return np.full((len(calendar), len(columns)), np.nan)
+
+    # int64 views: binary search on plain integers is faster than on datetime64
+    positions = np.minimum(np.searchsorted(dates.view('i8'), calendar.view('i8')), len(dates) - 1)
+    found = dates[positions] == calendar
+    weather_values = weather_df[columns].to_numpy(dtype='float64')
+    if found.all():
+        return weather_values.take(positions, axis=0)
+
+    values = np.full((len(calendar), len(columns)), np.nan)
+    values[found] = weather_values[positions[found]]
+
+    return values
+
+
+def _runs(missing):
+    # (start, stop) positions of the runs of True values
+    edges = np.diff(np.concatenate(([0], missing.view(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def _run_positions(starts, stops):
+    # every position covered by the runs, in order
+    lengths = stops - starts
+    return np.arange(lengths.sum()) + np.repeat(starts - (lengths.cumsum() - lengths), lengths)
+
+
+def _interpolate_short_runs(values, starts, stops, max_gap, method):
+    # fill runs of at most `max_gap` days that have a known value on both sides (linear)
+    # or before them (ffill); returns a mask of the filled positions
+    filled = np.zeros(len(values), dtype=bool)
+    short = (stops - starts <= max_gap) & (starts > 0)
+    if method == 'linear':
+        short &= stops < len(values)
+    if method == 'none' or not short.any():
+        return filled
+
+    positions = _run_positions(starts[short], stops[short])
+
+    if method == 'linear':
+        known = np.flatnonzero(~np.isnan(values))
+        values[positions] = np.interp(positions, known, values[known])
+    else:
+        values[positions] = np.repeat(values[starts[short] - 1], stops[short] - starts[short])
+
+    filled[positions] = True
+    return filled
+
+
+def join_weather(sales_df: pd.DataFrame, weather_df: pd.DataFrame,
+                 fallback_stations: Optional[Dict[str, pd.DataFrame]] = None,
+                 max_gap: int = 3, method: str = 'linear',
+                 columns: Optional[List[str]] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Join daily weather onto sales by date, filling and reporting gaps in the weather data.
+
+    The weather of the primary station is aligned on the daily calendar spanning the sales
+    dates with binary searches on its sorted dates (no hash join). For every column, runs
+    of missing days are detected with vectorized edge detection; runs of at most `max_gap`
+    days are interpolated, and the days still missing are taken from the fallback stations,
+    nearest first. Each gap of the primary station is reported with how it was filled;
+    days that no station covers stay NaN.
+
+    Parameters
+    ----------
+    sales_df : pd.DataFrame
+        Sales with a datetime column 'date' (one row per day).
+    weather_df : pd.DataFrame
+        Weather of the primary station with a 'date' column, unique and sorted by date
+        (as written by `src.weather_ingest.ingest_weather`).
+    fallback_stations : dict, optional
+        Station name -> weather table in the same format, ordered nearest first.
+    max_gap : int, optional
+        Longest run of missing days that is interpolated, by default 3.
+    method : str, optional
+        Interpolation of short gaps: 'linear' (in time, between the surrounding days),
+        'ffill' (last known day) or 'none'. By default 'linear'.
+    columns : list of str, optional
+        Weather columns to join, by default WEATHER_VALUE_COLUMNS.
+
+    Returns
+    -------
+    combined_df : pd.DataFrame
+        `sales_df` with the weather columns appended, in the order of `sales_df`.
+    gap_report : pd.DataFrame
+        One row per gap of the primary station with the columns in GAP_REPORT_COLUMNS;
+        `filled_by` is 'interpolation', the name of a fallback station, 'stations' (several
+        stations), or '' if some days of the gap remain missing.
+
+    Raises
+    ------
+    ValueError
+        If `method` is unknown or the weather dates are not unique and sorted.
+
+    Examples
+    --------
+    >>> combined_df, gap_report = join_weather(sales_df, weather_df, max_gap=2)
+    """
+
+    columns = WEATHER_VALUE_COLUMNS if columns is None else columns
+    if method not in INTERPOLATION_METHODS:
+        raise ValueError(f"Unknown interpolation method {method!r}, expected one of {INTERPOLATION_METHODS}")
+
+    sales_dates = sales_df['date'].to_numpy(dtype='datetime64[ns]')
+    combined_df = sales_df.reset_index(drop=True)
+    if len(sales_dates) == 0:
+        return combined_df.assign(**{column: np.nan for column in columns}), pd.DataFrame(columns=GAP_REPORT_COLUMNS)
+
+    calendar = pd.date_range(sales_dates.min(), sales_dates.max(), freq='D').to_numpy()
+    primary = _align(weather_df, calendar, columns)
+    stations = [(name, _align(df, calendar, columns)) for name, df in (fallback_stations or {}).items()]
+
+    report = []
+    for k, column in enumerate(columns):
+        values = primary[:, k]
+        starts, stops = _runs(np.isnan(values))
+        if len(starts) == 0:
+            continue
+
+        interpolated = _interpolate_short_runs(values, starts, stops, max_gap, method)
+        source = np.where(interpolated, 0, -1)
+        for station_number, (name, station) in enumerate(stations, start=1):
+            usable = np.isnan(values) & ~np.isnan(station[:, k])
+            values[usable] = station[usable, k]
+            source[usable] = station_number
+
+        # the source of every day of each gap, summarised per gap
+        run_id = np.repeat(np.arange(len(starts)), stops - starts)
+        run_sources = source[_run_positions(starts, stops)]
+        lowest = np.full(len(starts), np.iinfo(np.int64).max)
+        highest = np.full(len(starts), -1)
+        np.minimum.at(lowest, run_id, run_sources)
+        np.maximum.at(highest, run_id, run_sources)
+
+        names = ['interpolation'] + [name for name, _ in stations]
+        filled_by = np.where(lowest < 0, '',
+                             np.where(lowest == highest, np.array(names, dtype=object)[np.maximum(lowest, 0)], 'stations'))
+        report.append(pd.DataFrame({
+            'column': column,
+            'start': calendar[starts],
+            'end': calendar[stops - 1],
+            'days': stops - starts,
+            'filled_by': filled_by,
+        }))
+
+    # sales usually cover every day of the calendar, then no lookup is needed
+    if len(sales_dates) != len(calendar) or (sales_dates != calendar).any():
+        primary = primary.take(np.searchsorted(calendar.view('i8'), sales_dates.view('i8')), axis=0)
+    for k, column in enumerate(columns):
+        combined_df[column] = primary[:, k]
+
+    gap_report = pd.concat(report, ignore_index=True) if report else pd.DataFrame(columns=GAP_REPORT_COLUMNS)
+    return combined_df, gap_report
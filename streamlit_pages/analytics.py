@@ -1,10 +1,12 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import pickle
 import datetime
+from src.aggregate_cube import TYPES_OF_DAY, query_cube
+from src.app_cache import load_table, selected_store
+from src.instrumentation import set_timing_context, timed
+from src.stores import store_path
 
 
 
@@ -14,10 +16,14 @@ today = datetime.datetime.now()
 st.title('Analytics')
 
 # read in data 
-combined_df = pd.read_csv('data/processed/combined.csv', index_col=0, parse_dates=True)
-combined_df['sales_per_order'] = combined_df['total_sales_normalized'] / combined_df['in_store_orders'] 
-combined_df['month'] = combined_df.index.month_name()
-combined_df[combined_df.select_dtypes(include='number').columns] = combined_df[combined_df.select_dtypes(include='number').columns].round(1)
+analytics_columns = ['total_sales_normalized', 'tips_normalized', 'in_store_orders', 'item_A_sales', 'item_B_sales', 'item_C_sales', 
+                     'type_of_day', 'day_of_week', 'season', 'is_holiday', 'is_HCF']
+store = selected_store()
+set_timing_context('analytics', store=store)
+
+with timed('data load'):
+    combined_df = load_table(store_path('combined', store), columns=analytics_columns, index_col='date', schema='combined')
+    cube = load_table(store_path('cube', store))
 
 weekday_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
 
@@ -27,43 +33,40 @@ with st.sidebar:
         "Select day range for analytics",
             ['All', 7, 30, 90, 180])
 
+# averages by type of day, looked up in the aggregate cube (only the first month of a day range is read from combined_df)
+with timed('aggregation'):
+    since = None if day_range == 'All' else combined_df.index[-min(day_range, len(combined_df))]
+    type_of_day_df = query_cube(cube, ['type_of_day'], since=since, df=combined_df)
+
+# daily values of the box plots, rounded for display
+combined_df[combined_df.select_dtypes(include='number').columns] = combined_df[combined_df.select_dtypes(include='number').columns].round(1)
+
 if day_range == 'All':
     input_df = combined_df 
 else:
     input_df = combined_df.iloc[-day_range:]
 
 # average sales table 
-grouped_df = input_df.groupby('type_of_day').agg({
-    'total_sales_normalized':['mean'],
-    'tips_normalized':['mean'],
-    'item_A_sales':['mean'],
-    'item_B_sales':['mean'],
-    'item_C_sales':['mean'],
-    'sales_per_order': ['mean']
-}).reset_index()
-
-grouped_df.columns = ['Type of day','Total Sales', 'Tips', 'Item A sales', 'Item B sales', 'Item C sales', 'Sales per order']
-grouped_df.set_index('Type of day', inplace=True)
-grouped_df = grouped_df.reindex(['Weekday', 'Friday', 'Weekend', 'Holiday'], fill_value=0)
+grouped_df = type_of_day_df[['total_sales_normalized_mean', 'tips_normalized_mean', 'item_A_sales_mean', 'item_B_sales_mean',
+                             'item_C_sales_mean', 'sales_per_order_mean']]
+
+grouped_df.columns = ['Total Sales', 'Tips', 'Item A sales', 'Item B sales', 'Item C sales', 'Sales per order']
+grouped_df = grouped_df.reindex(TYPES_OF_DAY, fill_value=0)
+grouped_df.index.name = 'Type of day'
 
 st.markdown('##### Average Sales by Type of Day')
 st.table(grouped_df.style.format("{:.1f}"))
 
 col_1_1, col_1_2 = st.columns(2)
 
-with col_1_1:
+with col_1_1, timed('figures', figure='revenue decomposition'):
          
     # sales per order vs number of orders by day of the week 
 
-    rev_decomp = input_df.groupby('type_of_day').agg({
-        'total_sales_normalized':['mean'],
-        'sales_per_order':['mean'],
-        'in_store_orders':['mean']
-    }).round(2).reset_index()
+    rev_decomp = type_of_day_df[['total_sales_normalized_mean', 'sales_per_order_mean', 'in_store_orders_mean']].round(2)
 
-    rev_decomp.columns = ['type_of_day', 'total_sales_normalized', 'sales_per_order', 'in_store_orders']
-    rev_decomp.set_index('type_of_day', inplace=True)
-    rev_decomp = rev_decomp.reindex(['Weekday', 'Friday', 'Weekend', 'Holiday'], fill_value=0)
+    rev_decomp.columns = ['total_sales_normalized', 'sales_per_order', 'in_store_orders']
+    rev_decomp = rev_decomp.reindex(TYPES_OF_DAY, fill_value=0)
 
     rev_decomp_fig = make_subplots(
         specs=[[{"secondary_y": True}]])
@@ -135,7 +138,7 @@ with col_1_1:
 
 #     st.plotly_chart(sales_by_day)
 
-with col_1_2:
+with col_1_2, timed('figures', figure='item A by day'):
     sales_by_day_A = px.box(input_df, 
                             x='day_of_week', 
                             y='item_A_sales', 
@@ -156,7 +159,7 @@ with col_1_2:
 
 col_2_1, col_2_2 = st.columns(2)
 
-with col_2_1:
+with col_2_1, timed('figures', figure='item B by day'):
    
     sales_by_day_B = px.box(input_df, 
                         x='day_of_week', 
@@ -176,7 +179,7 @@ with col_2_1:
 
     st.plotly_chart(sales_by_day_B)
 
-with col_2_2:
+with col_2_2, timed('figures', figure='item C by day'):
     sales_by_day_C = px.box(input_df, 
                         x='day_of_week', 
                         y='item_C_sales', 
@@ -242,7 +245,7 @@ st.markdown(f'##### Hot Chocolate Festival Sales Impact')
 
 col_4_1, col_4_2 = st.columns(2)
 
-with col_4_1:
+with col_4_1, timed('figures', figure='item A HCF'):
     input_df_winter = combined_df[combined_df['season'] == 'Winter']
 
 
@@ -263,9 +266,7 @@ with col_4_1:
 
     st.plotly_chart(A_HCF)
 
-with col_4_2:
-    combined_df_winter = combined_df[combined_df['month'] == 'February']
-
+with col_4_2, timed('figures', figure='item B HCF'):
     B_HCF = px.box(input_df_winter, 
                 x='day_of_week', 
                 y='item_B_sales', 
@@ -1,45 +1,31 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import pickle
-import datetime
-from sklearn.metrics import mean_absolute_error
-from src.feature_functions import *
+from src.app_cache import load_csv, load_table, selected_store
+from src.instrumentation import set_timing_context, timed
+from src.diagnostics_plots import backtest_figure, backtest_summary, prediction_figure, resid_dist_figure, resid_fit_figure
+from src.stores import store_path
 
 
 # model diagnostics
 st.title('Poisson model diagnostics - In Store Orders')
 
-# load trained model 
-with open("model/pr_pipe_orders.pkl", 'rb') as f:
-        pr_pipe = pickle.load(f)
+# load actuals, predictions and residuals saved by the results stage
+store = selected_store()
+set_timing_context('diagnostics_orders', store=store)
 
-train_df = pd.read_csv('data/modelling/train.csv', index_col=0, parse_dates=True)
-test_df = pd.read_csv('data/modelling/test.csv', index_col=0, parse_dates=True)
+with timed('data load'):
+    series = load_table(store_path('results', store, 'fit_series_orders.parquet'), index_col='date')
+    train_series = series[series['split'] == 'train']
+    test_series = series[series['split'] == 'test']
+    mae = round(test_series['resid'].abs().mean(), 2)
 
-X_test = test_df.drop(columns=['in_store_orders'])
-y_test = test_df['in_store_orders']
-y_pred = pr_pipe.predict(X_test)
-mae = round(mean_absolute_error(y_test, y_pred), 2)
-
-st.markdown(f'Training data range: **{train_df.index.min().date()}** -- **{train_df.index.max().date()}**')
-st.markdown(f'Test data range: **{test_df.index.min().date()}** -- **{test_df.index.max().date()}**')
+st.markdown(f'Training data range: **{train_series.index.min().date()}** -- **{train_series.index.max().date()}**')
+st.markdown(f'Test data range: **{test_series.index.min().date()}** -- **{test_series.index.max().date()}**')
 st.markdown(f'Mean absolute error on test data = **{mae:.2f}**')
 
-X_train = train_df.drop(columns=['in_store_orders'])
-y_train = train_df['in_store_orders']
-
-X_test = test_df.drop(columns=['in_store_orders'])
-y_test = test_df['in_store_orders']
-
-with open('results/pr_plot_orders.pkl', 'rb') as f:
-   pr_plot = pickle.load(f)
-
-with open('results/resid_fit_plot_orders.pkl', 'rb') as f:
-   resid_fit_plot = pickle.load(f)
-
-with open('results/resid_dist_plot_orders.pkl', 'rb') as f:
-   resid_dist_plot = pickle.load(f)
+with timed('figures'):
+    pr_plot = prediction_figure(series, 'in_store_orders')
+    resid_fit_plot = resid_fit_figure(series)
+    resid_dist_plot = resid_dist_figure(series)
 
 pr_plot.update_layout(
     title='Actual vs. prediction',
@@ -49,10 +35,10 @@ pr_plot.update_layout(
 
 st.plotly_chart(pr_plot)
 
-coef_df = pd.read_csv('results/trained_coef_orders.csv')
+coef_df = load_csv(store_path('results', store, 'trained_coef_orders.csv'))
 coef_df[['coefficients']] = coef_df[['coefficients']].applymap(lambda x: f"{x:.3}")
 
-mae_df = pd.read_csv('results/mae_grouped_orders.csv')
+mae_df = load_csv(store_path('results', store, 'mae_grouped_orders.csv'))
 mae_df[['in_store_orders', 'y_pred', 'prediction_error']] = mae_df[['in_store_orders', 'y_pred', 'prediction_error']].astype(int).applymap(lambda x: f"{x:,}")
 mae_df[['error_percentage']] = mae_df[['error_percentage']].applymap(lambda x: f"{x:.1%}")
 
@@ -102,4 +88,39 @@ with col_2_2:
     yaxis_title="Count"
     )
 
-    st.plotly_chart(resid_dist_plot)
\ No newline at end of file
+    st.plotly_chart(resid_dist_plot)
+
+# rolling-origin backtest: errors of the forecasts made from every origin
+with timed('backtest'):
+    backtest_df = load_table(store_path('results', store, 'backtest.parquet'))
+    backtest_plot = backtest_figure(backtest_df, 'orders')
+    backtest_df = backtest_summary(backtest_df, 'orders')
+    backtest_df[['mae', 'mae_p10', 'mae_p90', 'bias']] = backtest_df[['mae', 'mae_p10', 'mae_p90', 'bias']].astype(int).applymap(lambda x: f"{x:,}")
+
+st.markdown('##### Backtest')
+
+col_3_1, col_3_2 = st.columns(2)
+
+with col_3_1:
+    backtest_plot.update_layout(
+       title='MAE of the forecasts by origin',
+       xaxis_title="Forecast origin",
+       yaxis_title="MAE"
+    )
+
+    st.plotly_chart(backtest_plot)
+
+with col_3_2:
+    st.markdown('###### Backtest error by day of the week')
+    st.dataframe(
+    backtest_df,
+    column_config={
+        'day_of_week': "Day",
+        'origins': 'Origins',
+        'mae': 'Avg MAE',
+        'mae_p10': 'MAE 10th pct',
+        'mae_p90': 'MAE 90th pct',
+        'bias': 'Avg error'
+    },
+    hide_index=True
+)
@@ -0,0 +1,91 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from src.instrumentation import TIMINGS_LOG, read_timings
+
+
+# title
+st.title('Performance')
+st.markdown('Time spent in the steps of the pipeline scripts and the sections of the dashboard pages, '
+            f'as logged to `{TIMINGS_LOG}`. Turn on "Profile reruns" in the sidebar to profile a rerun of any page.')
+
+# read in timings
+try:
+    timings = pd.DataFrame(read_timings())
+except FileNotFoundError:
+    st.info('No timings recorded yet: run the pipeline (`make pipeline`) or open a page of the dashboard.')
+    st.stop()
+
+timings['time'] = pd.to_datetime(timings['time'])
+timings['store'] = timings['store'].fillna('') if 'store' in timings else ''
+
+with st.sidebar:
+    st.markdown('### Select timings')
+    period = st.selectbox("Period", ['Last day', 'Last 7 days', 'Last 30 days', 'All'], index=1)
+    sources = st.multiselect("Scripts and pages", sorted(timings['source'].dropna().unique()))
+
+days = {'Last day': 1, 'Last 7 days': 7, 'Last 30 days': 30}
+if period in days:
+    timings = timings[timings['time'] >= timings['time'].max() - pd.Timedelta(days=days[period])]
+if sources:
+    timings = timings[timings['source'].isin(sources)]
+
+# summary by script or page and step
+summary = (timings.groupby(['source', 'stage'])
+           .agg(runs=('seconds', 'size'), total_s=('seconds', 'sum'), mean_ms=('seconds', 'mean'),
+                p50_ms=('seconds', 'median'), p95_ms=('seconds', lambda seconds: seconds.quantile(0.95)),
+                max_ms=('seconds', 'max'), errors=('status', lambda status: int((status == 'error').sum())),
+                last_run=('time', 'max'))
+           .reset_index()
+           .sort_values('total_s', ascending=False))
+summary[['mean_ms', 'p50_ms', 'p95_ms', 'max_ms']] *= 1000
+
+st.markdown('##### Time by step')
+st.dataframe(
+    summary.round({'total_s': 2, 'mean_ms': 1, 'p50_ms': 1, 'p95_ms': 1, 'max_ms': 1}),
+    column_config={
+        'source': 'Script or page',
+        'stage': 'Step',
+        'runs': 'Runs',
+        'total_s': 'Total (s)',
+        'mean_ms': 'Mean (ms)',
+        'p50_ms': 'Median (ms)',
+        'p95_ms': '95th pct (ms)',
+        'max_ms': 'Max (ms)',
+        'errors': 'Errors',
+        'last_run': 'Last run'
+    },
+    hide_index=True
+)
+
+col_1_1, col_1_2 = st.columns(2)
+
+with col_1_1:
+    # where the time goes: share of every step in the total time of its script or page
+    share_plot = px.bar(summary, x='total_s', y='source', color='stage', orientation='h')
+    share_plot.update_layout(
+        title='Total time by step',
+        xaxis_title='Seconds',
+        yaxis_title='',
+        legend_title=dict(text='Step')
+    )
+    share_plot.update_xaxes(gridcolor="lightgrey")
+
+    st.plotly_chart(share_plot)
+
+with col_1_2:
+    steps = summary['source'] + ' / ' + summary['stage']
+    step = st.selectbox("Step", steps.tolist())
+    source, stage = step.split(' / ', 1) if step else (None, None)
+    history = timings[(timings['source'] == source) & (timings['stage'] == stage)]
+
+    history_plot = px.scatter(history, x='time', y=history['seconds'] * 1000, color='store')
+    history_plot.update_layout(
+        title=f'Duration of {step} over time',
+        xaxis_title='Time',
+        yaxis_title='Milliseconds',
+        legend_title=dict(text='Store')
+    )
+    history_plot.update_yaxes(gridcolor="lightgrey")
+
+    st.plotly_chart(history_plot)
@@ -3,13 +3,27 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import pickle
 import datetime
-from sklearn.metrics import mean_absolute_error
-from src.feature_functions import *
+from src.feature_functions import get_season
+from src.instrumentation import set_timing_context, timed
+from src.app_cache import load_intervals, load_kernel, load_kpi_engine, load_table, selected_store
+from src.model_config import model_path
+from src.prediction_intervals import intervals_path
+from src.rollups import rollup_means
+from src.scoring_kernel import kernel_path
+from src.stores import store_path
 
 
 today = datetime.datetime.now()
+store = selected_store()
+set_timing_context('sales_monitor', store=store)
+
+with timed('data load'):
+    # KPIs over calendar windows: prefix-sum lookups, whatever the range and the number of KPIs
+    kpis = load_kpi_engine(store_path('sales', store), ['total_sales_normalized', 'tips_normalized', 'in_store_orders'])
+
+    # weekly and monthly rollups for the trend graphs, updated at ingestion (one row per week or month)
+    rollups = load_table(store_path('rollups', store))
 
 # title 
 st.title('Sales Monitor')
@@ -56,12 +70,25 @@ with st.sidebar:
             (False, True)
         )
 
+        interval_level = st.selectbox(
+            "Prediction interval",
+            (0.8, 0.9, 0.95),
+            format_func=lambda level: f"{level:.0%}"
+        )
+
     with st.expander("KPI inputs"):
          metric_range = st.selectbox(
               "Select day range for KPIs",
-              (7, 14, 30, 90, 180),
+              (7, 14, 30, 90, 180, 'Custom'),
               index=2
          )
+
+         if metric_range == 'Custom':
+              metric_dates = st.date_input(
+                   "KPI date range",
+                   value=(kpis.last_date.date() - datetime.timedelta(days=29), kpis.last_date.date()),
+                   format='DD.MM.YYYY'
+              )
     
     with st.expander("Graph inputs"):
         aggregation_level = st.selectbox(
@@ -84,12 +111,6 @@ data = {
  'day_of_week': day_of_the_week,
  'is_holiday': is_holiday}
 
-input_df = pd.DataFrame(data, index=[0])
-
-# loading in sales data for plots
-sales_df = pd.read_csv('data/processed/sales.csv', index_col=0, parse_dates=True)
-sales_df['sales_per_order'] = sales_df['total_sales_normalized'] / sales_df['in_store_orders']
-
 # define plotting functions 
 def make_line_graph(input_df, range, width=400, height=300): 
     graph = px.line(
@@ -99,9 +120,9 @@ def make_line_graph(input_df, range, width=400, height=300):
 )
     return graph
 
-def make_trend_graph(input_df, agg, width=400, height=300): 
+def make_trend_graph(input_df, width=400, height=300): 
     graph = px.line(
-        input_df.resample(agg).mean().round(1),
+        input_df.round(1),
         width=width,
         height=height
     )
@@ -110,23 +131,23 @@ def make_trend_graph(input_df, agg, width=400, height=300):
 
 # show predictions
 
-# load pickles 
-with open("model/lr_pipe_total_sales.pkl", 'rb') as f:
-        lr_pipe_total = pickle.load(f)
-
-with open("model/lr_pipe_item_A_sales.pkl", 'rb') as f:
-        lr_pipe_A = pickle.load(f)
-
-with open("model/lr_pipe_item_B_sales.pkl", 'rb') as f:
-        lr_pipe_B = pickle.load(f)
+with timed('forecasts'):
+    # load compiled scoring kernels of the trained pipelines (cached across sessions)
+    kernel_total = load_kernel(kernel_path(model_path('total_sales', store)))
+    kernel_A = load_kernel(kernel_path(model_path('item_A_sales', store)))
+    kernel_B = load_kernel(kernel_path(model_path('item_B_sales', store)))
+    kernel_orders = load_kernel(kernel_path(model_path('orders', store)))
 
-with open("model/pr_pipe_orders.pkl", 'rb') as f:
-        pr_pipe = pickle.load(f)
+    prediction_total = int(kernel_total.predict_one(data))
+    prediction_A = int(kernel_A.predict_one(data))
+    prediction_B = int(kernel_B.predict_one(data))
+    prediction_order = int(kernel_orders.predict_one(data))
 
-prediction_total = lr_pipe_total.predict(input_df)[0].astype(int)
-prediction_A = lr_pipe_A.predict(input_df)[0].astype(int)
-prediction_B = lr_pipe_B.predict(input_df)[0].astype(int)
-prediction_order = pr_pipe.predict(input_df)[0].astype(int)
+    # prediction intervals from the cached bootstrap refits: one matrix-vector product per forecast
+    interval_total = load_intervals(intervals_path(model_path('total_sales', store))).interval(data, interval_level)
+    interval_A = load_intervals(intervals_path(model_path('item_A_sales', store))).interval(data, interval_level)
+    interval_B = load_intervals(intervals_path(model_path('item_B_sales', store))).interval(data, interval_level)
+    interval_order = load_intervals(intervals_path(model_path('orders', store))).interval(data, interval_level)
 
 st.markdown('### Forecasts')
 st.markdown('Based on forecasting input selected')
@@ -135,43 +156,49 @@ col_1_1, col_1_2, col_1_3, col_1_4 = st.columns(4)
 
 with col_1_1:
     st.metric(label= "Total sales", value=f"${prediction_total:,}", border=True)
+    st.caption(f"{interval_level:.0%} interval: ${int(interval_total[0]):,} - ${int(interval_total[1]):,}")
 
 with col_1_2:
     st.metric(label= "Item A sales", value=f"${prediction_A:,}", border=True)
+    st.caption(f"{interval_level:.0%} interval: ${int(interval_A[0]):,} - ${int(interval_A[1]):,}")
 
 with col_1_3:
     st.metric(label= "Item B sales", value=f"${prediction_B:,}", border=True)
+    st.caption(f"{interval_level:.0%} interval: ${int(interval_B[0]):,} - ${int(interval_B[1]):,}")
 
 with col_1_4:
     st.metric(label= "Total orders", value=f"{prediction_order}", border=True)
+    st.caption(f"{interval_level:.0%} interval: {int(interval_order[0])} - {int(interval_order[1])}")
 
 # metric boxes 
 
-# calculate average figures 
-avg_orders = sales_df['in_store_orders'].iloc[-metric_range:].mean().astype(int)
-avg_sales = sales_df['total_sales_normalized'].iloc[-metric_range:].mean().astype(int)
-avg_tips = sales_df['tips_normalized'].iloc[-metric_range:].mean().astype(int)
+if metric_range == 'Custom':
+    # the range picker returns a single date until the end date is chosen
+    metric_start, metric_end = metric_dates if len(metric_dates) == 2 else (metric_dates[0], metric_dates[0])
+    range_label = f"{metric_start:%d.%m.%Y} -- {metric_end:%d.%m.%Y}"
+else:
+    metric_start, metric_end = kpis.window(metric_range)
+    range_label = f"Last {metric_range} days"
 
-total_sales = sales_df['total_sales_normalized'].iloc[-metric_range:].sum()
-total_orders = sales_df['in_store_orders'].iloc[-metric_range:].sum()
-avg_sales_per_order = total_sales/total_orders
+def _or_zero(value):
+    # windows without sales (e.g. before the first sale) show as 0
+    return 0.0 if pd.isna(value) else value
 
-# calculate deltas compared to previous period 
-avg_orders_last_period = sales_df['in_store_orders'].iloc[-metric_range*2:-metric_range].mean().astype(int)
-avg_sales_last_period = sales_df['total_sales_normalized'].iloc[-metric_range*2:-metric_range].mean().astype(int)
-avg_tips_last_period = sales_df['tips_normalized'].iloc[-metric_range*2:-metric_range].mean().astype(int)
+# calculate average figures and deltas compared to previous period 
+with timed('kpi aggregation'):
+    window = {'start': metric_start, 'end': metric_end}
+    avg_sales, avg_sales_last_period = (int(_or_zero(value)) for value in kpis.compare('mean', 'total_sales_normalized', **window))
+    avg_tips, avg_tips_last_period = (int(_or_zero(value)) for value in kpis.compare('mean', 'tips_normalized', **window))
+    avg_orders, avg_orders_last_period = (int(_or_zero(value)) for value in kpis.compare('mean', 'in_store_orders', **window))
+    avg_sales_per_order, avg_sales_per_order_last_period = (_or_zero(value) for value in kpis.compare('ratio', 'total_sales_normalized', 'in_store_orders', **window))
 
 avg_orders_delta = avg_orders - avg_orders_last_period
 avg_sales_delta = avg_sales - avg_sales_last_period
 avg_tips_delta = avg_tips - avg_tips_last_period
-
-total_sales_last_period = sales_df['total_sales_normalized'].iloc[-metric_range*2:-metric_range].sum()
-total_orders_last_period = sales_df['in_store_orders'].iloc[-metric_range*2:-metric_range].sum()
-avg_sales_per_order_last_period = total_sales_last_period / total_orders_last_period
 avg_sales_per_order_delta = avg_sales_per_order - avg_sales_per_order_last_period
 
 st.markdown(f'#### Key Performance Metrics')
-st.markdown(f'###### Last {metric_range} days')
+st.markdown(f'###### {range_label}')
 st.markdown('(Delta vs. preceding period)')
 
 col_2_1, col_2_2, col_2_3, col_2_4 = st.columns(4)
@@ -186,7 +213,7 @@ with col_2_3:
      st.metric(label= f"Average daily orders", value=f"{avg_orders:,}", delta=int(avg_orders_delta), border=True)
 
 with col_2_4: 
-     st.metric(label= f"Sales per order", value=f"${avg_sales_per_order.round(2):,}", delta=round(avg_sales_per_order_delta, 1), border=True)
+     st.metric(label= f"Sales per order", value=f"${round(avg_sales_per_order, 2):,}", delta=round(avg_sales_per_order_delta, 1), border=True)
 
 # line graph - weekly sales trends 
 
@@ -195,57 +222,59 @@ if aggregation_level == 'Weekly':
 else:
     agg='M'
 
-core_product_sales = sales_df[['total_sales_normalized', 'item_A_sales', 'item_B_sales', 'item_C_sales']]
-
-sales_trend_graph = make_trend_graph(core_product_sales, agg, height=320)
-sales_trend_graph.update_layout(
-    title=dict(
-        text=f'{aggregation_level} sales trend',
-        y=0.925),
-    xaxis_title='Date',
-    yaxis_title='Total sales ($)',
-    width=1230,
-    height=400,
-    legend=dict(
-    orientation='h',         # horizontal
-    yanchor='top',
-    y=-0.1,                  # adjust vertical position
-    xanchor='center',
-    x=0.5                    # center the legend
-    )
-)
-sales_trend_graph.update_yaxes( gridcolor="lightgrey")
-
-
-#  line graph - number of orders vs sales per order trend 
-
-grouped_df = sales_df.resample(agg).mean(numeric_only=True).round(1)
-sales_sop = make_subplots(specs=[[{"secondary_y": True}]])
-sales_sop.add_trace(go.Line(x=grouped_df.index, y=grouped_df['in_store_orders'], name='number of orders', mode='lines'))
-sales_sop.add_trace(go.Line(x=grouped_df.index, y=grouped_df['sales_per_order'], name='sales per order', mode='lines', line=dict(color='red')), 
-                    secondary_y=True)
-
-
-sales_sop.update_layout(
-    title=f'{aggregation_level} orders vs. sales per order',
-    yaxis=dict(
-        title='Orders'
-    ),
-    yaxis2=dict(
-        title='Sales per order'
-    ),
-    width=1230,
-    height=400,
-    legend=dict(
+with timed('trend aggregation'):
+    core_product_sales = rollup_means(rollups, agg, ['total_sales_normalized', 'item_A_sales', 'item_B_sales', 'item_C_sales'])
+    grouped_df = rollup_means(rollups, agg, ['in_store_orders', 'sales_per_order']).round(1)
+
+with timed('figures'):
+    sales_trend_graph = make_trend_graph(core_product_sales, height=320)
+    sales_trend_graph.update_layout(
+        title=dict(
+            text=f'{aggregation_level} sales trend',
+            y=0.925),
+        xaxis_title='Date',
+        yaxis_title='Total sales ($)',
+        width=1230,
+        height=400,
+        legend=dict(
         orientation='h',         # horizontal
         yanchor='top',
         y=-0.1,                  # adjust vertical position
         xanchor='center',
         x=0.5                    # center the legend
+        )
+    )
+    sales_trend_graph.update_yaxes( gridcolor="lightgrey")
+
+
+    #  line graph - number of orders vs sales per order trend 
+
+    sales_sop = make_subplots(specs=[[{"secondary_y": True}]])
+    sales_sop.add_trace(go.Line(x=grouped_df.index, y=grouped_df['in_store_orders'], name='number of orders', mode='lines'))
+    sales_sop.add_trace(go.Line(x=grouped_df.index, y=grouped_df['sales_per_order'], name='sales per order', mode='lines', line=dict(color='red')), 
+                        secondary_y=True)
+
+
+    sales_sop.update_layout(
+        title=f'{aggregation_level} orders vs. sales per order',
+        yaxis=dict(
+            title='Orders'
+        ),
+        yaxis2=dict(
+            title='Sales per order'
+        ),
+        width=1230,
+        height=400,
+        legend=dict(
+            orientation='h',         # horizontal
+            yanchor='top',
+            y=-0.1,                  # adjust vertical position
+            xanchor='center',
+            x=0.5                    # center the legend
+        )
     )
-)
 
-sales_sop.update_yaxes( gridcolor="lightgrey")
+    sales_sop.update_yaxes( gridcolor="lightgrey")
 
 col_3_1, col_3_2 = st.columns(2)
 
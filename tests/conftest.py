@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.model_config import CATEGORY_ORDERS, CATEGORICAL_FEATURES, TARGETS
+from src.training import fit_pipelines
+
+
+@pytest.fixture(scope='session')
+def train_df():
+    # every category of the encoder appears, with sales and orders driven by the features
+    rng = np.random.default_rng(0)
+    n = 400
+    df = pd.DataFrame({
+        'hours_opened': rng.integers(6, 13, n),
+        'avg_temperature': rng.normal(12, 7, n),
+        'rain': rng.exponential(3, n),
+        'snow': rng.exponential(0.5, n),
+    })
+    for column, categories in zip(CATEGORICAL_FEATURES, CATEGORY_ORDERS):
+        values = [categories[i % len(categories)] for i in rng.permutation(n)]
+        # flags are booleans, season and day of week categoricals, as in the training table
+        df[column] = np.array(values, dtype=bool) if categories == [False, True] else pd.Categorical(values, categories=categories)
+
+    weekend = df['day_of_week'].isin(['Saturday', 'Sunday']).to_numpy()
+    signal = (40 * df['hours_opened'] + 8 * df['avg_temperature'] - 5 * df['rain'] + 150 * weekend
+              + 120 * df['is_HCF'] + 90 * df['is_holiday'])
+    df['total_sales_normalized'] = signal + rng.normal(0, 30, n)
+    df['item_A_sales'] = 0.3 * signal + rng.normal(0, 10, n)
+    df['item_B_sales'] = 0.2 * signal + rng.normal(0, 10, n)
+    df['in_store_orders'] = rng.poisson(np.exp(2 + 0.1 * df['hours_opened'] + 0.3 * weekend)).astype('float64')
+    return df
+
+
+@pytest.fixture(scope='session')
+def pipelines(train_df):
+    return fit_pipelines(train_df, TARGETS)
@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+
+from src.aggregate_cube import build_cube, history_fingerprint, update_cube
+from src.storage import read_table
+from src.stores import store_path
+
+
+@pytest.fixture(scope='module')
+def combined_df():
+    return read_table(store_path('combined', 'main'), index_col='date')
+
+
+def test_history_fingerprint_ignores_the_last_month(combined_df):
+    last_month = combined_df.index.max().to_period('M').to_timestamp()
+    changed = combined_df.copy()
+    changed.loc[changed.index >= last_month, 'total_sales_normalized'] += 100
+
+    assert history_fingerprint(changed, last_month) == history_fingerprint(combined_df, last_month)
+
+
+@pytest.mark.parametrize('column, value', [('total_sales_normalized', 1234.5), ('is_holiday', True), ('type_of_day', 'Holiday')])
+def test_history_fingerprint_detects_restated_days(combined_df, column, value):
+    last_month = combined_df.index.max().to_period('M').to_timestamp()
+    changed = combined_df.copy()
+    changed.loc[changed.index[10], column] = value
+
+    assert history_fingerprint(changed, last_month) != history_fingerprint(combined_df, last_month)
+
+
+def test_update_cube_matches_a_rebuild_for_new_days(combined_df):
+    # the cube of all but the last 40 days, brought up to date
+    cube = update_cube(build_cube(combined_df.iloc[:-40]), combined_df)
+
+    pd.testing.assert_frame_equal(cube, build_cube(combined_df))
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.forecast_batch import FLAG_COLUMNS, build_scenario_features, forecast_batches, make_horizon
+
+
+def test_omitted_flags_are_false():
+    features = build_scenario_features(make_horizon('2025-06-01', days=3))
+
+    for flag in FLAG_COLUMNS:
+        assert features[flag].dtype == bool
+        assert not features[flag].any()
+
+
+def test_missing_flag_values_are_false():
+    # flags set for some scenarios only, as in a CSV file with empty cells
+    scenarios = pd.DataFrame.from_records([
+        {'date': '2025-06-01', 'hours_opened': 11, 'avg_temperature': 18, 'rain': 0, 'snow': 0, 'is_HCF': True},
+        {'date': '2025-06-02', 'hours_opened': 11, 'avg_temperature': 18, 'rain': 0, 'snow': 0, 'is_holiday': None},
+    ])
+    features = build_scenario_features(scenarios)
+
+    assert features['is_HCF'].tolist() == [True, False]
+    assert features['is_holiday'].tolist() == [False, False]
+    assert features['is_long_weekend'].tolist() == [False, False]
+
+
+def test_omitted_flag_is_forecast_as_false(pipelines):
+    scenario = {'date': '2025-06-01', 'hours_opened': 11, 'avg_temperature': 18, 'rain': 0, 'snow': 0}
+    with_flag = pd.DataFrame.from_records([{**scenario, 'is_HCF': True}, scenario])
+    without_flag = pd.DataFrame.from_records([{**scenario, 'is_HCF': False}, scenario])
+
+    mixed = next(forecast_batches(build_scenario_features(with_flag), pipelines))
+    explicit = next(forecast_batches(build_scenario_features(without_flag), pipelines))
+
+    assert not mixed.loc[1, 'is_HCF']
+    np.testing.assert_allclose(mixed.loc[1, 'forecast_total_sales'], explicit.loc[1, 'forecast_total_sales'])
+    assert mixed.loc[0, 'forecast_total_sales'] != pytest.approx(mixed.loc[1, 'forecast_total_sales'])
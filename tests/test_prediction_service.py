@@ -0,0 +1,57 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.forecast_batch import build_scenario_features, forecast_batches
+from src.prediction_service import LatencyStats, MicroBatcher
+
+SCENARIO = {'date': '2025-06-06', 'hours_opened': 11, 'avg_temperature': 18, 'rain': 0, 'snow': 0}
+
+# one request per client, each setting a different set of flags
+REQUESTS = [
+    [SCENARIO],
+    [{**SCENARIO, 'is_HCF': True}],
+    [{**SCENARIO, 'is_holiday': True}, {**SCENARIO, 'date': '2025-06-07'}],
+    [{**SCENARIO, 'is_long_weekend': False, 'is_HCF': False}],
+]
+
+
+@pytest.fixture
+def batcher(pipelines):
+    # a long wait, so the concurrent requests are scored in one micro-batch
+    batcher = MicroBatcher(pipelines, max_wait_ms=500, stats=LatencyStats())
+    yield batcher
+    batcher.close()
+
+
+def test_concurrent_requests_keep_their_flags(batcher, pipelines):
+    results = [None] * len(REQUESTS)
+    barrier = threading.Barrier(len(REQUESTS))
+
+    def client(i):
+        barrier.wait()
+        results[i] = batcher.submit(REQUESTS[i]).result(timeout=10)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(len(REQUESTS))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert batcher.stats.summary()['batches'] == 1
+
+    for records, forecasts in zip(REQUESTS, results):
+        # each request on its own, without the other clients' scenarios
+        expected = next(forecast_batches(build_scenario_features(pd.DataFrame.from_records(records)), pipelines))
+        expected['date'] = expected['date'].dt.strftime('%Y-%m-%d')
+        expected = expected.to_dict(orient='records')
+
+        assert len(forecasts) == len(expected)
+        for forecast, single in zip(forecasts, expected):
+            for column, value in single.items():
+                if column.startswith('forecast_'):
+                    np.testing.assert_allclose(forecast[column], value, rtol=1e-12)
+                else:
+                    assert forecast[column] == value, column
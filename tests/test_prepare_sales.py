@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SAMPLE = os.path.join(ROOT, 'data', 'inputs', 'sales', 'main', 'sample_data.xlsx')
+
+
+def _prepare_sales(cwd, *args):
+    completed = subprocess.run([sys.executable, os.path.join(ROOT, 'scripts', 'prepare_sales.csv.py'), '--store', 'main', *args],
+                               cwd=cwd, capture_output=True, text=True)
+    assert completed.returncode == 0, completed.stderr
+    return completed.stdout
+
+
+@pytest.fixture
+def sales_df():
+    return pd.read_excel(SAMPLE, sheet_name='inputs')
+
+
+def test_new_workbook_with_back_dated_days(tmp_path, sales_df):
+    inputs = tmp_path / 'data' / 'inputs' / 'sales' / 'main'
+    inputs.mkdir(parents=True)
+    sales_df.iloc[:300].to_excel(inputs / 'a.xlsx', sheet_name='inputs', index=False)
+    _prepare_sales(tmp_path)
+
+    # 50 days before the watermark, 42 after
+    sales_df.iloc[250:].to_excel(inputs / 'b.xlsx', sheet_name='inputs', index=False)
+    output = _prepare_sales(tmp_path)
+
+    assert 'b.xlsx is new: ignored 50 days on or before the watermark' in output
+    assert 'ingested 42 new days' in output
+
+    # a full refresh ingests every day of both workbooks
+    assert 'ingested 342 new days' in _prepare_sales(tmp_path, '--full-refresh')
+
+
+def test_unchanged_workbook_is_not_read(tmp_path, sales_df):
+    inputs = tmp_path / 'data' / 'inputs' / 'sales' / 'main'
+    inputs.mkdir(parents=True)
+    sales_df.to_excel(inputs / 'a.xlsx', sheet_name='inputs', index=False)
+    _prepare_sales(tmp_path)
+
+    # same content with a new modification time, as in a fresh checkout
+    os.utime(inputs / 'a.xlsx', (0, 0))
+    output = _prepare_sales(tmp_path)
+
+    assert 'ignored' not in output
+    assert 'No new sales data to ingest.' in output
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from src.model_config import FEATURES
+from src.scoring_kernel import ScoringKernel, compile_pipeline
+
+
+@pytest.fixture(scope='module')
+def test_df(train_df):
+    return train_df.sample(100, random_state=1)[FEATURES]
+
+
+@pytest.mark.parametrize('name', ['total_sales', 'item_A_sales', 'item_B_sales', 'orders'])
+def test_kernel_matches_pipeline(pipelines, test_df, name):
+    pipeline = pipelines[name]
+    kernel = compile_pipeline(pipeline)
+    expected = pipeline.predict(test_df)
+
+    np.testing.assert_allclose(kernel.predict(test_df), expected, rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose([kernel.predict_one(record) for record in test_df.to_dict(orient='records')],
+                               expected, rtol=1e-9, atol=1e-9)
+
+
+def test_poisson_kernel_uses_log_link(pipelines):
+    assert compile_pipeline(pipelines['orders']).log_link
+    assert not compile_pipeline(pipelines['total_sales']).log_link
+
+
+@pytest.mark.parametrize('name', ['total_sales', 'orders'])
+def test_saved_kernel_matches_pipeline(pipelines, test_df, tmp_path, name):
+    path = str(tmp_path / f'{name}.npz')
+    compile_pipeline(pipelines[name]).save(path)
+
+    np.testing.assert_allclose(ScoringKernel.load(path).predict(test_df), pipelines[name].predict(test_df),
+                               rtol=1e-9, atol=1e-9)
+
+
+def test_unknown_category_is_rejected(pipelines, test_df):
+    kernel = compile_pipeline(pipelines['total_sales'])
+    features = test_df.head(1).astype({'season': object})
+    features['season'] = 'Monsoon'
+
+    with pytest.raises(ValueError, match='Monsoon'):
+        kernel.predict(features)